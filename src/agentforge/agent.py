@@ -4,8 +4,10 @@ from .config import Config
 from agentforge.apis.base_api import BaseModel
 from agentforge.utils.logger import Logger
 from agentforge.utils.prompt_processor import PromptProcessor
-from agentforge.utils.parsing_processor import ParsingProcessor
+from agentforge.utils.parsing_processor import ParsingProcessor, ParsingError
 from agentforge.utils.audio_manager import AudioManager
+from agentforge.utils.token_accounting import estimate_tokens
+from agentforge.utils.stage_timing import StageTiming
 
 
 class Agent:
@@ -52,6 +54,7 @@ class Agent:
         self.result: Optional[str] = None
         self.parsed_result: Optional[Any] = None
         self.output: Optional[str] = None
+        self.last_timing = None  # TimingRecord of the last run when system.timing is enabled
 
         # Media
         self.images: List[str] = []
@@ -83,14 +86,29 @@ class Agent:
             return None
 
     def _execute_workflow(self, **kwargs: Any) -> None:
-        """Execute the complete agent workflow steps."""
-        self.load_data(**kwargs)
-        self.process_data()
-        self.render_prompt()
-        self.run_model()
-        self.parse_result()
-        self.post_process_result()
-        self.build_output()
+        """
+        Execute the complete agent workflow steps.
+
+        When ``system.timing`` is enabled each stage is timed and the record is kept in
+        ``last_timing``; otherwise the timer and its stages are shared no-ops.
+        """
+        timer = StageTiming.start(self.agent_name, self.agent_config.settings.system.timing)
+        self.last_timing = timer.record
+        with timer:
+            with timer.stage('load_data'):
+                self.load_data(**kwargs)
+            with timer.stage('process_data'):
+                self.process_data()
+            with timer.stage('render_prompt'):
+                self.render_prompt()
+            with timer.stage('run_model'):
+                self.run_model()
+            with timer.stage('parse_result'):
+                self.parse_with_cascade()
+            with timer.stage('post_process_result'):
+                self.post_process_result()
+            with timer.stage('build_output'):
+                self.build_output()
 
     # ---------------------------------
     # Configuration Loading
@@ -151,7 +169,51 @@ class Agent:
 
     def render_prompt(self) -> None:
         """Render prompt templates with the current template data."""
-        self.prompt = self.prompt_processor.render_prompts(self.prompt_template, self.template_data)
+        self.prompt = self._render_prompts(self.prompt_template)
+        if self.agent_config.token_budget:
+            self._fit_prompt_to_budget()
+
+    def _render_prompts(self, prompt_template: Dict[str, Any]) -> Dict[str, Any]:
+        cacheable = self.agent_config.cacheable_prompts
+        if cacheable:
+            return self.prompt_processor.render_prompts(prompt_template, self.template_data, cacheable=cacheable)
+        return self.prompt_processor.render_prompts(prompt_template, self.template_data)
+
+    def _fit_prompt_to_budget(self) -> None:
+        """
+        Estimate the rendered prompt's tokens before the call. When it would overflow the model's
+        context window (minus the output reserve), drop the configured trim_sections in order and
+        re-render until it fits.
+        """
+        budget = self.agent_config.token_budget
+        limit = budget.context_window - budget.reserve_output_tokens
+        model_name = getattr(self.model, 'model_name', None)
+        used = estimate_tokens(self.prompt, model_name)
+        if used <= limit:
+            return
+
+        template = {k: dict(v) if isinstance(v, dict) else v for k, v in self.prompt_template.items()}
+        for section in budget.trim_sections:
+            if not self._drop_prompt_section(template, section):
+                continue
+            self.prompt = self._render_prompts(template)
+            used = estimate_tokens(self.prompt, model_name)
+            self.logger.warning(f"Prompt over token budget: dropped '{section}' section (~{used}/{limit} tokens).")
+            if used <= limit:
+                return
+
+        self.logger.warning(f"Prompt is ~{used} tokens, over the {limit} token budget for '{model_name}'.")
+
+    @staticmethod
+    def _drop_prompt_section(template: Dict[str, Any], section: str) -> bool:
+        """Remove a 'section' or 'system.section' entry from a prompt template copy."""
+        prompt_type, _, name = section.rpartition('.')
+        for key in ([prompt_type] if prompt_type else ['system', 'user']):
+            sections = template.get(key)
+            if isinstance(sections, dict) and name in sections:
+                del sections[name]
+                return True
+        return False
 
     # ---------------------------------
     # Model Execution
@@ -165,11 +227,12 @@ class Agent:
 
         self._execute_model_generation()
 
-    def _execute_model_generation(self) -> None:
+    def _execute_model_generation(self, model: Optional[BaseModel] = None, base_params: Optional[Dict[str, Any]] = None) -> None:
         """Execute the actual model generation with configured parameters."""
-        params = self._build_model_params()
+        model = model or self.model
+        params = self._build_model_params(base_params)
         # `generate` may return str or raw bytes (for TTS).
-        result = self.model.generate(self.prompt, **params)
+        result = model.generate(self.prompt, **params)
 
         # Preserve raw bytes; strip only when we have text.
         if isinstance(result, str):
@@ -177,9 +240,9 @@ class Agent:
 
         self.result = result
 
-    def _build_model_params(self) -> Dict[str, Any]:
+    def _build_model_params(self, base_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Build parameters for model generation."""
-        params = self.agent_config.params.copy()
+        params = (base_params if base_params is not None else self.agent_config.params).copy()
         params['agent_name'] = self.agent_name
         
         if self.images:
@@ -213,6 +276,53 @@ class Agent:
             self.result, self.agent_config.parse_response_as
         )
 
+    def parse_with_cascade(self) -> None:
+        """
+        Parse the model result, escalating through the configured model cascade when
+        parsing fails or the required confidence key is missing or too low.
+        """
+        cascade = self.agent_config.cascade
+        if cascade is None or self.agent_config.settings.system.debug.mode:
+            self.parse_result()
+            return
+
+        steps = iter(cascade.steps)
+        while True:
+            error = None
+            try:
+                self.parse_result()
+                if self._meets_confidence(cascade):
+                    return
+            except ParsingError as e:
+                error = e
+
+            step = next(steps, None)
+            if step is None:
+                # Out of models: keep the last answer unless it could not be parsed at all
+                if error is not None:
+                    raise error
+                return
+
+            reason = f"parsing failed ({error})" if error is not None else "confidence check failed"
+            self.logger.info(f"{self.agent_name} - {reason}, escalating to '{step.label}'.")
+            self._execute_model_generation(step.model, step.params)
+
+    def _meets_confidence(self, cascade) -> bool:
+        """Check the parsed result against the cascade's confidence key and threshold."""
+        if not cascade.confidence_key:
+            return True
+        if not isinstance(self.parsed_result, dict):
+            return False
+        value = self.parsing_processor.get_dot_notated(self.parsed_result, cascade.confidence_key)
+        if value is None:
+            return False
+        if cascade.min_confidence is None:
+            return True
+        try:
+            return float(value) >= cascade.min_confidence
+        except (TypeError, ValueError):
+            return False
+
     def post_process_result(self) -> None:
         """
         Extension point for additional processing after parsing the model's response.
@@ -1,9 +1,18 @@
 import os
 import anthropic
 from .base_api import BaseModel
+from .prompt_cache import EPHEMERAL_CACHE_CONTROL, split_cache_prefix
 
 API_KEY = os.getenv('ANTHROPIC_API_KEY')
-client = anthropic.Anthropic(api_key=API_KEY)
+_client = None
+
+
+def get_client():
+    """Return the shared Anthropic client, creating it on first use rather than at import."""
+    global _client
+    if _client is None:
+        _client = anthropic.Anthropic(api_key=API_KEY)
+    return _client
 
 
 class Claude(BaseModel):
@@ -28,11 +37,20 @@ class Claude(BaseModel):
         We purposely keep `system` separate (not as a message role) so that
         the top-level `system` parameter can be forwarded untouched by
         `_merge_parts()` / `_do_api_call()`.
+
+        When the prompt has cacheable sections, `system` becomes a list of text
+        blocks with a `cache_control` breakpoint after the cacheable prefix.
         """
+        system = model_prompt.get("system")
+        prefix, remainder = split_cache_prefix(model_prompt)
+        if prefix:
+            system = [{"type": "text", "text": prefix, "cache_control": EPHEMERAL_CACHE_CONTROL}]
+            if remainder:
+                system.append({"type": "text", "text": remainder})
 
         return {
             "messages": [{"role": "user", "content": model_prompt.get("user")}],
-            "system": model_prompt.get("system"),
+            "system": system,
         }
 
     # ------------------------------------------------------------------
@@ -51,10 +69,13 @@ class Claude(BaseModel):
         # later with a dedicated modality handler.
         return parts["text"]
 
+    def warm_up(self):
+        get_client()
+
     def _do_api_call(self, prompt, **filtered_params):
         """Send the request to Anthropic with correctly separated params."""
 
-        return client.messages.create(
+        return get_client().messages.create(
             model=self.model_name,
             messages=prompt["messages"],
             system=prompt.get("system"),
@@ -62,4 +83,18 @@ class Claude(BaseModel):
         )
 
     def _process_response(self, raw_response):
-        return raw_response.content[0].text
\ No newline at end of file
+        return raw_response.content[0].text
+
+    def _extract_usage(self, raw_response):
+        usage = getattr(raw_response, "usage", None)
+        if usage is None:
+            return None
+        cached = getattr(usage, "cache_read_input_tokens", 0) or 0
+        written = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        uncached = getattr(usage, "input_tokens", 0) or 0
+        return {
+            "prompt_tokens": cached + written + uncached,
+            "completion_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "cached_tokens": cached,
+            "cache_write_tokens": written,
+        }
@@ -2,7 +2,11 @@ import asyncio
 import time
 from httpx import HTTPStatusError, RequestError
 from agentforge.utils.logger import Logger
-from .base_api import BaseModel, UnsupportedModalityError, NonRetriableModelError
+from agentforge.utils.single_flight import AsyncSingleFlight
+from .base_api import (
+    BaseModel, UnsupportedModalityError, NonRetriableModelError,
+    MODEL_REQUEST_SECONDS, MODEL_RETRIES, track_generation, _GenerationCall, _current_call,
+)
 
 
 class AsyncBaseModel(BaseModel):
@@ -11,6 +15,8 @@ class AsyncBaseModel(BaseModel):
     Designed for non-blocking I/O and parallel execution.
     """
 
+    _async_single_flight = AsyncSingleFlight()
+
     async def generate_async(self, model_prompt=None, *, images=None, audio=None, **params):
         """
         Asynchronous entry point for generating responses.
@@ -20,52 +26,88 @@ class AsyncBaseModel(BaseModel):
         if audio is None and "audio" in params:
             audio = params.pop("audio")
 
+        coalesce = params.pop("coalesce", self.coalesce)
+        num_retries = params.pop("num_retries", self.num_retries)
+        agent_name = params.get("agent_name", "NamelessAgent")
+
         self._validate_modalities(images, audio)
 
         # Initialize logger (sync)
-        self._init_logger(model_prompt, params)
+        token = _current_call.set(
+            _GenerationCall(self, agent_name, self._init_logger(model_prompt, params), num_retries))
+        try:
+            parts = self._build_parts(model_prompt, images, audio)
+            request_body = self._merge_parts(parts)
+
+            key = self._coalesce_key(request_body, params, coalesce, images, audio)
+            if key is None:
+                return await self._run_with_retries_async(request_body, params)
+
+            (reply, usage), shared = await self._async_single_flight.do(
+                key, lambda: self._run_shared_async(request_body, params)
+            )
+            if shared:
+                self._record_shared_usage(usage, reply)
+            return reply
+        finally:
+            _current_call.reset(token)
+
+    async def _run_shared_async(self, request_body, params):
+        """Async counterpart of _run_shared."""
+        reply = await self._run_with_retries_async(request_body, params)
+        return reply, _current_call.get().usage
+
+    async def generate_batch_async(self, prompts, *, max_concurrency=None, return_exceptions=False, **params):
+        """
+        Asynchronously generate responses for several prompts, returning results in prompt order.
+        At most ``max_concurrency`` (default ``batch_concurrency``) requests are in flight at once.
+        """
+        prompts = list(prompts)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or self.batch_concurrency))
 
-        parts = self._build_parts(model_prompt, images, audio)
-        request_body = self._merge_parts(parts)
+        async def _call(prompt):
+            async with semaphore:
+                return await self.generate_async(prompt, **dict(params))
 
-        return await self._run_with_retries_async(request_body, params)
+        return await asyncio.gather(*[_call(p) for p in prompts], return_exceptions=return_exceptions)
 
     async def _run_with_retries_async(self, request_body, params):
-        reply = None
-
-        for attempt in range(self.num_retries):
-            backoff = self.base_backoff ** (attempt + 1)
-
-            try:
-                filtered = self._prepare_params(**params)
-                # Call the async version of the API call
-                response = await self._do_api_call_async(request_body, **filtered)
-                reply = self._process_response(response)
-
-                if isinstance(reply, (bytes, bytearray)):
-                    self.logger.log_response(f"<binary {len(reply)} bytes>")
-                else:
-                    self.logger.log_response(reply)
-                break
-
-            except (HTTPStatusError, RequestError) as e:
-                # Handle status errors (like 429 or 502) and connection issues
-                status_code = getattr(e.response, "status_code", None) if hasattr(e, "response") else None
-
-                if status_code in [429, 502, 503, 504] or isinstance(e, RequestError):
-                    self.logger.warning(f"Transient error ({type(e).__name__}): {e}. Retrying in {backoff}s...")
+        with track_generation(self.model_name):
+            reply = None
+
+            for attempt in range(_current_call.get().num_retries):
+                backoff = self.base_backoff ** (attempt + 1)
+                if attempt:
+                    MODEL_RETRIES.inc(model=self.model_name)
+
+                try:
+                    with MODEL_REQUEST_SECONDS.time(model=self.model_name):
+                        filtered = self._prepare_params(**params)
+                        # Call the async version of the API call
+                        response = await self._do_api_call_async(request_body, **filtered)
+                        reply = self._process_response(response)
+                    self._record_usage(response, request_body, reply)
+                    self._log_reply(reply)
+                    break
+
+                except (HTTPStatusError, RequestError) as e:
+                    # Handle status errors (like 429 or 502) and connection issues
+                    status_code = getattr(e.response, "status_code", None) if hasattr(e, "response") else None
+
+                    if status_code in [429, 502, 503, 504] or isinstance(e, RequestError):
+                        self.logger.warning(f"Transient error ({type(e).__name__}): {e}. Retrying in {backoff}s...")
+                        await asyncio.sleep(backoff)
+                    else:
+                        raise
+                except Exception as e:
+                    self.logger.warning(f"Unexpected error: {e}. Retrying in {backoff} seconds...")
                     await asyncio.sleep(backoff)
-                else:
-                    raise
-            except Exception as e:
-                self.logger.warning(f"Unexpected error: {e}. Retrying in {backoff} seconds...")
-                await asyncio.sleep(backoff)
 
-        if reply is None:
-            self.logger.critical("Error: All retries exhausted.")
-            raise ValueError("Async generation failed: All retries exhausted.")
+            if reply is None:
+                self.logger.critical("Error: All retries exhausted.")
+                raise ValueError("Async generation failed: All retries exhausted.")
 
-        return reply
+            return reply
 
     async def _do_api_call_async(self, prompt, **filtered_params):
         """Subclasses must implement this async method."""
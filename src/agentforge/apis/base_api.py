@@ -1,9 +1,73 @@
+import sys
 import time
-from openai import APIError, RateLimitError, APIConnectionError
+import contextlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from agentforge.utils.logger import Logger
+from agentforge.utils.single_flight import SingleFlight, make_request_key
+from agentforge.apis.prompt_cache import PromptCacheStats
+from agentforge.utils.token_accounting import TokenAccountant, estimate_tokens
+from agentforge.utils import stage_timing
+from agentforge import metrics
 import os
 import base64
 
+# Shared by BaseModel and AsyncBaseModel
+MODEL_REQUEST_SECONDS = metrics.histogram(
+    "agentforge_model_request_seconds", "Latency of a single model API attempt, by model.", ("model",))
+MODEL_RETRIES = metrics.counter(
+    "agentforge_model_retries_total", "Model API attempts retried after an error, by model.", ("model",))
+MODEL_GENERATIONS = metrics.counter(
+    "agentforge_model_generations_total", "Finished generations after retries, by model and outcome.",
+    ("model", "outcome"))
+MODEL_IN_FLIGHT = metrics.gauge(
+    "agentforge_model_generations_in_flight", "Generations currently running, by model.", ("model",))
+
+
+@contextlib.contextmanager
+def track_generation(model_name):
+    """Count a generation as in flight for the block, then record whether it succeeded."""
+    MODEL_IN_FLIGHT.inc(model=model_name)
+    try:
+        yield
+    except BaseException:
+        MODEL_GENERATIONS.inc(model=model_name, outcome="error")
+        raise
+    else:
+        MODEL_GENERATIONS.inc(model=model_name, outcome="ok")
+    finally:
+        MODEL_IN_FLIGHT.dec(model=model_name)
+
+
+def _openai_errors():
+    """
+    Returns openai's (RateLimitError, APIConnectionError, APIError), or empty tuples when the SDK
+    has not been imported. The SDK is only loaded by the wrappers that use it, and its errors
+    cannot be raised before then, so BaseModel never imports it itself.
+    """
+    openai = sys.modules.get('openai')
+    if openai is None:
+        return (), (), ()
+    return openai.RateLimitError, openai.APIConnectionError, openai.APIError
+
+
+class _GenerationCall:
+    """Per-call state of a generate() call: the calling agent, its logger, its retry budget and the usage recorded for it."""
+
+    __slots__ = ("model", "agent_name", "logger", "num_retries", "usage")
+
+    def __init__(self, model, agent_name, logger, num_retries):
+        self.model = model
+        self.agent_name = agent_name
+        self.logger = logger
+        self.num_retries = num_retries
+        self.usage = None
+
+
+# The generation running in the current thread or task. Model instances are shared between
+# agents, so per-call state lives here rather than on the instance.
+_current_call = contextvars.ContextVar("agentforge_generation_call", default=None)
+
 
 class UnsupportedModalityError(Exception):
     """Raised when a model doesn't support a requested modality."""
@@ -27,6 +91,15 @@ class BaseModel:
 
     supported_modalities = {"text"}
 
+    # In-flight request coalescing shared by every model instance. ``None`` means
+    # only deterministic requests (temperature == 0) are coalesced; ``True``/``False``
+    # force it on/off. Can be overridden per call with the ``coalesce`` param.
+    default_coalesce = None
+    _single_flight = SingleFlight()
+
+    # Maximum number of concurrent requests issued by generate_batch
+    batch_concurrency = 4
+
     def __init__(self, model_name, **kwargs):
         self.logger = None
         self.allowed_params = None
@@ -34,6 +107,7 @@ class BaseModel:
         self.model_name = model_name
         self.num_retries = kwargs.get("num_retries", self.default_retries)
         self.base_backoff = kwargs.get("base_backoff", self.default_backoff)
+        self.coalesce = kwargs.get("coalesce", self.default_coalesce)
 
     def generate(self, model_prompt=None, *, images=None, audio=None, **params):
         """
@@ -51,13 +125,67 @@ class BaseModel:
         elif audio is not None and "audio" in params:
             raise TypeError("Duplicate 'audio' argument supplied to generate().")
 
+        coalesce = params.pop("coalesce", self.coalesce)
+        num_retries = params.pop("num_retries", self.num_retries)
+        agent_name = params.get("agent_name", "NamelessAgent")
+
         self._validate_modalities(images, audio)
-        self._init_logger(model_prompt, params)
+        token = _current_call.set(
+            _GenerationCall(self, agent_name, self._init_logger(model_prompt, params), num_retries))
+        try:
+            parts        = self._build_parts(model_prompt, images, audio)
+            request_body = self._merge_parts(parts)
+
+            key = self._coalesce_key(request_body, params, coalesce, images, audio)
+            if key is None:
+                return self._run_with_retries(request_body, params)
+
+            (reply, usage), shared = self._single_flight.do(key, lambda: self._run_shared(request_body, params))
+            if shared:
+                self._record_shared_usage(usage, reply)
+            return reply
+        finally:
+            _current_call.reset(token)
+
+    def generate_batch(self, prompts, *, max_concurrency=None, return_exceptions=False, **params):
+        """
+        Generate responses for several prompts at once, returning results in prompt order.
+
+        Prompts are submitted concurrently on a bounded thread pool. Local-server wrappers
+        raise ``batch_concurrency`` and reuse pooled connections so the server can batch
+        the requests; cloud providers keep a conservative default to respect rate limits.
+
+        Args:
+            prompts (list): Prompt dicts (``{"system": ..., "user": ...}``), one per request.
+            max_concurrency (int, optional): Overrides ``batch_concurrency`` for this call.
+            return_exceptions (bool): When True, failed prompts yield their exception in
+                place of a result instead of raising the first failure.
+            **params: Generation parameters shared by every prompt.
+
+        Returns:
+            list: One result (or exception) per prompt, in the same order as ``prompts``.
+        """
+        prompts = list(prompts)
+        if not prompts:
+            return []
+
+        workers = max(1, min(len(prompts), max_concurrency or self.batch_concurrency))
+
+        def _call(prompt):
+            try:
+                return self.generate(prompt, **dict(params))
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
 
-        parts        = self._build_parts(model_prompt, images, audio)
-        request_body = self._merge_parts(parts)
+        if workers == 1:
+            return [_call(prompt) for prompt in prompts]
 
-        return self._run_with_retries(request_body, params)
+        # Carry the caller's context (e.g. the current cog run id) into the worker threads
+        contexts = [contextvars.copy_context() for _ in prompts]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agentforge-batch") as executor:
+            return list(executor.map(lambda ctx, prompt: ctx.run(_call, prompt), contexts, prompts))
 
     # ─────────────────── helper trio for readability ────────────────────
     def _validate_modalities(self, images, audio):
@@ -67,9 +195,28 @@ class BaseModel:
             raise UnsupportedModalityError(f"{self.__class__.__name__} can't handle audio inputs")
 
     def _init_logger(self, model_prompt, params):
-        self.logger = Logger(name=params.pop('agent_name', 'NamelessAgent'))
+        logger = Logger(name=params.pop('agent_name', 'NamelessAgent'))
         if model_prompt:
-            self.logger.log_prompt(model_prompt)
+            logger.log_prompt(model_prompt)
+        return logger
+
+    @property
+    def logger(self):
+        """The logger of this model's generation in the current context, else the one assigned to the model."""
+        call = _current_call.get()
+        if call is not None and call.model is self and call.logger is not None:
+            return call.logger
+        return self._logger
+
+    @logger.setter
+    def logger(self, value):
+        self._logger = value
+
+    @property
+    def _agent_name(self):
+        """The agent that issued this model's generation in the current context."""
+        call = _current_call.get()
+        return call.agent_name if call is not None and call.model is self else "NamelessAgent"
 
     def _build_parts(self, model_prompt, images, audio):
         parts = {"text": self._prepare_prompt(model_prompt)}
@@ -79,52 +226,87 @@ class BaseModel:
             parts["audio"] = self._prepare_audio_payload(audio)
         return parts
 
+    # ─────────────────── in-flight request coalescing ───────────────────
+    def _coalesce_key(self, request_body, params, coalesce, images=None, audio=None):
+        """
+        Return the single-flight key for a request, or None when it must not be coalesced.
+
+        Identical requests are only shared when the caller opted in, or when the
+        request is deterministic (temperature == 0) and coalescing was not disabled.
+        Media requests are never coalesced.
+        """
+        if coalesce is False or images or audio:
+            return None
+        if coalesce is None and params.get("temperature") != 0:
+            return None
+        return make_request_key(
+            type(self).__module__,
+            type(self).__qualname__,
+            self.model_name,
+            request_body,
+            params,
+        )
+
+    def _run_shared(self, request_body, params):
+        """Run a coalesced request, returning its reply with the usage recorded for it so waiters can be credited."""
+        reply = self._run_with_retries(request_body, params)
+        return reply, _current_call.get().usage
+
     # ─────────────────── retry/back‑off execution ───────────────────────
     def _run_with_retries(self, request_body, params):
-        reply = None
+        with track_generation(self.model_name):
+            reply = None
+            rate_limit_error, connection_error, api_error = _openai_errors()
         
-        for attempt in range(self.num_retries):
-            backoff = self.base_backoff ** (attempt + 1)
+            for attempt in range(_current_call.get().num_retries):
+                backoff = self.base_backoff ** (attempt + 1)
+                if attempt:
+                    MODEL_RETRIES.inc(model=self.model_name)
             
-            try:
-                filtered = self._prepare_params(**params)
-                response = self._do_api_call(request_body, **filtered)
-                reply    = self._process_response(response)
-
-                # Avoid dumping binary blobs into logs
-                if isinstance(reply, (bytes, bytearray)):
-                    self.logger.log_response(f"<binary {len(reply)} bytes>")
-                else:
-                    self.logger.log_response(reply)
-                break
-            except RateLimitError as e:
-                self.logger.warning(f"Rate limit exceeded: {e}. Retrying in {backoff} seconds...")
-                time.sleep(backoff)
-            except APIConnectionError as e:
-                self.logger.warning(f"Connection error: {e}. Retrying in {backoff} seconds...")
-                time.sleep(backoff)
-            except APIError as e:
-                if getattr(e, "status_code", None) == 502:
-                    self.logger.warning(f"502 Bad Gateway. Retrying in {backoff} seconds...")
+                try:
+                    with stage_timing.span("model.attempt", model=self.model_name, attempt=attempt + 1), \
+                            MODEL_REQUEST_SECONDS.time(model=self.model_name):
+                        filtered = self._prepare_params(**params)
+                        response = self._do_api_call(request_body, **filtered)
+                        reply    = self._process_response(response)
+                    self._record_usage(response, request_body, reply)
+                    self._log_reply(reply)
+                    break
+                except rate_limit_error as e:
+                    self.logger.warning(f"Rate limit exceeded: {e}. Retrying in {backoff} seconds...")
                     time.sleep(backoff)
-                else:
+                except connection_error as e:
+                    self.logger.warning(f"Connection error: {e}. Retrying in {backoff} seconds...")
+                    time.sleep(backoff)
+                except api_error as e:
+                    if getattr(e, "status_code", None) == 502:
+                        self.logger.warning(f"502 Bad Gateway. Retrying in {backoff} seconds...")
+                        time.sleep(backoff)
+                    else:
+                        raise
+                except NonRetriableModelError:
                     raise
-            except NonRetriableModelError:
-                raise
-            except Exception as e:
-                self.logger.warning(f"Error: {e}. Retrying in {backoff} seconds...")
-                time.sleep(backoff)
+                except Exception as e:
+                    self.logger.warning(f"Error: {e}. Retrying in {backoff} seconds...")
+                    time.sleep(backoff)
 
-        if reply is None:
-            self.logger.critical("Error: All retries exhausted. No response received.")
-            raise ValueError("Model generation failed: All retries exhausted. No response received.")
+            if reply is None:
+                self.logger.critical("Error: All retries exhausted. No response received.")
+                raise ValueError("Model generation failed: All retries exhausted. No response received.")
         
-        # Validate that we received a non-empty response
-        if not reply or (isinstance(reply, str) and not reply.strip()):
-            self.logger.critical("Error: Model returned empty response.")
-            raise ValueError("Model generation failed: Received empty response.")
+            # Validate that we received a non-empty response
+            if not reply or (isinstance(reply, str) and not reply.strip()):
+                self.logger.critical("Error: Model returned empty response.")
+                raise ValueError("Model generation failed: Received empty response.")
             
-        return reply
+            return reply
+
+    def _log_reply(self, reply):
+        # Avoid dumping binary blobs into logs
+        if isinstance(reply, (bytes, bytearray)):
+            self.logger.log_response(f"<binary {len(reply)} bytes>")
+        else:
+            self.logger.log_response(reply)
 
     def _prepare_image_payload(self, images):
         """Default implementation raises UnsupportedModalityError for image modality."""
@@ -178,3 +360,63 @@ class BaseModel:
     def _process_response(self, raw_response):
         # Subclasses can process the raw responses as needed
         return raw_response
+
+    def warm_up(self):
+        """
+        Create any client, session or connection the model needs before its first request.
+        The default does nothing; wrappers with lazily built clients override it.
+        """
+        return None
+
+    # ─────────────────── usage reporting ────────────────────────────────
+    def _extract_usage(self, raw_response):
+        """
+        Return token usage reported by the provider, or None if unavailable.
+        Subclasses return a dict with 'prompt_tokens' and 'completion_tokens', plus
+        'cached_tokens' / 'cache_write_tokens' when the provider reports prompt caching.
+        """
+        return None
+
+    def _record_usage(self, raw_response, request_body, reply):
+        try:
+            usage = self._extract_usage(raw_response)
+        except Exception:
+            # Usage reporting must never fail a generation
+            usage = None
+
+        estimated = not usage
+        if estimated:
+            usage = {
+                "prompt_tokens": estimate_tokens(request_body, self.model_name),
+                "completion_tokens": estimate_tokens(reply, self.model_name) if isinstance(reply, str) else 0,
+            }
+        TokenAccountant.record(
+            self._agent_name,
+            self.model_name,
+            usage.get("prompt_tokens", 0),
+            usage.get("completion_tokens", 0),
+            estimated=estimated,
+        )
+        call = _current_call.get()
+        if call is not None and call.model is self:
+            call.usage = (usage, estimated)
+        if "cached_tokens" in usage:
+            PromptCacheStats.record(self.model_name, usage)
+
+    def _record_shared_usage(self, usage, reply):
+        """
+        Log a reply shared from another caller's in-flight request and credit its usage to this
+        caller's agent and run. The model was only called once, so its totals are left alone.
+        """
+        self._log_reply(reply)
+        if usage is None:
+            return
+        counts, estimated = usage
+        TokenAccountant.record(
+            self._agent_name,
+            self.model_name,
+            counts.get("prompt_tokens", 0),
+            counts.get("completion_tokens", 0),
+            estimated=estimated,
+            shared=True,
+        )
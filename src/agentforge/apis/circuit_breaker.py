@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+
+class CircuitBreaker:
+    """
+    Tracks the health of a single (api, model) pair and decides whether it should receive traffic.
+
+    The breaker keeps a rolling window of recent call outcomes. A call counts as a failure
+    when it raises, or when it succeeds but takes longer than ``slow_call_seconds``.
+
+    States:
+        closed    -- Normal operation, every call is allowed.
+        open      -- The failure rate crossed ``failure_rate_threshold``; calls are refused
+                     until ``recovery_timeout`` seconds have passed.
+        half_open -- After the timeout a single probe call is allowed. Success closes the
+                     breaker, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_rate_threshold: float = 0.5, window_size: int = 20,
+                 min_calls: int = 5, slow_call_seconds: Optional[float] = None,
+                 recovery_timeout: float = 30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be sent to this model right now."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = True
+                return True
+            return False
+
+    @property
+    def opened_at(self) -> float:
+        """Clock time at which the breaker last opened, or 0.0 if it never has."""
+        with self._lock:
+            return self._opened_at
+
+    def force_probe(self) -> None:
+        """Let the next call through as a half-open probe, even before ``recovery_timeout`` has passed."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = True
+
+    def record_success(self, latency: float) -> None:
+        """Record a completed call; slow calls are counted as failures."""
+        if self.slow_call_seconds is not None and latency > self.slow_call_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._close()
+                return
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """Record a failed (or too slow) call and open the breaker if needed."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            if len(self._outcomes) < self.min_calls:
+                return
+            failures = self._outcomes.count(False)
+            if failures / len(self._outcomes) >= self.failure_rate_threshold:
+                self._open()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._close()
+
+    # ---------------------------------
+    # Internal Helpers
+    # ---------------------------------
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+
+    def _close(self) -> None:
+        self._state = self.CLOSED
+        self._outcomes.clear()
+        self._probe_in_flight = False
+
+
+class CircuitBreakerRegistry:
+    """Process-wide registry handing out one CircuitBreaker per (api, model) pair."""
+
+    _registry: Dict[Tuple[str, str], CircuitBreaker] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, api_name: str, model_name: str, settings: Optional[Dict[str, Any]] = None) -> CircuitBreaker:
+        """
+        Return the breaker for an (api, model) pair, creating it with ``settings`` on first use.
+
+        Args:
+            api_name (str): The API key from the model library (e.g. 'gemini_api').
+            model_name (str): The model identifier sent to the provider.
+            settings (dict, optional): The ``circuit_breaker`` section of models.yaml.
+
+        Returns:
+            CircuitBreaker: The shared breaker for that pair.
+        """
+        key = (api_name, model_name)
+        with cls._lock:
+            breaker = cls._registry.get(key)
+            if breaker is None:
+                options = {k: v for k, v in (settings or {}).items() if k in _BREAKER_OPTIONS}
+                breaker = CircuitBreaker(f"{api_name}/{model_name}", **options)
+                cls._registry[key] = breaker
+            return breaker
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._registry.clear()
+
+
+_BREAKER_OPTIONS = {
+    "failure_rate_threshold", "window_size", "min_calls", "slow_call_seconds", "recovery_timeout",
+}
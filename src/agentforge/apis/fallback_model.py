@@ -0,0 +1,124 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from agentforge.utils.logger import Logger
+from .base_api import BaseModel, UnsupportedModalityError
+from .circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+
+_MISSING = object()
+
+
+@dataclass
+class ModelCandidate:
+    """A resolved model together with the parameters configured for it."""
+    api_name: str
+    class_name: str
+    model: BaseModel
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        return f"{self.api_name}/{self.model.model_name}"
+
+
+class FallbackModel(BaseModel):
+    """
+    Routes generations through an ordered list of model candidates.
+
+    Each candidate is guarded by a shared CircuitBreaker. Candidates whose breaker is open are
+    skipped, and a candidate that fails (after its own retries) hands the request to the next
+    one. When every breaker is open, the candidate whose breaker opened first is tried anyway as
+    a half-open probe rather than failing without a call. Candidates other than the last are
+    called with a reduced ``num_retries`` so a slow or dead provider does not stall the agent
+    through its full retry schedule; the candidate models themselves are left unchanged, since
+    other agents may share them.
+    """
+
+    def __init__(self, candidates: List[ModelCandidate], breaker_settings: Optional[Dict[str, Any]] = None):
+        if not candidates:
+            raise ValueError("FallbackModel requires at least one model candidate.")
+        primary = candidates[0].model
+        super().__init__(primary.model_name)
+        self.candidates = candidates
+        self.supported_modalities = primary.supported_modalities
+        settings = breaker_settings or {}
+
+        self.fallback_retries = settings.get("fallback_retries", 1)
+
+        self.breakers: List[CircuitBreaker] = [
+            CircuitBreakerRegistry.get(c.api_name, c.model.model_name, settings) for c in candidates
+        ]
+
+    def generate(self, model_prompt=None, **params):
+        """
+        Try each candidate in order, returning the first successful reply.
+        Raises ValueError if every candidate is unavailable or fails.
+        """
+        logger = Logger(name=params.get('agent_name', 'NamelessAgent'))
+        last_error = None
+        attempted = False
+
+        for candidate, breaker in zip(self.candidates, self.breakers):
+            if not breaker.allow_request():
+                logger.warning(f"Circuit open for '{candidate.label}', skipping to next model.")
+                continue
+
+            attempted = True
+            try:
+                return self._attempt(candidate, breaker, model_prompt, params)
+            except UnsupportedModalityError:
+                raise
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Model '{candidate.label}' failed: {e}. Falling back to next model.")
+
+        if not attempted:
+            candidate, breaker = min(zip(self.candidates, self.breakers), key=lambda pair: pair[1].opened_at)
+            logger.warning(f"Every circuit is open; probing '{candidate.label}'.")
+            breaker.force_probe()
+            try:
+                return self._attempt(candidate, breaker, model_prompt, params)
+            except UnsupportedModalityError:
+                raise
+            except Exception as e:
+                last_error = e
+
+        raise ValueError("Model generation failed: no model candidate available.") from last_error
+
+    def _attempt(self, candidate: ModelCandidate, breaker: CircuitBreaker, model_prompt, params: Dict[str, Any]):
+        """Send the request to one candidate and record the outcome on its breaker."""
+        start = time.monotonic()
+        try:
+            reply = candidate.model.generate(model_prompt, **self._candidate_params(candidate, params))
+        except UnsupportedModalityError:
+            # Caller error, not a provider failure
+            breaker.record_success(0.0)
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(time.monotonic() - start)
+        return reply
+
+    def warm_up(self):
+        """Warm every candidate so a fallback does not pay client setup mid-request."""
+        for candidate in self.candidates:
+            candidate.model.warm_up()
+
+    def _candidate_params(self, candidate: ModelCandidate, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the params for a candidate. Callers pass the primary's params plus runtime extras
+        (agent_name, images, overrides); anything that differs from the primary's configured params
+        is carried over on top of the candidate's own params. Every candidate but the last also
+        gets the reduced retry budget.
+        """
+        primary_params = self.candidates[0].params
+        if candidate is self.candidates[0]:
+            candidate_params = dict(params)
+        else:
+            runtime = {k: v for k, v in params.items() if primary_params.get(k, _MISSING) != v}
+            candidate_params = {**candidate.params, **runtime}
+        if candidate is not self.candidates[-1]:
+            candidate_params["num_retries"] = min(candidate.model.num_retries, self.fallback_retries)
+        return candidate_params
@@ -1,11 +1,17 @@
 import os
 import time
+import hashlib
+import datetime
+import threading
 from .base_api import BaseModel
+from .prompt_cache import split_cache_prefix
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from agentforge.utils.logger import Logger
 from agentforge.apis.mixins.vision_mixin import VisionMixin
 
+_STALE = object()
+
 # Get API key from Env
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 genai.configure(api_key=GOOGLE_API_KEY)
@@ -18,17 +24,31 @@ class Gemini(BaseModel):
     Handles API calls to Google's Generative AI, including error handling for rate limits and retries failed requests.
     """
 
+    # Cached content lifetime; entries are refreshed shortly before they expire
+    cache_ttl_seconds = 3600
+    _cached_contents = {}
+    _cache_lock = threading.Lock()
+    _cache_key_locks = {}
+
     @staticmethod
     def _prepare_prompt(model_prompt):
         # Return the standard messages format expected by base class
+        prefix, remainder = split_cache_prefix(model_prompt)
+        if prefix:
+            # Keep the cacheable prefix as its own message so it can be sent as cached content
+            return [
+                {"role": "system", "content": prefix, "cacheable": True},
+                {"role": "system", "content": remainder},
+                {"role": "user", "content": model_prompt.get('user')}
+            ]
         return [
             {"role": "system", "content": model_prompt.get('system')},
             {"role": "user", "content": model_prompt.get('user')}
         ]
 
     def _do_api_call(self, prompt, **filtered_params):
-        model = genai.GenerativeModel(self.model_name)
-        
+        model = None
+
         # Handle different prompt formats
         if isinstance(prompt, dict):
             if "contents" in prompt:
@@ -37,12 +57,19 @@ class Gemini(BaseModel):
             elif "messages" in prompt:
                 # Standard messages format - convert to text
                 messages = prompt["messages"]
+                if messages and messages[0].get("cacheable"):
+                    model = self._get_cached_model(messages[0]["content"])
+                    if model is not None:
+                        messages = messages[1:]
                 content = '\n\n'.join([msg["content"] for msg in messages if msg["content"]])
             else:
                 content = prompt
         else:
             content = prompt
-            
+
+        if model is None:
+            model = genai.GenerativeModel(self.model_name)
+
         response = model.generate_content(
             content,
             safety_settings={
@@ -62,6 +89,59 @@ class Gemini(BaseModel):
         except Exception as e:
             print(f"Gemini Response error: {e}\nResponses{raw_response.candidates}")
 
+    def _extract_usage(self, raw_response):
+        usage = getattr(raw_response, "usage_metadata", None)
+        if usage is None:
+            return None
+        return {
+            "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+            "completion_tokens": getattr(usage, "candidates_token_count", 0) or 0,
+            "cached_tokens": getattr(usage, "cached_content_token_count", 0) or 0,
+        }
+
+    def _get_cached_model(self, prefix):
+        """
+        Return a GenerativeModel bound to cached content for the given prefix, or None.
+
+        Gemini rejects cached content below a minimum token count (and some models do not
+        support it), so failed creations are remembered for the TTL to avoid retrying on
+        every call. The prefix is then sent inline as usual.
+        """
+        key = (self.model_name, hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+        cached = self._lookup_cached_content(key)
+        if cached is _STALE:
+            # Creation is a network call: serialize it per prefix only, so other prefixes are not blocked
+            with self._cache_lock:
+                key_lock = self._cache_key_locks.setdefault(key, threading.Lock())
+            with key_lock:
+                cached = self._lookup_cached_content(key)
+                if cached is _STALE:
+                    cached = self._create_cached_content(prefix)
+                    with self._cache_lock:
+                        self._cached_contents[key] = (cached, time.time() + max(self.cache_ttl_seconds - 60, 1))
+        if cached is None:
+            return None
+        try:
+            return genai.GenerativeModel.from_cached_content(cached_content=cached)
+        except Exception:
+            return None
+
+    def _lookup_cached_content(self, key):
+        with self._cache_lock:
+            cached, expires_at = self._cached_contents.get(key, (None, 0))
+        return cached if expires_at > time.time() else _STALE
+
+    def _create_cached_content(self, prefix):
+        try:
+            from google.generativeai import caching
+            return caching.CachedContent.create(
+                model=self.model_name,
+                system_instruction=prefix,
+                ttl=datetime.timedelta(seconds=self.cache_ttl_seconds),
+            )
+        except Exception:
+            return None
+
 
 class GeminiVision(VisionMixin, Gemini):
     """
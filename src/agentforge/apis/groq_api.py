@@ -1,15 +1,28 @@
 import os
 from .base_api import BaseModel
+from agentforge.utils.token_accounting import usage_from_openai_format
 from groq import Groq
 # from agentforge.utils.Logger import Logger
 
 api_key = os.getenv("GROQ_API_KEY")
-client = Groq(api_key=api_key)
+_client = None
+
+
+def get_client():
+    """Return the shared Groq client, creating it on first use rather than at import."""
+    global _client
+    if _client is None:
+        _client = Groq(api_key=api_key)
+    return _client
+
 
 class GroqAPI(BaseModel):
 
+    def warm_up(self):
+        get_client()
+
     def _do_api_call(self, prompt, **filtered_params):
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model=self.model_name,
             messages=prompt,
             **filtered_params
@@ -18,3 +31,6 @@ class GroqAPI(BaseModel):
 
     def _process_response(self, raw_response):
         return raw_response.choices[0].message.content
+
+    def _extract_usage(self, raw_response):
+        return usage_from_openai_format(raw_response)
@@ -1,9 +1,11 @@
 import requests
 import json
 from .base_api import BaseModel
+from agentforge.utils.token_accounting import usage_from_openai_format
+from agentforge.apis.mixins.pooled_http_mixin import PooledHTTPMixin
 from agentforge.apis.mixins.vision_mixin import VisionMixin
 
-class LMStudio(BaseModel):
+class LMStudio(PooledHTTPMixin, BaseModel):
     """
     Concrete implementation for OpenAI GPT models.
     """
@@ -19,7 +21,7 @@ class LMStudio(BaseModel):
             **filtered_params
         }
 
-        response = requests.post(url, headers=headers, json=data)
+        response = self._post(url, headers=headers, json=data)
 
         if response.status_code != 200:
             # return error content
@@ -31,6 +33,9 @@ class LMStudio(BaseModel):
     def _process_response(self, raw_response):
         return raw_response["choices"][0]["message"]["content"]
 
+    def _extract_usage(self, raw_response):
+        return usage_from_openai_format(raw_response)
+
 
 class LMStudioVision(VisionMixin, LMStudio):
     supported_modalities = {"text", "image"}
@@ -0,0 +1,49 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class PooledHTTPMixin:
+    """Mixin giving local-server wrappers a shared, pooled HTTP session.
+
+    Local inference servers (vLLM, Ollama with parallel slots, LM Studio) handle many
+    concurrent requests well, but opening a fresh connection per call wastes most of
+    that. Every subclass gets one ``requests.Session`` whose connection pool is sized
+    to ``batch_concurrency`` so that ``generate_batch`` can keep all slots busy over
+    keep-alive connections.
+    """
+
+    # Local servers batch concurrent requests internally, so allow more in flight
+    batch_concurrency = 16
+
+    _session = None
+    _session_lock = threading.Lock()
+
+    # ---------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """Return the pooled session for this class, creating it on first use."""
+        session = cls.__dict__.get("_session")
+        if session is not None:
+            return session
+
+        with cls._session_lock:
+            session = cls.__dict__.get("_session")
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=cls.batch_concurrency)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                cls._session = session
+        return session
+
+    def warm_up(self):
+        """Create the pooled session ahead of the first request."""
+        self._get_session()
+
+    def _post(self, url, **kwargs) -> requests.Response:
+        """POST through the pooled session."""
+        return self._get_session().post(url, **kwargs)
@@ -1,8 +1,9 @@
 import requests
 import json
 from .base_api import BaseModel
+from agentforge.apis.mixins.pooled_http_mixin import PooledHTTPMixin
 
-class Ollama(BaseModel):
+class Ollama(PooledHTTPMixin, BaseModel):
 
     @staticmethod
     def _prepare_prompt(model_prompt):
@@ -18,7 +19,7 @@ class Ollama(BaseModel):
             **filtered_params
         }
 
-        response = requests.post(url, headers=headers, json=data)
+        response = self._post(url, headers=headers, json=data)
 
         if response.status_code != 200:
             # return error content
@@ -40,3 +41,12 @@ class Ollama(BaseModel):
         else:
             self.logger.error(f"Unexpected Ollama response format: {raw_response}")
             return None
+
+    def _extract_usage(self, raw_response):
+        # Ollama reports token counts as prompt_eval_count / eval_count
+        if not raw_response or "prompt_eval_count" not in raw_response:
+            return None
+        return {
+            "prompt_tokens": raw_response.get("prompt_eval_count", 0) or 0,
+            "completion_tokens": raw_response.get("eval_count", 0) or 0,
+        }
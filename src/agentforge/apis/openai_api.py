@@ -11,20 +11,31 @@ class _OpenAIBaseModel(BaseModel):
         super().__init__(model_name, **kwargs)
         self.runtime = OpenAIRuntime()
 
+    def warm_up(self):
+        self.runtime._get_sdk_client()
+
 
 class GPT(_OpenAIBaseModel):
-    """Concrete implementation for OpenAI GPT models."""
+    """
+    Concrete implementation for OpenAI GPT models.
+
+    OpenAI caches prompt prefixes automatically, so cacheable sections only need to come
+    first in the system message, which PromptProcessor already guarantees.
+    """
 
     def _do_api_call(self, prompt, **filtered_params):
         messages = prompt["messages"] if isinstance(prompt, dict) and "messages" in prompt else prompt
-        return self.runtime.chat_completions(
+        return self.runtime.chat_completions_response(
             model=self.model_name,
             messages=messages,
             params=filtered_params,
         )
 
     def _process_response(self, raw_response):
-        return raw_response
+        return self.runtime.extract_content(raw_response)
+
+    def _extract_usage(self, raw_response):
+        return self.runtime.extract_usage(raw_response)
 
 
 class O1Series(GPT):
@@ -80,6 +91,10 @@ class TTS(AudioOutputMixin, _OpenAIBaseModel):
 class Codex(_OpenAIBaseModel):
     """OpenAI Codex wrapper using OAuth-backed responses transport."""
 
+    def warm_up(self):
+        # Codex talks to the responses endpoint over OAuth, not through the SDK client
+        return None
+
     def _do_api_call(self, prompt, **filtered_params):
         messages = prompt["messages"] if isinstance(prompt, dict) and "messages" in prompt else prompt
         return self.runtime.codex_responses(
@@ -7,6 +7,7 @@ import requests
 
 from .base_api import NonRetriableModelError
 from agentforge.auth.codex_oauth import get_codex_credentials
+from agentforge.utils.token_accounting import usage_from_openai_format
 
 try:
     from openai import OpenAI
@@ -50,12 +51,16 @@ class OpenAIRuntime:
         return self._sdk_client
 
     def chat_completions(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
-        response = self._get_sdk_client().chat.completions.create(
+        response = self.chat_completions_response(model, messages, params)
+        return self.extract_content(response)
+
+    def chat_completions_response(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Any:
+        """Return the raw SDK response so callers can read metadata such as usage."""
+        return self._get_sdk_client().chat.completions.create(
             model=model,
             messages=messages,
             **params,
         )
-        return self._extract_chat_content(response)
 
     def stt(self, model: str, audio_blob: Any, params: Dict[str, Any]) -> str:
         if audio_blob is None:
@@ -163,7 +168,13 @@ class OpenAIRuntime:
         return self._parse_codex_sse(response)
 
     @staticmethod
-    def _extract_chat_content(response: Any) -> str:
+    def extract_usage(response: Any) -> Optional[Dict[str, int]]:
+        """Return prompt/completion/cached token counts from a chat completion response."""
+        return usage_from_openai_format(response)
+
+    @staticmethod
+    def extract_content(response: Any) -> str:
+        """Return the text of the first choice of a chat completion response."""
         try:
             content = response.choices[0].message.content
         except Exception:
@@ -2,6 +2,7 @@ import os
 import time
 import requests
 from .base_api import BaseModel
+from agentforge.utils.token_accounting import usage_from_openai_format
 from agentforge.utils.logger import Logger
 
 # Get the API key from the environment variable
@@ -59,3 +60,6 @@ class OpenRouter(BaseModel):
             self.logger.error(f"Unexpected response format: {e}")
             return None
 
+    def _extract_usage(self, raw_response):
+        return usage_from_openai_format(raw_response)
+
@@ -0,0 +1,81 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# Anthropic cache breakpoint marker attached to the last cacheable system block
+EPHEMERAL_CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def split_cache_prefix(model_prompt: Optional[Dict[str, Any]]) -> Tuple[Optional[str], str]:
+    """
+    Split a rendered prompt's system text into its cacheable prefix and the remainder.
+
+    ``PromptProcessor.render_prompts`` places cacheable sections first and records them
+    under ``cache_prefix``, so the system prompt always starts with that prefix.
+
+    Returns:
+        Tuple[Optional[str], str]: The prefix (None when nothing is cacheable) and the rest.
+    """
+    model_prompt = model_prompt or {}
+    system = model_prompt.get("system") or ""
+    prefix = model_prompt.get("cache_prefix")
+    if not prefix or not system.startswith(prefix):
+        return None, system
+    return prefix, system[len(prefix):].lstrip("\n")
+
+
+class PromptCacheStats:
+    """
+    Process-wide counters for provider prompt-cache usage, keyed by model name.
+
+    A request counts as a hit when the provider reports any cached input tokens, and as a
+    miss otherwise. Token totals are kept alongside so hit ratios can be weighed by size.
+    """
+
+    _stats: Dict[str, Dict[str, int]] = {}
+    _lock = threading.Lock()
+    _logger = None
+
+    @classmethod
+    def record(cls, model_name: str, usage: Dict[str, int]) -> None:
+        """
+        Record the cache usage reported for one response.
+
+        Args:
+            model_name (str): The model the request was sent to.
+            usage (dict): ``cached_tokens``, ``prompt_tokens`` and optional ``cache_write_tokens``.
+        """
+        cached = int(usage.get("cached_tokens") or 0)
+        prompt = int(usage.get("prompt_tokens") or 0)
+        written = int(usage.get("cache_write_tokens") or 0)
+
+        with cls._lock:
+            entry = cls._stats.setdefault(model_name, {
+                "hits": 0, "misses": 0, "cached_tokens": 0, "cache_write_tokens": 0, "prompt_tokens": 0,
+            })
+            entry["hits" if cached else "misses"] += 1
+            entry["cached_tokens"] += cached
+            entry["cache_write_tokens"] += written
+            entry["prompt_tokens"] += prompt
+
+        cls._get_logger().debug(
+            "Prompt cache %s for '%s': cached=%d written=%d prompt=%d", 'model_io',
+            args=('hit' if cached else 'miss', model_name, cached, written, prompt),
+        )
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict[str, int]]:
+        """Return a copy of the per-model counters."""
+        with cls._lock:
+            return {model: dict(entry) for model, entry in cls._stats.items()}
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._stats.clear()
+
+    @classmethod
+    def _get_logger(cls):
+        if cls._logger is None:
+            from agentforge.utils.logger import Logger
+            cls._logger = Logger(name="PromptCache", default_logger="model_io")
+        return cls._logger
@@ -1,9 +1,11 @@
 import requests
 import json
 from .base_api import BaseModel
+from agentforge.utils.token_accounting import usage_from_openai_format
+from agentforge.apis.mixins.pooled_http_mixin import PooledHTTPMixin
 
 
-class VLLM(BaseModel):
+class VLLM(PooledHTTPMixin, BaseModel):
     """
     Implementation for vLLM hosted models via OpenAI-compatible API.
     """
@@ -47,7 +49,7 @@ class VLLM(BaseModel):
             data['extra_body'] = extra_params
 
         # Make the API call
-        response = requests.post(url, headers=headers, json=data)
+        response = self._post(url, headers=headers, json=data)
 
         if response.status_code != 200:
             self.logger.error(f"Request error: {response.status_code} - {response.text}")
@@ -58,3 +60,6 @@ class VLLM(BaseModel):
     def _process_response(self, raw_response):
         """Extract the content from vLLM's OpenAI-compatible response."""
         return raw_response["choices"][0]["message"]["content"]
+
+    def _extract_usage(self, raw_response):
+        return usage_from_openai_format(raw_response)
@@ -0,0 +1,552 @@
+"""
+Command-line interface for AgentForge.
+
+Installed as the ``agentforge`` console script. Provides operational subcommands for
+running, benchmarking, profiling and warming cogs, and for inspecting storage:
+
+    agentforge run <cog> [-i key=value ...]
+    agentforge bench <cog> --inputs file.jsonl [--concurrency N] [--repeat N]
+    agentforge profile <cog> [--profiler cprofile|pyinstrument] [--output FILE]
+    agentforge warm [<cog> ...] [--storage-id ID ...] [--snapshot]
+    agentforge storage stats [--storage-id ID ...]
+    agentforge storage compact <collection> [--storage-id ID] [--retention-days N]
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from agentforge.cog import Cog
+from agentforge.config import CONFIG_SNAPSHOT_ENV, Config
+from agentforge.utils.token_accounting import TokenAccountant
+
+
+# ---------------------------------
+# Helpers
+# ---------------------------------
+
+def _find_root(start: Path) -> Optional[str]:
+    """Return the nearest directory at or above ``start`` containing ``.agentforge``."""
+    for candidate in (start, *start.parents):
+        if (candidate / ".agentforge").is_dir():
+            return str(candidate)
+    return None
+
+
+def _init_config(root: Optional[str]) -> Config:
+    """
+    Load the Config singleton for the CLI.
+
+    Config discovers the project from the running script's location, which for an
+    installed console script is the interpreter's bin directory. The CLI resolves the
+    root from ``--root``, then ``AGENTFORGE_ROOT``, then the working directory upwards.
+    """
+    if root is None and not os.getenv("AGENTFORGE_ROOT"):
+        root = _find_root(Path.cwd())
+    return Config(root_path=root)
+
+
+def _parse_inputs(pairs: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Turn ``key=value`` arguments into cog kwargs; values are parsed as JSON when possible."""
+    inputs = {}
+    for pair in pairs or ():
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            raise ValueError(f"Inputs must be given as key=value, got '{pair}'.")
+        try:
+            inputs[key] = json.loads(value)
+        except json.JSONDecodeError:
+            inputs[key] = value
+    return inputs
+
+
+def _read_jsonl(path: str) -> List[Dict[str, Any]]:
+    """Read one JSON object of cog kwargs per non-blank line."""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}:{line_no}: each line must be a JSON object of cog inputs.")
+            records.append(record)
+    return records
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def _usage_delta(before: Dict[str, Dict[str, int]], after: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    """Per-key difference between two TokenAccountant groupings, dropping unchanged keys."""
+    delta = {}
+    for key, totals in after.items():
+        previous = before.get(key, {})
+        diff = {field: value - previous.get(field, 0) for field, value in totals.items()}
+        if diff.get("calls"):
+            delta[key] = diff
+    return delta
+
+
+def _print_table(headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(h)), *(len(r[i]) for r in rows)) if rows else len(str(h)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(cell.ljust(w) for cell, w in zip(row, widths)))
+
+
+class AgentTimings:
+    """
+    Accumulates wall time and call counts per agent id by wrapping a cog's AgentRunner.
+    Retries inside AgentRunner are included in the agent's time.
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, agent_id: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.totals.setdefault(agent_id, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+
+    @contextmanager
+    def attach(self, cog: Cog):
+        runner = cog.agent_runner
+        original = runner.run_agent
+
+        def timed_run_agent(agent_id, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(agent_id, *args, **kwargs)
+            finally:
+                self.add(agent_id, time.perf_counter() - start)
+
+        runner.run_agent = timed_run_agent
+        try:
+            yield self
+        finally:
+            runner.run_agent = original
+
+    def rows(self, total_seconds: float) -> List[List[str]]:
+        rows = []
+        for agent_id, entry in sorted(self.totals.items(), key=lambda item: -item[1]["seconds"]):
+            share = entry["seconds"] / total_seconds * 100 if total_seconds else 0.0
+            rows.append([
+                agent_id, int(entry["calls"]), f"{entry['seconds']:.3f}",
+                f"{entry['seconds'] / entry['calls']:.3f}", f"{share:.1f}%",
+            ])
+        return rows
+
+
+def _print_agent_breakdown(timings: AgentTimings, run_seconds: float, usage: Dict[str, Dict[str, int]]) -> None:
+    print("\nPer-agent timing:")
+    _print_table(["agent", "calls", "total_s", "mean_s", "share"], timings.rows(run_seconds))
+    if usage:
+        print("\nToken usage by agent:")
+        _print_table(
+            ["agent", "calls", "prompt", "completion", "estimated_calls"],
+            [[name, u["calls"], u["prompt_tokens"], u["completion_tokens"], u["estimated_calls"]]
+             for name, u in sorted(usage.items())],
+        )
+
+
+# ---------------------------------
+# Commands
+# ---------------------------------
+
+def _cmd_run(args) -> int:
+    start = time.perf_counter()
+    _init_config(args.root)
+    config_loaded = time.perf_counter()
+    cog = Cog(args.cog)
+    cog_built = time.perf_counter()
+
+    timings = AgentTimings()
+    usage_before = TokenAccountant.snapshot()["agents"]
+    with timings.attach(cog):
+        run_start = time.perf_counter()
+        result = cog.run(**_parse_inputs(args.input))
+        run_seconds = time.perf_counter() - run_start
+    usage = _usage_delta(usage_before, TokenAccountant.snapshot()["agents"])
+
+    phases = {
+        "config_load": config_loaded - start,
+        "cog_build": cog_built - config_loaded,
+        "run": run_seconds,
+    }
+    if args.json:
+        print(json.dumps({
+            "result": result, "timings": phases, "agents": timings.totals,
+            "usage": cog.last_run_usage, "usage_by_agent": usage,
+        }, indent=2, default=str))
+        return 0
+
+    print(result if isinstance(result, str) else json.dumps(result, indent=2, default=str))
+    print("\nTiming:")
+    _print_table(["phase", "seconds"], [[name, f"{value:.3f}"] for name, value in phases.items()])
+    _print_agent_breakdown(timings, run_seconds, usage)
+    if cog.last_run_usage:
+        print(f"\nRun tokens: {cog.last_run_usage.get('total_tokens', 0)} "
+              f"over {cog.last_run_usage.get('calls', 0)} model call(s)")
+    return 0
+
+
+def run_benchmark(cog_name: str, inputs: List[Dict[str, Any]], concurrency: int = 1) -> Dict[str, Any]:
+    """
+    Run a cog once per input with up to ``concurrency`` runs in flight and summarise latency.
+
+    Cog instances keep per-run state, so one instance is built per worker up front and
+    handed out through a pool; build time is reported separately from run latency.
+    """
+    concurrency = max(1, min(concurrency, len(inputs) or 1))
+    build_start = time.perf_counter()
+    pool: "queue.Queue[Cog]" = queue.Queue()
+    for _ in range(concurrency):
+        pool.put(Cog(cog_name))
+    build_seconds = time.perf_counter() - build_start
+
+    def run_one(kwargs):
+        cog = pool.get()
+        start = time.perf_counter()
+        try:
+            cog.run(**kwargs)
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, f"{type(e).__name__}: {e}"
+        finally:
+            pool.put(cog)
+
+    usage_before = TokenAccountant.snapshot()["models"]
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(run_one, inputs))
+    wall_seconds = time.perf_counter() - wall_start
+    usage = _usage_delta(usage_before, TokenAccountant.snapshot()["models"])
+
+    latencies = sorted(seconds for seconds, error in outcomes if error is None)
+    errors = [error for _, error in outcomes if error is not None]
+    return {
+        "cog": cog_name,
+        "runs": len(outcomes),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "concurrency": concurrency,
+        "build_seconds": build_seconds,
+        "wall_seconds": wall_seconds,
+        "throughput_per_s": len(outcomes) / wall_seconds if wall_seconds else 0.0,
+        "latency_s": {
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+        "tokens": {
+            "prompt": sum(u["prompt_tokens"] for u in usage.values()),
+            "completion": sum(u["completion_tokens"] for u in usage.values()),
+            "calls": sum(u["calls"] for u in usage.values()),
+        },
+    }
+
+
+def _cmd_bench(args) -> int:
+    _init_config(args.root)
+    inputs = _read_jsonl(args.inputs) * args.repeat
+    if not inputs:
+        raise ValueError(f"No inputs found in '{args.inputs}'.")
+
+    report = run_benchmark(args.cog, inputs, args.concurrency)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        latency = report["latency_s"]
+        print(f"Cog '{report['cog']}': {report['runs']} run(s), {report['errors']} error(s), "
+              f"concurrency {report['concurrency']}")
+        _print_table(["metric", "value"], [
+            ["build_s", f"{report['build_seconds']:.3f}"],
+            ["wall_s", f"{report['wall_seconds']:.3f}"],
+            ["throughput/s", f"{report['throughput_per_s']:.2f}"],
+            *[[f"latency_{k}_s", f"{v:.3f}"] for k, v in latency.items()],
+            ["model_calls", report["tokens"]["calls"]],
+            ["prompt_tokens", report["tokens"]["prompt"]],
+            ["completion_tokens", report["tokens"]["completion"]],
+        ])
+        for sample in report["error_samples"]:
+            print(f"error: {sample}", file=sys.stderr)
+    return 1 if report["errors"] == report["runs"] else 0
+
+
+def _cmd_profile(args) -> int:
+    _init_config(args.root)
+    cog = Cog(args.cog)
+    inputs = _parse_inputs(args.input)
+
+    if args.profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument is not installed; install it or use --profiler cprofile.", file=sys.stderr)
+            return 2
+        profiler = Profiler()
+        start_profiler, stop_profiler = profiler.start, profiler.stop
+    else:
+        profiler = cProfile.Profile()
+        start_profiler, stop_profiler = profiler.enable, profiler.disable
+
+    timings = AgentTimings()
+    usage_before = TokenAccountant.snapshot()["agents"]
+    with timings.attach(cog):
+        run_start = time.perf_counter()
+        start_profiler()
+        try:
+            cog.run(**inputs)
+        finally:
+            stop_profiler()
+        run_seconds = time.perf_counter() - run_start
+    usage = _usage_delta(usage_before, TokenAccountant.snapshot()["agents"])
+
+    print(f"Cog '{args.cog}' ran in {run_seconds:.3f}s")
+    _print_agent_breakdown(timings, run_seconds, usage)
+    print()
+
+    if args.profiler == "cprofile":
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats(args.sort).print_stats(args.limit)
+        if args.output:
+            profiler.dump_stats(args.output)
+    else:
+        print(profiler.output_text(unicode=True, color=False))
+        if args.output:
+            Path(args.output).write_text(profiler.output_html(), encoding="utf-8")
+    if args.output:
+        print(f"Profile written to {args.output}")
+    return 0
+
+
+def warm(cog_names: Sequence[str] = (), storage_ids: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Preload what a process needs before serving its first request.
+
+    Builds each cog (loading agent configs, model wrappers and memory storage), creates
+    each model's client, and loads the embedding model of every storage touched by
+    calling it once. Call from a long-lived host at startup to keep cold-start work off
+    the first request; the CLI command also fills on-disk caches (downloaded embedding
+    weights, the config snapshot) for the processes that follow.
+
+    Returns:
+        list: One ``{"step", "seconds", "error"}`` entry per warm-up step.
+    """
+    from agentforge.storage.chroma_storage import ChromaStorage
+
+    steps = []
+
+    def step(name, func):
+        start = time.perf_counter()
+        error = None
+        try:
+            func()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        steps.append({"step": name, "seconds": time.perf_counter() - start, "error": error})
+
+    for cog_name in cog_names:
+        built = {}
+        step(f"cog:{cog_name}", lambda: built.setdefault("cog", Cog(cog_name)))
+        if "cog" not in built:
+            continue
+        for agent_id, agent in built["cog"].agents.items():
+            model = getattr(agent, "model", None)
+            if model is not None:
+                step(f"model:{agent_id}:{model.model_name}", model.warm_up)
+
+    for storage_id in storage_ids:
+        step(f"storage:{storage_id}", lambda: ChromaStorage.get_or_create(storage_id))
+
+    for storage_id, storage in list(ChromaStorage._registry.items()):
+        step(f"embeddings:{storage_id}", lambda: storage.return_embedding("warm-up"))
+
+    return steps
+
+
+def _cmd_warm(args) -> int:
+    if args.snapshot:
+        # Must be set before Config loads so the snapshot is written on this load
+        os.environ.setdefault(CONFIG_SNAPSHOT_ENV, "1")
+
+    start = time.perf_counter()
+    config = _init_config(args.root)
+    steps = [{"step": "config", "seconds": time.perf_counter() - start, "error": None}]
+    steps.extend(warm(args.cogs, args.storage_id))
+
+    _print_table(["step", "seconds", "status"], [
+        [s["step"], f"{s['seconds']:.3f}", s["error"] or "ok"] for s in steps
+    ])
+    snapshot_path = config._get_config_snapshot_path()
+    if snapshot_path is not None:
+        print(f"\nConfig snapshot: {snapshot_path}")
+    return 1 if any(s["error"] for s in steps) else 0
+
+
+def storage_stats(storage_ids: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Report collection sizes and vector index health for each persisted storage.
+
+    Reads the persist directory directly (see ``chroma_recover.inspect_storage``), so no
+    Chroma client or embedding model is loaded. Defaults to every storage found on disk.
+    """
+    from agentforge.storage.chroma_recover import inspect_storage
+
+    config = Config()
+    persist_directory = config.settings.storage["options"].get("persist_directory")
+    if not persist_directory:
+        raise ValueError("storage.options.persist_directory is not set.")
+    root = config.project_root / persist_directory
+
+    if not storage_ids:
+        storage_ids = sorted(p.name for p in root.iterdir() if p.is_dir()) if root.is_dir() else []
+
+    report = []
+    for storage_id in storage_ids:
+        db_path = root / storage_id
+        sqlite_path = db_path / "chroma.sqlite3"
+        report.append({
+            "storage_id": storage_id,
+            "path": str(db_path),
+            "sqlite_bytes": sqlite_path.stat().st_size if sqlite_path.exists() else 0,
+            "collections": inspect_storage(str(db_path)),
+        })
+    return report
+
+
+def _cmd_storage_stats(args) -> int:
+    _init_config(args.root)
+    report = storage_stats(args.storage_id)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    if not report:
+        print("No storage found.")
+        return 0
+
+    for storage in report:
+        collections = storage["collections"]
+        print(f"\n{storage['storage_id']} ({storage['path']}, sqlite {storage['sqlite_bytes']} bytes)")
+        if not collections:
+            print("  no collections")
+            continue
+        _print_table(["collection", "records", "index_bytes", "status"], [
+            [c["collection"], c["records"], c["index_bytes"], c["status"]] for c in collections
+        ])
+    unhealthy = [c for s in report for c in s["collections"] if c["status"] in ("missing_segment", "incomplete_index")]
+    return 1 if unhealthy else 0
+
+
+def _cmd_storage_compact(args) -> int:
+    from agentforge.storage.chroma_storage import ChromaStorage
+    from agentforge.storage.fact_index import FactIndex
+    from agentforge.storage.persona_memory import compact_superseded_facts
+
+    config = _init_config(args.root)
+    retention_days = args.retention_days
+    if retention_days is None:
+        retention_days = config.settings.system.persona.superseded_retention_days
+    storage = ChromaStorage.get_or_create(storage_id=args.storage_id)
+    removed = compact_superseded_facts(storage, args.collection, retention_days * 86400,
+                                       FactIndex.for_collection(storage, args.collection))
+    print(f"Removed {removed} superseded fact(s) from '{args.collection}' "
+          f"(older than {retention_days:g} days).")
+    return 0
+
+
+# ---------------------------------
+# Entry point
+# ---------------------------------
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="agentforge", description="Run, benchmark and inspect AgentForge projects.")
+    parser.add_argument("--root", help="Project root containing .agentforge (defaults to AGENTFORGE_ROOT or the "
+                                       "nearest parent of the working directory).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    input_help = "Cog input as key=value; values are parsed as JSON when possible. May be repeated."
+
+    run = subparsers.add_parser("run", help="Run a cog once and report timings.")
+    run.add_argument("cog", help="Name of the cog to run.")
+    run.add_argument("-i", "--input", action="append", metavar="KEY=VALUE", help=input_help)
+    run.add_argument("--json", action="store_true", help="Print the result and timings as JSON.")
+    run.set_defaults(func=_cmd_run)
+
+    bench = subparsers.add_parser("bench", help="Run a cog over a JSONL file of inputs and report latency.")
+    bench.add_argument("cog", help="Name of the cog to benchmark.")
+    bench.add_argument("--inputs", required=True, help="JSONL file with one object of cog inputs per line.")
+    bench.add_argument("--concurrency", type=int, default=1, help="Runs in flight at once (default: 1).")
+    bench.add_argument("--repeat", type=int, default=1, help="Number of passes over the inputs (default: 1).")
+    bench.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    bench.set_defaults(func=_cmd_bench)
+
+    profile = subparsers.add_parser("profile", help="Profile one cog run with a per-agent breakdown.")
+    profile.add_argument("cog", help="Name of the cog to profile.")
+    profile.add_argument("-i", "--input", action="append", metavar="KEY=VALUE", help=input_help)
+    profile.add_argument("--profiler", choices=["cprofile", "pyinstrument"], default="cprofile")
+    profile.add_argument("--sort", default="cumulative", help="pstats sort key for cProfile output.")
+    profile.add_argument("--limit", type=int, default=30, help="Number of cProfile rows to print.")
+    profile.add_argument("--output", help="Write the raw profile (cProfile .prof or pyinstrument .html).")
+    profile.set_defaults(func=_cmd_profile)
+
+    warm_cmd = subparsers.add_parser("warm", help="Preload configs, model clients and embedding models.")
+    warm_cmd.add_argument("cogs", nargs="*", help="Cogs whose agents, models and storage should be warmed.")
+    warm_cmd.add_argument("--storage-id", action="append", default=[], help="Extra storage ids to open and warm.")
+    warm_cmd.add_argument("--snapshot", action="store_true",
+                          help=f"Write the config snapshot (same as setting {CONFIG_SNAPSHOT_ENV}=1).")
+    warm_cmd.set_defaults(func=_cmd_warm)
+
+    storage = subparsers.add_parser("storage", help="Storage inspection commands.")
+    storage_sub = storage.add_subparsers(dest="storage_command", required=True)
+    stats = storage_sub.add_parser("stats", help="Show collection sizes and vector index health.")
+    stats.add_argument("--storage-id", action="append", default=[], help="Limit to these storage ids.")
+    stats.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    stats.set_defaults(func=_cmd_storage_stats)
+    compact = storage_sub.add_parser("compact", help="Delete superseded persona facts older than the retention window.")
+    compact.add_argument("collection", help="Persona facts collection to compact.")
+    compact.add_argument("--storage-id", default="default", help="Storage holding the collection (default: default).")
+    compact.add_argument("--retention-days", type=float,
+                         help="Keep superseded facts newer than this (default: system.persona.superseded_retention_days).")
+    compact.set_defaults(func=_cmd_storage_compact)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        print("Interrupted.", file=sys.stderr)
+        return 130
+    except Exception as exc:
+        print(f"agentforge {args.command}: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,8 @@ from agentforge.core.transition_resolver import TransitionResolver
 from agentforge.utils.logger import Logger
 from agentforge.utils.parsing_processor import ParsingProcessor
 from agentforge.core.trail_recorder import TrailRecorder
+from agentforge.utils.token_accounting import TokenAccountant
+from agentforge.utils.tracing import Tracing, is_recording, span
 
 
 class Cog:
@@ -50,6 +52,7 @@ class Cog:
         # Initialize execution state
         self.last_executed_agent: Optional[str] = None
         self.branch_call_counts: dict = {}
+        self.last_run_usage: dict = {}
         self._reset_execution_state()
 
     # ---------------------------------
@@ -93,19 +96,33 @@ class Cog:
                 - If 'end: <agent_id>', returns the output of that specific agent
                 - If 'end: <agent_id>.field.subfield', returns that nested value
                 - Otherwise, returns the full internal state
-        """
-        try:
-            self.logger.info(f"Running cog '{self.cog_file}'...")
-            # Load chat history with the initial user context so semantic search can use it
-            self.mem_mgr.load_chat(_ctx=kwargs, _state={})
-            self._execute_workflow(**kwargs)
-            result = self._process_execution_result()
-            self.logger.info(f"Cog '{self.cog_file}' completed successfully!")
-            self.mem_mgr.record_chat(self.context, result)
-            return result
-        except Exception as e:
-            self.logger.error(f"Cog execution failed: {e}")
-            raise
+
+        Token usage for every model call made during the run is available afterwards
+        in ``last_run_usage``. When ``system.tracing`` is enabled the run is also
+        recorded as a trace (see ``agentforge.utils.tracing``).
+        """
+        with TokenAccountant.track_run(self.cog_file) as run_id:
+            try:
+                with Tracing.start_trace(f"cog {self.cog_file}", self.config.settings.system.tracing,
+                                         **{"cog.name": self.cog_file, "cog.run_id": run_id}) as trace:
+                    self.logger.info(f"Running cog '{self.cog_file}'...")
+                    # Load chat history with the initial user context so semantic search can use it
+                    with span("memory.load_chat"):
+                        self.mem_mgr.load_chat(_ctx=kwargs, _state={})
+                    self._execute_workflow(**kwargs)
+                    result = self._process_execution_result()
+                    self.logger.info(f"Cog '{self.cog_file}' completed successfully!")
+                    with span("memory.record_chat"):
+                        self.mem_mgr.record_chat(self.context, result)
+                    if is_recording():
+                        trace.set_attribute("tokens.total", TokenAccountant.run_totals(run_id)["total_tokens"])
+                    return result
+            except Exception as e:
+                self.logger.error(f"Cog execution failed: {e}")
+                raise
+            finally:
+                self.mem_mgr.end_run(run_id)
+                self.last_run_usage = TokenAccountant.pop_run(run_id)
 
     def get_track_flow_trail(self) -> List[ThoughtTrailEntry]:
         """
@@ -185,17 +202,18 @@ class Cog:
         Returns:
             The ID of the next agent to execute, or None if flow should end
         """
-        # Handle pre-execution operations
-        self._prepare_agent_execution(agent_id)
-        
-        # Execute the agent
-        agent_output = self._execute_agent(agent_id)
-        
-        # Handle post-execution operations
-        self._finalize_agent_execution(agent_id, agent_output)
-        
-        # Determine next agent in flow
-        return self._determine_next_agent(agent_id)
+        with span("agent.cycle", **{"agent.id": agent_id}):
+            # Handle pre-execution operations
+            self._prepare_agent_execution(agent_id)
+
+            # Execute the agent
+            agent_output = self._execute_agent(agent_id)
+
+            # Handle post-execution operations
+            self._finalize_agent_execution(agent_id, agent_output)
+
+            # Determine next agent in flow
+            return self._determine_next_agent(agent_id)
 
     def _determine_next_agent(self, current_agent_id: str) -> Optional[str]:
         """
@@ -207,7 +225,9 @@ class Cog:
         Returns:
             The ID of the next agent, or None if flow should end
         """
-        next_agent_id = self.transition_resolver.get_next_agent(current_agent_id, self.state)
+        with span("flow.transition", **{"agent.id": current_agent_id}) as transition:
+            next_agent_id = self.transition_resolver.get_next_agent(current_agent_id, self.state)
+            transition.set_attribute("flow.next_agent", next_agent_id)
         self.logger.log(f"Next agent: {next_agent_id}", "debug", "Flow")
         if next_agent_id != current_agent_id:
             self._reset_branch_counts()
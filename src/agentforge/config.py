@@ -1,5 +1,8 @@
+import copy
 import importlib
 import importlib.util
+import pickle
+import tempfile
 import threading
 import os
 import yaml
@@ -7,7 +10,7 @@ import re
 import pathlib
 from pathlib import Path
 import sys
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, List
 from ruamel.yaml import YAML
 from types import ModuleType
 # Optional: load environment variables from a .env file if python-dotenv is available
@@ -20,6 +23,13 @@ except ImportError:  # pragma: no cover
 from .core.config_manager import ConfigManager
 from .config_structs import AgentConfig, CogConfig
 
+# Use libyaml's C loader when PyYAML was built with it
+YAML_SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Set to a file path (or 1/true for .agentforge/.cache/config_snapshot.pickle) to enable the config snapshot
+CONFIG_SNAPSHOT_ENV = 'AGENTFORGE_CONFIG_SNAPSHOT'
+CONFIG_SNAPSHOT_VERSION = 1
+
 
 def load_yaml_file(file_path: str) -> Dict[str, Any]:
     """
@@ -34,7 +44,7 @@ def load_yaml_file(file_path: str) -> Dict[str, Any]:
     """
     try:
         with open(file_path, 'r') as yaml_file:
-            return yaml.safe_load(yaml_file)
+            return yaml.load(yaml_file, Loader=YAML_SAFE_LOADER)
     except FileNotFoundError:
         print(f"File {file_path} not found.")
         return {}
@@ -90,6 +100,10 @@ class Config:
         self.project_root = self.find_project_root(root_candidate)
         self.config_path = self.project_root / ".agentforge"
         self.data = {}
+        self._settings = None
+        self._persona_markdown_cache = {}
+        self._config_index = {}
+        self.duplicate_configs = []
         self.config_manager = ConfigManager()
         self.load_all_configurations()
 
@@ -131,7 +145,7 @@ class Config:
         """
         try:
             with open(file_path, 'r') as yaml_file:
-                return yaml.safe_load(yaml_file)
+                return yaml.load(yaml_file, Loader=YAML_SAFE_LOADER)
         except FileNotFoundError:
             print(f"File {file_path} not found.")
             return {}
@@ -142,19 +156,126 @@ class Config:
     def load_all_configurations(self):
         """
         Recursively loads all configuration data from YAML files under each subdirectory of the .agentforge folder.
+        Also rebuilds the (category, name) index used by find_config. Directories and files are walked top-down in
+        sorted order, so when two files in a category share a name the first one in that order wins.
+
+        When the config snapshot is enabled (see CONFIG_SNAPSHOT_ENV), unchanged files are taken from the
+        snapshot and only new or modified files are parsed.
         """
         with self._lock:
+            snapshot_path = self._get_config_snapshot_path()
+            cached_files = self._read_config_snapshot(snapshot_path) if snapshot_path else {}
+            parsed_files = {}
+            config_index = {}
+            duplicates = []
             for subdir, dirs, files in os.walk(self.config_path):
-                for file in files:
+                dirs.sort()
+                for file in sorted(files):
                     if file.endswith(('.yaml', '.yml')):
                         subdir_path = pathlib.Path(subdir)
                         relative_path = subdir_path.relative_to(self.config_path)
                         nested_dict = self.get_nested_dict(self.data, relative_path.parts)
                         file_path = str(subdir_path / file)
-                        data = self.load_yaml_file(file_path)
+                        data = self._load_config_file(file_path, str(relative_path / file), snapshot_path,
+                                                      cached_files, parsed_files)
                         if data:
                             filename_without_ext = os.path.splitext(file)[0]
                             nested_dict[filename_without_ext] = data
+                            self._index_config(config_index, duplicates, relative_path.parts, filename_without_ext, file_path)
+            self._config_index = config_index
+            self.duplicate_configs = duplicates
+            self.refresh_settings()
+
+            if snapshot_path and self._snapshot_is_stale(cached_files, parsed_files):
+                self._write_config_snapshot(snapshot_path, parsed_files)
+
+        for category, name, kept, ignored in duplicates:
+            print(f"Warning: duplicate {category} config '{name}' - using {kept}, ignoring {ignored}.")
+
+    def _load_config_file(self, file_path: str, relative_file: str, snapshot_path: Optional[pathlib.Path],
+                          cached_files: Dict[str, tuple], parsed_files: Dict[str, tuple]) -> Any:
+        """
+        Returns a YAML file's data, from the snapshot when its mtime and size still match, otherwise parsed.
+        Records (mtime_ns, size, data) for the file in parsed_files.
+        """
+        if snapshot_path is None:
+            return self.load_yaml_file(file_path)
+        try:
+            stat = os.stat(file_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return self.load_yaml_file(file_path)
+
+        cached = cached_files.get(relative_file)
+        if cached is not None and cached[:2] == signature:
+            data = cached[2]
+        else:
+            data = self.load_yaml_file(file_path)
+        parsed_files[relative_file] = signature + (data,)
+        return data
+
+    def _get_config_snapshot_path(self) -> Optional[pathlib.Path]:
+        """Returns the snapshot file path when CONFIG_SNAPSHOT_ENV enables it, otherwise None."""
+        value = os.getenv(CONFIG_SNAPSHOT_ENV, '').strip()
+        if not value or value.lower() in ('0', 'false', 'no', 'off'):
+            return None
+        if value.lower() in ('1', 'true', 'yes', 'on'):
+            return pathlib.Path(self.config_path) / '.cache' / 'config_snapshot.pickle'
+        return pathlib.Path(value)
+
+    @staticmethod
+    def _snapshot_is_stale(cached_files: Dict[str, tuple], parsed_files: Dict[str, tuple]) -> bool:
+        """True if files were added, removed or changed since the snapshot was written."""
+        if len(cached_files) != len(parsed_files):
+            return True
+        return any(cached_files.get(name, (None, None))[:2] != entry[:2] for name, entry in parsed_files.items())
+
+    def _read_config_snapshot(self, snapshot_path: pathlib.Path) -> Dict[str, tuple]:
+        """
+        Loads the per-file entries of a config snapshot. Returns an empty dict if the snapshot is missing,
+        unreadable, from another format version or for another config folder.
+        """
+        try:
+            with open(snapshot_path, 'rb') as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Ignoring unreadable config snapshot {snapshot_path}: {e}")
+            return {}
+        if (not isinstance(snapshot, dict) or snapshot.get('version') != CONFIG_SNAPSHOT_VERSION
+                or snapshot.get('config_path') != str(self.config_path)):
+            return {}
+        return snapshot.get('files', {})
+
+    def _write_config_snapshot(self, snapshot_path: pathlib.Path, parsed_files: Dict[str, tuple]) -> None:
+        """Writes the snapshot atomically so concurrent processes never read a partial file."""
+        snapshot = {'version': CONFIG_SNAPSHOT_VERSION, 'config_path': str(self.config_path), 'files': parsed_files}
+        try:
+            snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=snapshot_path.parent, prefix='.config_snapshot')
+            with os.fdopen(fd, 'wb') as snapshot_file:
+                pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, snapshot_path)
+        except Exception as e:
+            print(f"Could not write config snapshot {snapshot_path}: {e}")
+
+    @staticmethod
+    def _index_config(config_index: Dict[Tuple[str, str], Tuple[Tuple[str, ...], str]], duplicates: List[Tuple[str, str, str, str]],
+                      parts: Tuple[str, ...], name: str, file_path: str) -> None:
+        """
+        Records where a loaded file lives in self.data under its (category, name) key.
+        The category is the top-level folder; files directly under .agentforge are not indexed.
+        """
+        if not parts:
+            return
+        key = (parts[0], name)
+        existing = config_index.get(key)
+        if existing is not None:
+            if existing[1] != file_path:
+                duplicates.append((parts[0], name, existing[1], file_path))
+            return
+        config_index[key] = (tuple(parts) + (name,), file_path)
 
     def save(self):
         """
@@ -176,6 +297,7 @@ class Config:
                         existing_data[key] = value
                     with open(system_yaml_path, 'w') as yaml_file:
                         _yaml.dump(existing_data, yaml_file)
+                    self.refresh_settings()
                     return
                 print("No system settings to save.")
             except Exception as e:
@@ -198,8 +320,11 @@ class Config:
         Returns a structured AgentConfig object containing everything needed to run that agent.
         """
         agent = self.find_config('prompts', agent_name)
-        api_name, class_name, model_name, final_params = self.resolve_model_overrides(agent)
-        model = self.get_model(api_name, class_name, model_name)
+        candidates = self.resolve_model_candidates(agent)
+        final_params = candidates[0][3]
+        model = self.build_model(candidates)
+        cascade = self.resolve_model_cascade(agent)
+        token_budget = self.resolve_token_budget(agent, final_params)
         persona_data = self.load_persona(agent)
         prompts = self.fix_prompt_placeholders(agent.get('prompts', {}))
         settings = self.data.get('settings', {})
@@ -207,16 +332,18 @@ class Config:
         simulated_response = agent.get('simulated_response', default_debug_text).strip()
         raw_agent_data = {
             'name': agent_name,
-            'settings': settings,
+            'settings': self.settings,
             'model': model,
             'params': final_params,
             'persona': persona_data,
             'prompts': prompts,
             'simulated_response': simulated_response,
+            'cascade': cascade,
+            'token_budget': token_budget,
         }
         reserved_fields = {
             'name', 'settings', 'model', 'params', 'persona', 'prompts', 'simulated_response',
-            'model_overrides'
+            'model_overrides', 'cascade', 'token_budget'
         }
         for key, value in agent.items():
             if key not in raw_agent_data and key not in reserved_fields:
@@ -240,10 +367,113 @@ class Config:
         (api_name, class_name, model_identifier, final_params).
         """
         api_name, model_name, agent_params_override = self._get_agent_api_and_model(agent)
+        return self._resolve_model_selection(api_name, model_name, agent_params_override)
+
+    def resolve_model_candidates(self, agent: dict) -> List[Tuple[str, str, str, Dict[str, Any]]]:
+        """
+        Resolves the agent's primary model followed by its ordered fallbacks.
+        Each entry is the same 4-tuple returned by resolve_model_overrides.
+        """
+        candidates = [self.resolve_model_overrides(agent)]
+        agent_params_override = self._get_model_overrides(agent).get('params', {})
+        for fallback in self._get_model_fallbacks(agent):
+            params_override = {**agent_params_override, **fallback.get('params', {})}
+            candidates.append(self._resolve_model_selection(fallback.get('api'), fallback.get('model'), params_override))
+        return candidates
+
+    def resolve_model_cascade(self, agent: dict) -> Optional[Dict[str, Any]]:
+        """
+        Resolves the optional escalation chain declared under model_overrides.cascade.
+        Returns None when the agent has no cascade, otherwise a dict with the instantiated
+        models, their params, and the escalation policy.
+        """
+        cascade = self._get_model_overrides(agent).get('cascade')
+        if not cascade:
+            return None
+        if isinstance(cascade, list):
+            cascade = {'models': cascade}
+
+        agent_params_override = self._get_model_overrides(agent).get('params', {})
+        steps = []
+        for selection in cascade.get('models') or []:
+            params_override = {**agent_params_override, **selection.get('params', {})}
+            api_name, class_name, model_identifier, params = self._resolve_model_selection(
+                selection.get('api'), selection.get('model'), params_override
+            )
+            steps.append({
+                'model': self.get_model(api_name, class_name, model_identifier),
+                'params': params,
+                'label': f"{api_name}/{selection.get('model')}",
+            })
+        return {
+            'steps': steps,
+            'confidence_key': cascade.get('confidence_key'),
+            'min_confidence': cascade.get('min_confidence'),
+        }
+
+    def resolve_token_budget(self, agent: dict, final_params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Resolves the agent's optional token_budget block. The context window comes from the
+        block itself or from 'context_window' in the Model Library (model level, then class level).
+        The output reserve defaults to the model's max token param. Returns None when the agent
+        has no budget or no context window is known.
+        """
+        budget = agent.get('token_budget')
+        if not budget:
+            return None
+        if not isinstance(budget, dict):
+            budget = {}
+
+        context_window = budget.get('context_window')
+        if not context_window:
+            api_name, model_name, _ = self._get_agent_api_and_model(agent)
+            api_section = self._get_api_section(api_name)
+            class_name, model_data = self._find_class_for_model(api_section, model_name)
+            context_window = model_data.get('context_window') or api_section[class_name].get('context_window')
+        if not context_window:
+            print(f"Token budget for '{agent.get('name', 'agent')}' ignored: no context_window configured.")
+            return None
+
+        reserve = budget.get('reserve_output_tokens')
+        if reserve is None:
+            reserve = next(
+                (final_params[k] for k in ('max_tokens', 'max_output_tokens', 'max_new_tokens') if final_params.get(k)),
+                1024,
+            )
+        return {
+            'context_window': context_window,
+            'reserve_output_tokens': reserve,
+            'trim_sections': budget.get('trim_sections', []),
+        }
+
+    def build_model(self, candidates: List[Tuple[str, str, str, Dict[str, Any]]]) -> Any:
+        """
+        Instantiates the model for a list of resolved candidates. A single candidate returns
+        the plain model; several are wrapped in a FallbackModel guarded by circuit breakers.
+        """
+        if len(candidates) == 1:
+            api_name, class_name, model_identifier, _ = candidates[0]
+            return self.get_model(api_name, class_name, model_identifier)
+
+        from .apis.fallback_model import FallbackModel, ModelCandidate
+        resolved = [
+            ModelCandidate(api_name, class_name, self.get_model(api_name, class_name, model_identifier), params)
+            for api_name, class_name, model_identifier, params in candidates
+        ]
+        breaker_settings = self.data['settings']['models'].get('circuit_breaker') or {}
+        return FallbackModel(resolved, breaker_settings)
+
+    def _resolve_model_selection(self, api_name: str, model_name: str, params_override: Dict[str, Any]) -> Tuple[str, str, str, Dict[str, Any]]:
+        """
+        Resolves a single (api, model) selection against the Model Library into a 4-tuple.
+        Raises ValueError if the API or model cannot be found.
+        """
+        if not api_name or not model_name:
+            raise ValueError("Model selection must specify both 'api' and 'model'.")
         api_section = self._get_api_section(api_name)
         class_name, model_data = self._find_class_for_model(api_section, model_name)
         model_identifier = self._get_model_identifier(api_name, model_name, model_data)
-        final_params = self._merge_params(api_section, class_name, model_data, agent_params_override)
+        final_params = self._merge_params(api_section, class_name, model_data, params_override)
         return api_name, class_name, model_identifier, final_params
 
     def _get_agent_api_and_model(self, agent: dict) -> Tuple[str, str, Dict[str, Any]]:
@@ -252,10 +482,10 @@ class Config:
         Returns (api_name, model_name, agent_params_override).
         Raises ValueError if no valid API/Model can be determined.
         """
-        selected_model = self.data['settings']['models'].get('default_model') or {}
+        selected_model = self._get_default_model()
         default_api = selected_model.get('api')
         default_model = selected_model.get('model')
-        model_overrides = agent.get('model_overrides', {})
+        model_overrides = self._get_model_overrides(agent)
         api_name = model_overrides.get('api', default_api)
         model_name = model_overrides.get('model', default_model)
         agent_params_override = model_overrides.get('params', {})
@@ -263,6 +493,39 @@ class Config:
             raise ValueError("No valid API/Model found in either Selected Model defaults or agent overrides.")
         return api_name, model_name, agent_params_override
 
+    def _get_model_fallbacks(self, agent: dict) -> List[Dict[str, Any]]:
+        """
+        Returns the ordered fallback selections for an agent. Agent-level fallbacks win; the
+        default_model fallbacks only apply when the agent does not pick its own api/model.
+        """
+        model_overrides = self._get_model_overrides(agent)
+        if 'fallbacks' in model_overrides:
+            return model_overrides.get('fallbacks') or []
+        if model_overrides.get('api') or model_overrides.get('model'):
+            return []
+        return self._get_default_model().get('fallbacks') or []
+
+    def _get_default_model(self) -> Dict[str, Any]:
+        """Returns the normalized default_model selection from models.yaml."""
+        return self._normalize_model_selection(self.data['settings']['models'].get('default_model'))
+
+    def _get_model_overrides(self, agent: dict) -> Dict[str, Any]:
+        """Returns the agent's normalized model_overrides block."""
+        return self._normalize_model_selection(agent.get('model_overrides'))
+
+    @staticmethod
+    def _normalize_model_selection(selection: Any) -> Dict[str, Any]:
+        """
+        Accepts a model selection as a mapping or as an ordered list of mappings.
+        A list is treated as the primary selection followed by its fallbacks.
+        """
+        if not selection:
+            return {}
+        if isinstance(selection, list):
+            primary, *fallbacks = selection
+            return {**primary, 'fallbacks': fallbacks}
+        return selection
+
     def _get_api_section(self, api_name: str) -> Dict[str, Any]:
         """
         Returns the relevant subsection of the Model Library for the requested API.
@@ -398,7 +661,16 @@ class Config:
         """
         Search for a configuration by name within a specified category.
         Returns the configuration dictionary for the specified name, or raises FileNotFoundError if not found.
+
+        Files are found through the index built at load time; names that are not files (folders, keys
+        added to self.data at runtime) fall back to a depth-first search of the category.
         """
+        entry = self._config_index.get((category, config_name))
+        if entry is not None:
+            config = self._resolve_data_path(entry[0])
+            if config:
+                return config
+
         def search_nested_dict(nested_dict, target):
             for key, value in nested_dict.items():
                 if key == target:
@@ -413,6 +685,15 @@ class Config:
             raise FileNotFoundError(f"Config '{config_name}' not found in configuration.")
         return config
 
+    def _resolve_data_path(self, key_path: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """Follows an index key path through self.data, returning None if any step is gone."""
+        node = self.data
+        for key in key_path:
+            if not isinstance(node, dict) or key not in node:
+                return None
+            node = node[key]
+        return node
+
     def find_file_in_directory(self, directory: str, filename: str):
         """
         Recursively search for a file within a directory and its subdirectories.
@@ -460,10 +741,24 @@ class Config:
     @property
     def settings(self):
         """
-        Returns the loaded settings as a Settings dataclass for dot notation access.
+        Returns the loaded settings as a frozen Settings dataclass for dot notation access.
+        The snapshot is built once per configuration load and shared by every agent.
+        """
+        settings = self._settings
+        if settings is None:
+            settings = self.refresh_settings()
+        return settings
+
+    def refresh_settings(self):
+        """
+        Rebuilds the Settings snapshot from the raw settings data and swaps it in.
+        Call this after changing ``self.data['settings']`` directly.
         """
-        settings_dict = self.data.get('settings', {})
-        return self.config_manager._build_settings(settings_dict)
+        settings_dict = copy.deepcopy(self.data.get('settings', {}))
+        settings = self.config_manager._build_settings(settings_dict)
+        self._settings = settings
+        self._persona_markdown_cache = {}
+        return settings
 
     # -----------------------------------
     # Persona Handling
@@ -477,18 +772,7 @@ class Config:
         3. System default persona (lowest priority)
         Returns the resolved persona data or None if personas are disabled.
         """
-        settings = self.data['settings']
-        if not settings['system']['persona'].get('enabled', False):
-            return None
-        persona_name = None
-        if cog_config and 'persona' in cog_config:
-            persona_name = cog_config['persona']
-        elif agent_config and 'persona' in agent_config:
-            persona_candidate = agent_config['persona']
-            if isinstance(persona_candidate, str):
-                persona_name = persona_candidate
-        else:
-            persona_name = settings['system']['persona'].get('name', 'default_assistant')
+        persona_name = self.resolve_persona_name(cog_config=cog_config, agent_config=agent_config)
         if persona_name and persona_name not in self.data.get('personas', {}):
             raise FileNotFoundError(
                 f"Selected Persona '{persona_name}' not found. "
@@ -496,6 +780,55 @@ class Config:
             )
         return self.data['personas'][persona_name] if persona_name else None
 
+    def resolve_persona_name(self, cog_config: Optional[Dict[str, Any]] = None, agent_config: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Returns the name of the persona resolve_persona would pick, or None if personas are disabled.
+        """
+        settings = self.data['settings']
+        if not settings['system']['persona'].get('enabled', False):
+            return None
+        if cog_config and 'persona' in cog_config:
+            return cog_config['persona']
+        if agent_config and 'persona' in agent_config:
+            persona_candidate = agent_config['persona']
+            return persona_candidate if isinstance(persona_candidate, str) else None
+        return settings['system']['persona'].get('name', 'default_assistant')
+
+    def static_persona_markdown(self, cog_name: Optional[str] = None, agent_name: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the static section of the persona resolved for a cog (or, without a cog, for an agent)
+        rendered as markdown, or None if personas are disabled, the agent is unknown or the persona has no
+        static section.
+
+        Rendered markdown is memoized per (persona, cog, static_char_cap). The cache is dropped whenever the
+        settings snapshot is rebuilt, so load_all_configurations(), reload() and save() invalidate it.
+        Raises FileNotFoundError if the selected persona does not exist.
+        """
+        cog_config = None
+        agent_config = None
+        try:
+            if cog_name:
+                cog_config = (self.find_config('cogs', cog_name) or {}).get('cog') or None
+            elif agent_name:
+                agent_config = self.find_config('prompts', agent_name)
+        except FileNotFoundError:
+            # Unknown cogs fall back to the agent/system persona; an unknown agent has no persona to render
+            if not cog_name:
+                return None
+        persona_name = self.resolve_persona_name(cog_config=cog_config, agent_config=agent_config)
+        if not persona_name:
+            return None
+
+        persona_settings = self.settings.system.persona
+        key = (persona_name, cog_name, persona_settings.static_char_cap)
+        cache = self._persona_markdown_cache
+        if key not in cache:
+            from agentforge.utils.prompt_processor import PromptProcessor
+            persona_data = self.resolve_persona(cog_config={'persona': persona_name})
+            static_content = persona_data.get('static') if isinstance(persona_data, dict) else None
+            cache[key] = PromptProcessor().build_persona_markdown(static_content, persona_settings) or None
+        return cache[key]
+
     def load_persona(self, agent_config: dict) -> Optional[Dict[str, Any]]:
         """
         Loads the persona for the agent, if personas are enabled.
@@ -12,8 +12,14 @@ from .agent_config_structs import (
     MiscSettings,
     AudioSettings,
     PathSettings,
+    TimingSettings,
+    TracingSettings,
+    ScratchpadSettings,
     SystemSettings,
     Settings,
+    CascadeStep,
+    ModelCascade,
+    TokenBudget,
     AgentConfig,
 )
 
@@ -34,8 +40,14 @@ __all__ = [
     "MiscSettings",
     "AudioSettings",
     "PathSettings",
+    "TimingSettings",
+    "TracingSettings",
+    "ScratchpadSettings",
     "SystemSettings",
     "Settings",
+    "CascadeStep",
+    "ModelCascade",
+    "TokenBudget",
     "AgentConfig",
     # Cog config structs
     "CogAgentDef",
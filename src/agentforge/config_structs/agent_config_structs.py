@@ -6,18 +6,30 @@ including settings structures and the main AgentConfig object.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(frozen=True)
 class PersonaSettings:
     """Persona configuration from system settings."""
     enabled: bool = True
     name: str = "default_assistant"
     static_char_cap: int = 8000
+    async_updates: bool = False
+    update_queue_size: int = 64
+    superseded_retention_days: float = 30
 
 
-@dataclass
+@dataclass(frozen=True)
+class ScratchpadSettings:
+    """ScratchPad memory configuration from system settings."""
+    log_threshold: int = 20
+    background_consolidation: bool = True
+    chunk_tokens: int = 6000
+    map_workers: int = 4
+
+
+@dataclass(frozen=True)
 class DebugSettings:
     """Debug configuration from system settings."""
     mode: bool = False
@@ -25,28 +37,29 @@ class DebugSettings:
     simulated_response: str = "Text designed to simulate an LLM response for debugging purposes without invoking the model."
 
 
-@dataclass
+@dataclass(frozen=True)
 class LoggingSettings:
     """Logging configuration from system settings."""
     enabled: bool = True
     console_level: str = "warning"
     folder: str = "./logs"
     files: Dict[str, str] = field(default_factory=dict)
+    max_payload_chars: int = 20000
 
 
-@dataclass
+@dataclass(frozen=True)
 class MiscSettings:
     """Miscellaneous system settings."""
     on_the_fly: bool = True
 
 
-@dataclass
+@dataclass(frozen=True)
 class PathSettings:
     """System file path settings."""
     files: str = "./files"
 
 
-@dataclass
+@dataclass(frozen=True)
 class AudioSettings:
     """Audio-related system settings."""
     autoplay: bool = False  # Automatically play generated audio files
@@ -54,7 +67,24 @@ class AudioSettings:
     save_dir: str = ""  # Custom directory for audio files (optional)
 
 
-@dataclass
+@dataclass(frozen=True)
+class TimingSettings:
+    """Per-stage agent timing settings."""
+    enabled: bool = False
+    sinks: Tuple[str, ...] = ("histogram",)  # Any of: log, jsonl, histogram
+    jsonl_path: str = "./logs/timings.jsonl"
+
+
+@dataclass(frozen=True)
+class TracingSettings:
+    """Cog-level tracing settings."""
+    enabled: bool = False
+    exporters: Tuple[str, ...] = ("memory",)  # Any of: memory, otlp_json
+    otlp_path: str = "./logs/traces.jsonl"
+    service_name: str = "agentforge"
+
+
+@dataclass(frozen=True)
 class SystemSettings:
     """System settings structure from settings/system.yaml."""
     persona: PersonaSettings
@@ -63,16 +93,47 @@ class SystemSettings:
     misc: MiscSettings
     paths: PathSettings
     audio: AudioSettings
+    timing: TimingSettings = TimingSettings()
+    tracing: TracingSettings = TracingSettings()
+    scratchpad: ScratchpadSettings = ScratchpadSettings()
 
 
-@dataclass
+@dataclass(frozen=True)
 class Settings:
-    """Complete settings structure containing system, models, and storage."""
+    """
+    Complete settings structure containing system, models, and storage.
+
+    Frozen: Config builds one snapshot per load and every AgentConfig shares it.
+    """
     system: SystemSettings
     models: Dict[str, Any] = field(default_factory=dict)
     storage: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class CascadeStep:
+    """A model the agent escalates to when the previous answer is not good enough."""
+    model: Any
+    params: Dict[str, Any] = field(default_factory=dict)
+    label: str = ""
+
+
+@dataclass
+class ModelCascade:
+    """Escalation policy from model_overrides.cascade in the agent's YAML."""
+    steps: List[CascadeStep] = field(default_factory=list)
+    confidence_key: Optional[str] = None
+    min_confidence: Optional[float] = None
+
+
+@dataclass
+class TokenBudget:
+    """Pre-flight context-window budget from the agent's token_budget YAML key."""
+    context_window: int
+    reserve_output_tokens: int = 1024
+    trim_sections: List[str] = field(default_factory=list)
+
+
 @dataclass
 class AgentConfig:
     """
@@ -89,5 +150,8 @@ class AgentConfig:
     persona: Optional[Dict[str, Any]] = None
     simulated_response: Optional[str] = None
     parse_response_as: Optional[str] = None
+    cascade: Optional[ModelCascade] = None
+    cacheable_prompts: Optional[List[str]] = None
+    token_budget: Optional[TokenBudget] = None
     # Support for additional custom fields from YAML
     custom_fields: Dict[str, Any] = field(default_factory=dict) 
\ No newline at end of file
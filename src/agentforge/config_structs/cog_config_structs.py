@@ -18,6 +18,10 @@ class CogAgentDef:
     # Additional agent configuration can be added here
 
 
+# What MemoryManager does when a memory node's query_before runs past its query_timeout
+MEMORY_TIMEOUT_POLICIES = ("wait", "skip", "cached")
+
+
 @dataclass
 class CogMemoryDef:
     """Definition of a memory node within a cog."""
@@ -28,6 +32,8 @@ class CogMemoryDef:
     query_keys: List[str] = field(default_factory=list)
     update_after: Union[str, List[str], None] = None
     update_keys: List[str] = field(default_factory=list)
+    query_timeout: Optional[float] = None  # Seconds to wait for this node's query_before
+    on_timeout: str = "wait"  # When the query is slow: "wait", "skip" (empty store) or "cached" (last store)
 
 
 @dataclass
@@ -62,6 +68,7 @@ class CogDefinition:
     flow: Optional[CogFlow] = None
     chat_memory_enabled: Optional[bool] = None
     chat_history_max_results: Optional[int] = None
+    memory_query_concurrency: int = 4  # Max memory nodes queried in parallel before an agent (1 = serial)
 
 
 @dataclass
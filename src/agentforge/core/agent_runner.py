@@ -6,7 +6,16 @@ Extracts agent execution concerns from Cog to improve separation of responsibili
 """
 
 from typing import Any, Optional
+from agentforge import metrics
 from agentforge.utils.logger import Logger
+from agentforge.utils.token_accounting import TokenAccountant, current_run_id
+from agentforge.utils.tracing import is_recording, span
+
+AGENT_RUN_SECONDS = metrics.histogram(
+    "agentforge_agent_run_seconds", "Wall time of an agent run in a cog, including retries, by agent.", ("agent",))
+AGENT_ATTEMPTS = metrics.counter(
+    "agentforge_agent_attempts_total", "Agent attempts in a cog, by agent and outcome (ok, empty, error).",
+    ("agent", "outcome"))
 
 
 class AgentRunner:
@@ -37,20 +46,42 @@ class AgentRunner:
         Raises:
             Exception: If agent fails after max attempts
         """
-        attempts = 0
+        with span("agent.run", **{"agent.id": agent_id, "agent.max_attempts": max_attempts}) as run_span, \
+                AGENT_RUN_SECONDS.time(agent=agent_id):
+            attempts = 0
 
-        while attempts < max_attempts:
-            attempts += 1
-            self.logger.debug(f"Executing agent '{agent_id}' (attempt {attempts}/{max_attempts})")
-            
-            agent_output = agent.run(_ctx=context, _state=state, _mem=memory)
-            
-            if not agent_output:
-                self.logger.warning(f"No output from agent '{agent_id}', retrying... (Attempt {attempts})")
-                continue
-                
-            self.logger.debug(f"Agent '{agent_id}' executed successfully on attempt {attempts}")
-            return agent_output
-
-        self.logger.error(f"Max attempts reached for agent '{agent_id}' with no valid output.")
-        raise Exception(f"Failed to get valid response from {agent_id}. We recommend checking the agent's input/output logs.") 
\ No newline at end of file
+            while attempts < max_attempts:
+                attempts += 1
+                run_span.set_attribute("agent.attempts", attempts)
+                self.logger.debug(f"Executing agent '{agent_id}' (attempt {attempts}/{max_attempts})")
+
+                with span("agent.attempt", **{"agent.id": agent_id, "agent.attempt": attempts}) as attempt_span:
+                    tokens_before = self._run_tokens()
+                    try:
+                        agent_output = agent.run(_ctx=context, _state=state, _mem=memory)
+                    except Exception:
+                        AGENT_ATTEMPTS.inc(agent=agent_id, outcome="error")
+                        raise
+                    AGENT_ATTEMPTS.inc(agent=agent_id, outcome="ok" if agent_output else "empty")
+                    if tokens_before is not None:
+                        attempt_span.set_attribute("tokens.total", self._run_tokens() - tokens_before)
+                    if not agent_output:
+                        attempt_span.set_error("empty output")
+
+                if not agent_output:
+                    self.logger.warning(f"No output from agent '{agent_id}', retrying... (Attempt {attempts})")
+                    continue
+
+                self.logger.debug(f"Agent '{agent_id}' executed successfully on attempt {attempts}")
+                return agent_output
+
+            self.logger.error(f"Max attempts reached for agent '{agent_id}' with no valid output.")
+            raise Exception(f"Failed to get valid response from {agent_id}. We recommend checking the agent's input/output logs.")
+
+    @staticmethod
+    def _run_tokens() -> Optional[int]:
+        """Tokens used so far in the current cog run, or None when there is no trace to report them to."""
+        run_id = current_run_id.get()
+        if not run_id or not is_recording():
+            return None
+        return TokenAccountant.run_totals(run_id)["total_tokens"]
@@ -9,8 +9,14 @@ from ..config_structs import (
     LoggingSettings,
     MiscSettings,
     PathSettings,
+    TimingSettings,
+    TracingSettings,
+    ScratchpadSettings,
     SystemSettings,
     Settings,
+    CascadeStep,
+    ModelCascade,
+    TokenBudget,
     AgentConfig,
     # Cog config structs
     CogAgentDef,
@@ -21,6 +27,7 @@ from ..config_structs import (
     CogConfig,
     AudioSettings,
 )
+from ..config_structs.cog_config_structs import MEMORY_TIMEOUT_POLICIES
 
 # from agentforge.utils.logger import Logger
 
@@ -52,6 +59,8 @@ class ConfigManager:
         # Try to get debug flag from settings dict
         if isinstance(settings, dict):
             debug_mode = settings.get('system', {}).get('debug', {}).get('mode', False)
+        elif isinstance(settings, Settings):
+            debug_mode = settings.system.debug.mode
         if debug_mode:
             print(msg)
 
@@ -107,7 +116,7 @@ class ConfigManager:
     def _normalize_agent_config(self, raw_agent_data: Dict[str, Any]) -> AgentConfig:
         """Normalize and construct AgentConfig object from validated raw data."""
         settings = self._build_settings(raw_agent_data['settings'])
-        reserved_fields = {'name', 'settings', 'model', 'params', 'prompts', 'persona', 'simulated_response', 'parse_response_as'}
+        reserved_fields = {'name', 'settings', 'model', 'params', 'prompts', 'persona', 'simulated_response', 'parse_response_as', 'cascade', 'cacheable_prompts', 'token_budget'}
         custom_fields = {key: value for key, value in raw_agent_data.items() if key not in reserved_fields}
         return AgentConfig(
             name=raw_agent_data['name'],
@@ -118,9 +127,42 @@ class ConfigManager:
             persona=raw_agent_data.get('persona'),
             simulated_response=raw_agent_data.get('simulated_response'),
             parse_response_as=raw_agent_data.get('parse_response_as'),
+            cascade=self._build_cascade(raw_agent_data.get('cascade')),
+            cacheable_prompts=raw_agent_data.get('cacheable_prompts'),
+            token_budget=self._build_token_budget(raw_agent_data.get('token_budget')),
             custom_fields=custom_fields
         )
 
+    @staticmethod
+    def _build_token_budget(raw_budget: Optional[Dict[str, Any]]) -> Optional[TokenBudget]:
+        """Build the TokenBudget from the resolved budget dict, or None if budgeting is off."""
+        if not raw_budget or not raw_budget.get('context_window'):
+            return None
+        trim_sections = raw_budget.get('trim_sections') or []
+        if isinstance(trim_sections, str):
+            trim_sections = [trim_sections]
+        return TokenBudget(
+            context_window=int(raw_budget['context_window']),
+            reserve_output_tokens=int(raw_budget.get('reserve_output_tokens') or 0),
+            trim_sections=list(trim_sections),
+        )
+
+    @staticmethod
+    def _build_cascade(raw_cascade: Optional[Dict[str, Any]]) -> Optional[ModelCascade]:
+        """Build the ModelCascade from the resolved cascade dict, or None if the agent has none."""
+        if not raw_cascade or not raw_cascade.get('steps'):
+            return None
+        steps = [
+            CascadeStep(model=step['model'], params=step.get('params', {}), label=step.get('label', ''))
+            for step in raw_cascade['steps']
+        ]
+        min_confidence = raw_cascade.get('min_confidence')
+        return ModelCascade(
+            steps=steps,
+            confidence_key=raw_cascade.get('confidence_key'),
+            min_confidence=float(min_confidence) if min_confidence is not None else None,
+        )
+
     def _validate_prompt_format(self, prompts: Dict[str, Any]) -> None:
         """
         Validates that the prompts dictionary has the correct format.
@@ -205,7 +247,8 @@ class ConfigManager:
             trail_logging=raw_cog.get('trail_logging', True),
             agents=agents,
             memory=memory,
-            flow=flow
+            flow=flow,
+            memory_query_concurrency=raw_cog.get('memory_query_concurrency', 4)
         )
         custom_fields = {key: value for key, value in raw_cog_data.items() if key != 'cog'}
         return CogConfig(
@@ -217,14 +260,20 @@ class ConfigManager:
     # Private Helper Methods
     # ==============================================================================
 
-    def _build_settings(self, raw_settings: Dict[str, Any]) -> Settings:
-        """Build structured Settings object from raw settings dict."""
+    def _build_settings(self, raw_settings: Union[Dict[str, Any], Settings]) -> Settings:
+        """Build structured Settings object from raw settings dict. An existing Settings snapshot is reused as-is."""
+        if isinstance(raw_settings, Settings):
+            return raw_settings
+
         raw_system = raw_settings.get('system', {})
         
         persona_settings = PersonaSettings(
             enabled=raw_system.get('persona', {}).get('enabled', True),
             name=raw_system.get('persona', {}).get('name', 'default_assistant'),
-            static_char_cap=raw_system.get('persona', {}).get('static_char_cap', 8000)
+            static_char_cap=raw_system.get('persona', {}).get('static_char_cap', 8000),
+            async_updates=raw_system.get('persona', {}).get('async_updates', False),
+            update_queue_size=raw_system.get('persona', {}).get('update_queue_size', 64),
+            superseded_retention_days=raw_system.get('persona', {}).get('superseded_retention_days', 30)
         )
         
         debug_settings = DebugSettings(
@@ -238,7 +287,8 @@ class ConfigManager:
             enabled=raw_system.get('logging', {}).get('enabled', True),
             console_level=raw_system.get('logging', {}).get('console_level', 'warning'),
             folder=raw_system.get('logging', {}).get('folder', './logs'),
-            files=raw_system.get('logging', {}).get('files', {})
+            files=raw_system.get('logging', {}).get('files', {}),
+            max_payload_chars=raw_system.get('logging', {}).get('max_payload_chars', 20000)
         )
         
         misc_settings = MiscSettings(
@@ -254,14 +304,42 @@ class ConfigManager:
             save_files=raw_system.get('audio', {}).get('save_files', False),
             save_dir=raw_system.get('audio', {}).get('save_dir', "")
         )
+
+        raw_timing = raw_system.get('timing', {}) or {}
+        timing_sinks = raw_timing.get('sinks', ['histogram'])
+        timing_settings = TimingSettings(
+            enabled=raw_timing.get('enabled', False),
+            sinks=tuple([timing_sinks] if isinstance(timing_sinks, str) else timing_sinks or ()),
+            jsonl_path=raw_timing.get('jsonl_path', './logs/timings.jsonl')
+        )
+
+        raw_tracing = raw_system.get('tracing', {}) or {}
+        tracing_exporters = raw_tracing.get('exporters', ['memory'])
+        tracing_settings = TracingSettings(
+            enabled=raw_tracing.get('enabled', False),
+            exporters=tuple([tracing_exporters] if isinstance(tracing_exporters, str) else tracing_exporters or ()),
+            otlp_path=raw_tracing.get('otlp_path', './logs/traces.jsonl'),
+            service_name=raw_tracing.get('service_name', 'agentforge')
+        )
         
+        raw_scratchpad = raw_system.get('scratchpad', {}) or {}
+        scratchpad_settings = ScratchpadSettings(
+            log_threshold=raw_scratchpad.get('log_threshold', 20),
+            background_consolidation=raw_scratchpad.get('background_consolidation', True),
+            chunk_tokens=raw_scratchpad.get('chunk_tokens', 6000),
+            map_workers=raw_scratchpad.get('map_workers', 4)
+        )
+
         system_settings = SystemSettings(
             persona=persona_settings,
             debug=debug_settings,
             logging=logging_settings,
             misc=misc_settings,
             paths=path_settings,
-            audio=audio_settings
+            audio=audio_settings,
+            timing=timing_settings,
+            tracing=tracing_settings,
+            scratchpad=scratchpad_settings
         )
         
         return Settings(
@@ -323,6 +401,11 @@ class ConfigManager:
             elif update_after is None:
                 update_after = []
             
+            on_timeout = mem_def.get('on_timeout', 'wait')
+            if on_timeout not in MEMORY_TIMEOUT_POLICIES:
+                raise ValueError(f"Memory node '{mem_id}' has invalid on_timeout '{on_timeout}'. "
+                                 f"Expected one of: {', '.join(MEMORY_TIMEOUT_POLICIES)}.")
+
             memory_nodes.append(CogMemoryDef(
                 id=mem_id,
                 type=mem_def.get('type'),
@@ -330,7 +413,9 @@ class ConfigManager:
                 query_before=query_before,
                 query_keys=mem_def.get('query_keys', []),
                 update_after=update_after,
-                update_keys=mem_def.get('update_keys', [])
+                update_keys=mem_def.get('update_keys', []),
+                query_timeout=mem_def.get('query_timeout'),
+                on_timeout=on_timeout
             ))
         
         return memory_nodes
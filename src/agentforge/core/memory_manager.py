@@ -1,10 +1,25 @@
-from typing import Dict, Any, List, Type
+import contextvars
+import copy
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, List, Optional, Type
+from agentforge import metrics
 from agentforge.utils.logger import Logger
+from agentforge.utils.tracing import is_recording, span
 from agentforge.config import Config
 from agentforge.config_structs import CogConfig
 from agentforge.storage.memory import Memory
 from agentforge.storage.chat_history_memory import ChatHistoryMemory
 
+MEMORY_OPERATION_SECONDS = metrics.histogram(
+    "agentforge_memory_operation_seconds", "Time spent querying or updating a cog memory node, by node and operation.",
+    ("node", "operation"))
+MEMORY_QUERIES = metrics.counter(
+    "agentforge_memory_queries_total",
+    "Memory node queries before an agent, by node and result (hit, miss, timeout, error).",
+    ("node", "result"))
+
 
 class MemoryManager:
     """
@@ -24,6 +39,7 @@ class MemoryManager:
         self._resolve_persona()
         self._initialize_memory_nodes()
         self._initialize_agent_memory_maps()
+        self._initialize_query_execution()
         
         self.logger.debug(f"Initialized MemoryManager for cog='{self.cog_name}', persona='{self.persona}' with {len(self.memory_nodes)} memory nodes.")
 
@@ -73,6 +89,21 @@ class MemoryManager:
         self.query_before_map = self._map_agents_to_memory_nodes(trigger="query_before")
         self.update_after_map = self._map_agents_to_memory_nodes(trigger="update_after")
 
+    def _initialize_query_execution(self) -> None:
+        """
+        Set up state for querying memory nodes in parallel.
+        The executor is created on first use, so cogs with at most one node per agent never start threads.
+        """
+        self.query_concurrency = max(1, self.cog_config.cog.memory_query_concurrency or 1)
+        self.last_query_report: Dict[str, Dict[str, Any]] = {}
+        self._query_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._pending_queries: Dict[str, Future] = {}
+        self._last_stores: Dict[str, Any] = {}
+        # Bumped when a node's query is abandoned on timeout, so its late result is dropped
+        self._query_generations: Dict[str, int] = {}
+        self._publish_lock = threading.Lock()
+
     # -----------------------------------------------------------------
     # Public Interface Methods
     # -----------------------------------------------------------------
@@ -80,16 +111,26 @@ class MemoryManager:
     def query_before(self, agent_id: str, _ctx: dict, _state: dict) -> None:
         """
         Query memory nodes configured to run before the specified agent.
-        Calls _query_memory_node for each relevant node.
+
+        Nodes are independent reads, so when an agent has several of them (or a node sets
+        ``query_timeout``) they run concurrently on a bounded thread pool of
+        ``memory_query_concurrency`` workers. A node that exceeds its timeout is handled
+        per its ``on_timeout`` policy. Per-node status and duration are kept in
+        ``last_query_report``.
         """
         self.logger.info(f"Querying memory nodes before agent: {agent_id}")
-        queried = 0
-        results_found = 0
-        for mem_id in self.query_before_map.get(agent_id, []):
-            if self._query_memory_node(mem_id, agent_id, _ctx, _state):
-                results_found += 1
-            queried += 1
-        self.logger.info(f"Queried {queried} memory node(s) before agent '{agent_id}'; {results_found} returned results.")
+        mem_ids = self.query_before_map.get(agent_id, [])
+        with span("memory.query_before", **{"agent.id": agent_id}):
+            if self._query_serially(mem_ids):
+                report = {mem_id: self._run_node_query(mem_id, agent_id, _ctx, _state) for mem_id in mem_ids}
+            else:
+                report = self._query_nodes_concurrently(mem_ids, agent_id, _ctx, _state)
+        self.last_query_report = report
+        results_found = sum(1 for outcome in report.values() if outcome["found"])
+        self.logger.info(lambda: f"Queried {len(mem_ids)} memory node(s) before agent '{agent_id}'; "
+                                 f"{results_found} returned results. "
+                                 + ", ".join(f"{mem_id}={o['status']} {o['seconds'] * 1000:.0f}ms"
+                                             for mem_id, o in report.items()))
 
     def update_after(self, agent_id: str, _ctx: dict, _state: dict) -> None:
         """
@@ -98,11 +139,27 @@ class MemoryManager:
         """
         self.logger.info(f"Updating memory nodes after agent: {agent_id}")
         updated = 0
-        for mem_id in self.update_after_map.get(agent_id, []):
-            self._update_memory_node(mem_id, agent_id, _ctx, _state)
-            updated += 1
+        with span("memory.update_after", **{"agent.id": agent_id}):
+            for mem_id in self.update_after_map.get(agent_id, []):
+                with span("memory.update", **self._span_attributes(mem_id, agent_id)), \
+                        MEMORY_OPERATION_SECONDS.time(node=mem_id, operation="update"):
+                    self._update_memory_node(mem_id, agent_id, _ctx, _state)
+                updated += 1
         self.logger.info(f"Updated {updated} memory node(s) after agent '{agent_id}'.")
 
+    def end_run(self, run_id: Optional[str]) -> None:
+        """
+        Tell every memory node that a cog run has finished so it can drop per-run state.
+        """
+        for mem_id, mem_data in self.memory_nodes.items():
+            end_run = getattr(mem_data["instance"], "end_run", None)
+            if end_run is None:
+                continue
+            try:
+                end_run(run_id)
+            except Exception as e:
+                self.logger.warning(f"Memory '{mem_id}' failed to finish run '{run_id}': {e}")
+
     def build_mem(self) -> Dict[str, Any]:
         """
         Return a mapping of memory node IDs to their current store for agent execution context.
@@ -191,15 +248,18 @@ class MemoryManager:
             agent_map[agent_id] = []
         agent_map[agent_id].append(mem_id)
 
-    def _query_memory_node(self, mem_id: str, agent_id: str, _ctx: dict, _state: dict) -> bool:
+    def _query_memory_node(self, mem_id: str, agent_id: str, _ctx: dict, _state: dict,
+                           mem_obj: Optional[Memory] = None) -> bool:
         """
         Query a single memory node before agent execution.
         Extension point: override to customize query logic.
-        Returns True if the memory node's store is non-empty.
+        ``mem_obj`` is the instance to query, by default the node's own; queries that may be
+        abandoned on timeout pass a copy of it (see _run_node_query).
+        Returns True if the queried store is non-empty.
         """
         mem_data = self.memory_nodes[mem_id]
         cfg = mem_data["config"]
-        mem_obj = mem_data["instance"]
+        mem_obj = mem_obj if mem_obj is not None else mem_data["instance"]
         self.logger.debug(f"Querying memory '{mem_id}' before agent '{agent_id}'")
         mem_obj.query_memory(cfg.query_keys, _ctx, _state)
         return bool(mem_obj.store)
@@ -215,6 +275,156 @@ class MemoryManager:
         self.logger.debug(f"Updating memory '{mem_id}' after agent '{agent_id}'")
         mem_obj.update_memory(cfg.update_keys, _ctx, _state) 
 
+    def _query_serially(self, mem_ids: List[str]) -> bool:
+        """Run inline when there is nothing to overlap and no timeout to enforce."""
+        if any(self.memory_nodes[mem_id]["config"].query_timeout for mem_id in mem_ids):
+            return False
+        return len(mem_ids) <= 1 or self.query_concurrency <= 1
+
+    def _run_node_query(self, mem_id: str, agent_id: str, _ctx: dict, _state: dict,
+                        generation: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Query one node with timing, tracing and metrics; returns its report entry.
+
+        With a ``generation`` the query may be abandoned on timeout, so it runs against a copy of
+        the node and its results are published to the node only if it was not abandoned meanwhile.
+        """
+        start = time.perf_counter()
+        mem_obj = self.memory_nodes[mem_id]["instance"]
+        target = mem_obj
+        if generation is not None:
+            target = copy.copy(mem_obj)
+            target.store = copy.copy(mem_obj.store)
+        with span("memory.query", **self._span_attributes(mem_id, agent_id)) as node_span, \
+                MEMORY_OPERATION_SECONDS.time(node=mem_id, operation="query"):
+            found = self._query_memory_node(mem_id, agent_id, _ctx, _state, target)
+            if is_recording():
+                node_span.set_attribute("memory.results", self._count_results(target.store))
+        if target is not mem_obj and not self._publish_query(mem_id, generation, mem_obj, target):
+            return {"status": "abandoned", "found": found, "seconds": time.perf_counter() - start}
+        if getattr(self.memory_nodes[mem_id]["config"], "on_timeout", None) == "cached":
+            # Only the cached policy reads the snapshot; other nodes skip the copy
+            self._last_stores[mem_id] = copy.deepcopy(mem_obj.store)
+        MEMORY_QUERIES.inc(node=mem_id, result="hit" if found else "miss")
+        return {"status": "ok", "found": found, "seconds": time.perf_counter() - start}
+
+    def _publish_query(self, mem_id: str, generation: int, mem_obj: Memory, queried: Memory) -> bool:
+        """Copy a finished query's state onto the node unless the query was abandoned on timeout."""
+        with self._publish_lock:
+            if self._query_generations.get(mem_id, 0) != generation:
+                self.logger.debug(f"Dropping the late result of an abandoned query on memory '{mem_id}'.")
+                return False
+            vars(mem_obj).update(vars(queried))
+            return True
+
+    def _may_abandon(self, mem_id: str) -> bool:
+        """Whether a query on this node can be left running when it times out."""
+        cfg = self.memory_nodes[mem_id]["config"]
+        return bool(cfg.query_timeout) and cfg.on_timeout != "wait"
+
+    def _get_query_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._query_executor is None:
+                self._query_executor = ThreadPoolExecutor(
+                    max_workers=self.query_concurrency,
+                    thread_name_prefix=f"agentforge-memory-{self.cog_name}",
+                )
+            return self._query_executor
+
+    def _query_nodes_concurrently(self, mem_ids: List[str], agent_id: str, _ctx: dict, _state: dict) -> Dict[str, Dict[str, Any]]:
+        """
+        Submit every node's query, then collect them against their deadlines.
+        Raises the first node error once all nodes have settled, like the serial path would.
+        """
+        start = time.perf_counter()
+        executor = self._get_query_executor()
+        futures: Dict[str, Future] = {}
+        report: Dict[str, Dict[str, Any]] = {}
+
+        for mem_id in mem_ids:
+            cfg = self.memory_nodes[mem_id]["config"]
+            pending = self._pending_queries.get(mem_id)
+            if pending is not None and not pending.done():
+                # A query that timed out earlier is still running against this node; never run two at once
+                if cfg.on_timeout != "wait":
+                    report[mem_id] = self._apply_timeout_policy(mem_id, start)
+                    continue
+                self.logger.warning(f"Memory '{mem_id}' is still finishing an earlier query; waiting for it.")
+                try:
+                    pending.result()
+                except Exception:
+                    pass
+            # Carry the caller's context (trace span, cog run id) into the worker thread
+            context = contextvars.copy_context()
+            generation = self._query_generations.get(mem_id, 0) if self._may_abandon(mem_id) else None
+            futures[mem_id] = executor.submit(context.run, self._run_node_query, mem_id, agent_id, _ctx, _state,
+                                              generation)
+            self._pending_queries[mem_id] = futures[mem_id]
+
+        errors = []
+        for mem_id, future in futures.items():
+            cfg = self.memory_nodes[mem_id]["config"]
+            timeout = None
+            if cfg.query_timeout:
+                timeout = max(0.0, start + cfg.query_timeout - time.perf_counter())
+            try:
+                try:
+                    report[mem_id] = future.result(timeout=timeout)
+                except FutureTimeoutError:
+                    if future.done():
+                        raise  # The node's own query raised TimeoutError
+                    report[mem_id] = self._apply_timeout_policy(mem_id, start, future)
+            except Exception as e:
+                MEMORY_QUERIES.inc(node=mem_id, result="error")
+                report[mem_id] = {"status": "error", "found": False, "seconds": time.perf_counter() - start}
+                errors.append(e)
+
+        if errors:
+            raise errors[0]
+        return {mem_id: report[mem_id] for mem_id in mem_ids}
+
+    def _apply_timeout_policy(self, mem_id: str, start: float, future: Optional[Future] = None) -> Dict[str, Any]:
+        """
+        Handle a node whose query missed its deadline, according to its on_timeout policy.
+        ``wait`` keeps waiting; ``skip`` leaves an empty store; ``cached`` reuses the node's last successful store.
+        """
+        cfg = self.memory_nodes[mem_id]["config"]
+        policy = cfg.on_timeout
+        MEMORY_QUERIES.inc(node=mem_id, result="timeout")
+        if policy == "wait" and future is not None:
+            self.logger.warning(f"Memory '{mem_id}' query exceeded {cfg.query_timeout}s; waiting for it to finish.")
+            outcome = future.result()
+            return {**outcome, "status": "slow", "seconds": time.perf_counter() - start}
+
+        mem_obj = self.memory_nodes[mem_id]["instance"]
+        with self._publish_lock:
+            self._query_generations[mem_id] = self._query_generations.get(mem_id, 0) + 1
+            mem_obj.store = copy.deepcopy(self._last_stores.get(mem_id, {})) if policy == "cached" else {}
+        self.logger.warning(f"Memory '{mem_id}' query exceeded {cfg.query_timeout}s; continuing with "
+                            f"{'its last cached store' if policy == 'cached' else 'an empty store'}.")
+        return {"status": "cached" if policy == "cached" else "skipped", "found": bool(mem_obj.store),
+                "seconds": time.perf_counter() - start}
+
+    def _span_attributes(self, mem_id: str, agent_id: str) -> Dict[str, Any]:
+        """Tracing attributes identifying a memory node (empty when no trace is active)."""
+        if not is_recording():
+            return {}
+        mem_obj = self.memory_nodes[mem_id]["instance"]
+        return {
+            "agent.id": agent_id,
+            "memory.node": mem_id,
+            "memory.type": type(mem_obj).__name__,
+            "memory.collection": getattr(mem_obj, "collection_name", None),
+        }
+
+    def _count_results(self, store: Any) -> int:
+        """Number of records a query left in a node's store (0 when the store is empty)."""
+        raw = store.get("raw") if isinstance(store, dict) else None
+        ids = raw.get("ids") if isinstance(raw, dict) else None
+        if isinstance(ids, list):
+            return sum(len(i) if isinstance(i, list) else 1 for i in ids)
+        return 1 if store else 0
+
     # -----------------------------------------------------------------
     # Chat History Methods
     # -----------------------------------------------------------------
@@ -77,8 +77,10 @@ class TrailRecorder:
         Args:
             entry: The trail entry to log
         """
-        log_message = f"******\n{entry.agent_id}\n******\n{entry.output}\n******"
-        if entry.error:
-            log_message += f"\nERROR: {entry.error}"
-        
-        self.logger.debug(log_message) 
\ No newline at end of file
+        def build() -> str:
+            log_message = f"******\n{entry.agent_id}\n******\n{self.logger.truncate(entry.output)}\n******"
+            if entry.error:
+                log_message += f"\nERROR: {entry.error}"
+            return log_message
+
+        self.logger.debug(build) 
\ No newline at end of file
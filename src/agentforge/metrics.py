@@ -0,0 +1,443 @@
+"""
+Process-wide metrics for AgentForge.
+
+Counters, gauges and fixed-bucket histograms updated by the model wrappers, the agent
+runner, the memory manager and Chroma storage. Read them in-process with ``snapshot()``,
+render them in the Prometheus text format with ``render_prometheus()``, or serve them
+for scraping with ``start_http_server()``.
+"""
+
+import bisect
+import contextlib
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds; the last bucket catches everything slower
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf"),
+)
+
+
+def bucket_percentile(bounds: Sequence[float], counts: Sequence[int], pct: float) -> Optional[float]:
+    """
+    Return the upper bound of the bucket holding the given percentile, or None without samples.
+
+    Args:
+        bounds: Bucket upper bounds, ascending.
+        counts: Per-bucket (non-cumulative) sample counts, aligned with ``bounds``.
+        pct: Percentile between 0 and 100.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    target = max(1, round(pct / 100 * total))
+    seen = 0
+    for bound, count in zip(bounds, counts):
+        seen += count
+        if seen >= target:
+            return bound
+    return bounds[-1]
+
+
+# ---------------------------------
+# Metric types
+# ---------------------------------
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}")
+        try:
+            return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            raise ValueError(f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}") from None
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"labels": self._labels(key), "value": value} for key, value in self._values.items()]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """A value that only goes up, such as requests served or retries taken."""
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """A value that can go up and down, such as requests currently in flight."""
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    @contextlib.contextmanager
+    def track_in_progress(self, **labels: Any):
+        """Increment the gauge for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class _Timer(contextlib.ContextDecorator):
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, Any]):
+        self._histogram = histogram
+        self._labels = labels
+        self._start = 0.0
+
+    def _recreate_cm(self):
+        # A fresh timer per decorated call keeps concurrent calls from sharing a start time
+        return _Timer(self._histogram, self._labels)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution of observed values, such as request latency in seconds."""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        buckets = tuple(sorted(buckets))
+        if not buckets or buckets[-1] != float("inf"):
+            buckets += (float("inf"),)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"count": 0, "sum": 0.0, "counts": [0] * len(self.buckets)}
+            entry["count"] += 1
+            entry["sum"] += value
+            entry["counts"][index] += 1
+
+    def time(self, **labels: Any) -> _Timer:
+        """Observe the wall time of a block or decorated function, in seconds."""
+        return _Timer(self, labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry["count"] if entry else 0
+
+    def percentile(self, pct: float, **labels: Any) -> Optional[float]:
+        """Upper bound of the bucket containing the given percentile, or None without samples."""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            counts = list(entry["counts"]) if entry else []
+        return bucket_percentile(self.buckets, counts, pct) if counts else None
+
+    def samples(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [(key, entry["count"], entry["sum"], list(entry["counts"]))
+                       for key, entry in self._values.items()]
+        samples = []
+        for key, count, total, counts in entries:
+            cumulative, buckets = 0, {}
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                buckets[_format_value(bound)] = cumulative
+            samples.append({
+                "labels": self._labels(key),
+                "count": count,
+                "sum": total,
+                "buckets": buckets,
+                "p50": bucket_percentile(self.buckets, counts, 50),
+                "p95": bucket_percentile(self.buckets, counts, 95),
+                "p99": bucket_percentile(self.buckets, counts, 99),
+            })
+        return samples
+
+
+# ---------------------------------
+# Registry
+# ---------------------------------
+
+class MetricsRegistry:
+    """
+    Holds every registered metric plus collectors that build metrics at read time.
+
+    Collectors are callables returning metric objects; they expose aggregates already kept
+    elsewhere (token usage, prompt-cache stats) without counting twice on the hot path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.type} "
+                                 f"with labels {metric.labelnames}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def collect(self) -> List[_Metric]:
+        """Return the registered metrics followed by the metrics built by each collector."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                metrics.extend(collector())
+            except Exception:
+                # A failing collector must not break the scrape
+                pass
+        return metrics
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return ``{name: {"type", "help", "samples": [...]}}`` for every metric with samples."""
+        result = {}
+        for metric in self.collect():
+            samples = metric.samples()
+            if samples:
+                result[metric.name] = {"type": metric.type, "help": metric.documentation, "samples": samples}
+        return result
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self.collect():
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for sample in samples:
+                labels = sample["labels"]
+                if metric.type == "histogram":
+                    for bound, count in sample["buckets"].items():
+                        lines.append(f"{metric.name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {sample['count']}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(sample['value'])}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def reset(self) -> None:
+        """Clear the values of every registered metric; registrations and collectors are kept."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return str(value)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Return the counter registered under ``name`` in the default registry, creating it if needed."""
+    return REGISTRY.counter(name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Return the gauge registered under ``name`` in the default registry, creating it if needed."""
+    return REGISTRY.gauge(name, documentation, labelnames)
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    """Return the histogram registered under ``name`` in the default registry, creating it if needed."""
+    return REGISTRY.histogram(name, documentation, labelnames, buckets)
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of the default registry; see :meth:`MetricsRegistry.snapshot`."""
+    return REGISTRY.snapshot()
+
+
+def render_prometheus() -> str:
+    """Prometheus text rendering of the default registry."""
+    return REGISTRY.render_prometheus()
+
+
+def reset() -> None:
+    """Clear every value in the default registry (for tests and benchmarks)."""
+    REGISTRY.reset()
+
+
+# ---------------------------------
+# Built-in collectors
+# ---------------------------------
+
+def _collect_token_usage() -> List[_Metric]:
+    from agentforge.utils.token_accounting import TokenAccountant
+
+    usage = TokenAccountant.snapshot()
+    calls = Counter("agentforge_model_calls_total", "Successful model calls, by model.", ("model",))
+    tokens = Counter("agentforge_model_tokens_total", "Tokens used by model calls, by model and kind.",
+                     ("model", "kind"))
+    agent_tokens = Counter("agentforge_agent_tokens_total", "Tokens used by model calls, by agent and kind.",
+                           ("agent", "kind"))
+    for model, totals in usage["models"].items():
+        calls.inc(totals["calls"], model=model)
+        tokens.inc(totals["prompt_tokens"], model=model, kind="prompt")
+        tokens.inc(totals["completion_tokens"], model=model, kind="completion")
+    for agent, totals in usage["agents"].items():
+        agent_tokens.inc(totals["prompt_tokens"], agent=agent, kind="prompt")
+        agent_tokens.inc(totals["completion_tokens"], agent=agent, kind="completion")
+    return [calls, tokens, agent_tokens]
+
+
+def _collect_prompt_cache() -> List[_Metric]:
+    from agentforge.apis.prompt_cache import PromptCacheStats
+
+    requests = Counter("agentforge_prompt_cache_requests_total",
+                       "Responses that reported prompt-cache usage, by model and result.", ("model", "result"))
+    tokens = Counter("agentforge_prompt_cache_tokens_total",
+                     "Prompt tokens by model and cache state (cached, cache_write, prompt).", ("model", "kind"))
+    for model, stats in PromptCacheStats.snapshot().items():
+        requests.inc(stats["hits"], model=model, result="hit")
+        requests.inc(stats["misses"], model=model, result="miss")
+        for kind in ("cached", "cache_write"):
+            tokens.inc(stats[f"{kind}_tokens"], model=model, kind=kind)
+        tokens.inc(stats["prompt_tokens"], model=model, kind="prompt")
+    return [requests, tokens]
+
+
+REGISTRY.register_collector(_collect_token_usage)
+REGISTRY.register_collector(_collect_prompt_cache)
+
+
+# ---------------------------------
+# HTTP endpoint
+# ---------------------------------
+
+def start_http_server(port: int = 9464, addr: str = "127.0.0.1", registry: Optional[MetricsRegistry] = None):
+    """
+    Serve ``/metrics`` in the Prometheus text format from a daemon thread.
+
+    Args:
+        port (int): Port to listen on; 0 picks a free port (see ``server.server_port``).
+        addr (str): Address to bind. Defaults to localhost only.
+        registry (MetricsRegistry, optional): Registry to expose; defaults to the process registry.
+
+    Returns:
+        ThreadingHTTPServer: The running server; call ``shutdown()`` to stop it.
+    """
+    # http.server is only needed when the endpoint is used; keep it off the import path
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or REGISTRY
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes are frequent; keep them out of stderr
+            pass
+
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="agentforge-metrics", daemon=True)
+    thread.start()
+    return server
@@ -1,10 +1,42 @@
+import hashlib
+import threading
 import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Tuple
+
 from agentforge.storage.memory import Memory
 from agentforge.utils.prompt_processor import PromptProcessor
 
+
+@dataclass
+class _RecentTurns:
+    """
+    Ring buffer of the newest chat records in one collection, shared by every ChatHistoryMemory
+    in the process that writes to it. ``count`` and ``next_id`` describe the collection the
+    buffer was last synced with and make up its version.
+    """
+    storage: Any = None
+    records: Deque[dict] = field(default_factory=deque)
+    next_id: Optional[int] = None  # Sequential id of the next record; None until warmed from storage
+    count: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
 class ChatHistoryMemory(Memory):
+    """
+    Chat history for a cog. When ``_ctx`` carries a ``session_id`` and/or ``user_id``, each
+    session gets its own collection, so recency and semantic retrieval never mix conversations
+    and a session's tail read only touches that session's records.
+    """
 
     ALLOW_META = {"iso_timestamp", "id", }
+    SESSION_KEYS = ("user_id", "session_id")
+    RECENT_TURNS_CAPACITY = 100  # Records kept in the in-process recency buffer (grows if more are requested)
+    RECENT_SESSIONS_CAPACITY = 256  # Session buffers kept in process; the least recently used is dropped first
+
+    _recent_registry: "OrderedDict[Tuple[str, str], _RecentTurns]" = OrderedDict()
+    _recent_registry_lock = threading.Lock()
 
     def __init__(self, cog_name, persona=None, collection_id="chat_history"):
         super().__init__(cog_name, persona, collection_id, logger_name="ChatHistoryMemory")
@@ -12,21 +44,149 @@ class ChatHistoryMemory(Memory):
 
     def update_memory(self, ctx, output):
         turn_id = str(uuid.uuid4())
+        session = self._session_key(ctx)
+        collection_name = self.session_collection_name(**session)
 
         def make_meta(role):
             return {
                 "role": role,
                 "turn_id": turn_id,
+                **session,
             }
 
         docs  = [self.prompt_processor.value_to_markdown(ctx), self.prompt_processor.value_to_markdown(output)]
         metas = [make_meta("user"), make_meta("assistant")]
 
-        # Let Chroma auto-increment the integer IDs (or keep your own counter),
-        # but *do not* copy the partner's text into metadata.
-        self.storage.save_to_storage(self.collection_name,
-                                    data=docs,
-                                    metadata=metas)
+        # Assign the sequential ids from the recency buffer instead of letting storage scan for
+        # the current maximum, and *do not* copy the partner's text into metadata.
+        recent = self._recent_turns(collection_name)
+        with recent.lock:
+            self._sync_recent(recent, collection_name)
+            ids = [str(recent.next_id + i) for i in range(len(docs))]
+            for meta, record_id in zip(metas, ids):
+                meta["id"] = int(record_id)
+            self.storage.save_to_storage(collection_name,
+                                        data=docs,
+                                        ids=ids,
+                                        metadata=metas)
+            recent.records.extend({"content": d, "meta": dict(m)} for d, m in zip(docs, metas))
+            recent.next_id += len(docs)
+            recent.count += len(docs)
+
+    # ------------------------
+    # Sessions
+    # ------------------------
+    def _session_key(self, ctx) -> Dict[str, str]:
+        """Return the session keys (``user_id``, ``session_id``) present in ``_ctx``."""
+        if not isinstance(ctx, dict):
+            return {}
+        return {key: str(ctx[key]) for key in self.SESSION_KEYS if ctx.get(key) not in (None, "")}
+
+    def session_collection_name(self, user_id=None, session_id=None) -> str:
+        """
+        Return the collection holding one session's history. Without session keys this is the
+        node's own collection; otherwise a stable hash of the keys is appended, which keeps the name
+        within Chroma's length limit however long the ids are.
+        """
+        session = {key: str(value) for key, value in (("user_id", user_id), ("session_id", session_id))
+                   if value not in (None, "")}
+        if not session:
+            return self.collection_name
+        raw_key = "|".join(f"{key}={value}" for key, value in session.items())
+        return f"{self.collection_name}_{hashlib.blake2b(raw_key.encode('utf-8'), digest_size=8).hexdigest()}"
+
+    # ------------------------
+    # Recency Buffer
+    # ------------------------
+    def _recent_turns(self, collection_name) -> _RecentTurns:
+        key = (getattr(self.storage, "storage_id", str(id(self.storage))), collection_name)
+        with ChatHistoryMemory._recent_registry_lock:
+            registry = ChatHistoryMemory._recent_registry
+            recent = registry.get(key)
+            if recent is None or recent.storage is not self.storage:
+                recent = registry[key] = _RecentTurns(storage=self.storage)
+            registry.move_to_end(key)
+            while len(registry) > self.RECENT_SESSIONS_CAPACITY:
+                registry.popitem(last=False)
+            return recent
+
+    def _sync_recent(self, recent: _RecentTurns, collection_name) -> None:
+        """
+        Re-warm the buffer if it was never loaded or the collection changed behind its back:
+        the record count differs (deletions, other writers) or the next id is already taken
+        (another process appended). Both checks are single cheap storage calls.
+        """
+        if recent.next_id is not None:
+            try:
+                if self.storage.count_collection(collection_name) == recent.count:
+                    probe = self.storage.load_collection(collection_name, include=[], ids=[str(recent.next_id)])
+                    if not (probe or {}).get("ids"):
+                        return
+            except Exception as e:
+                self.logger.warning(f"Chat history version check failed, reloading: {e}")
+        self._warm_recent(recent, collection_name, max(self.RECENT_TURNS_CAPACITY, len(recent.records)))
+
+    def _warm_recent(self, recent: _RecentTurns, collection_name, size: int) -> None:
+        """Load the newest ``size`` records from storage into the buffer."""
+        raw = self.storage.get_last_x_entries(
+            collection_name,
+            size,
+            include=["documents", "metadatas"],
+        )
+        records = self._sort_records([
+            {"content": d, "meta": m}
+            for d, m in zip(raw.get("documents", []), raw.get("metadatas", []))
+        ])
+        record_ids = [int(r["meta"]["id"]) for r in records if isinstance(r["meta"].get("id"), int)]
+        recent.count = self.storage.count_collection(collection_name)
+        recent.records = deque(records, maxlen=max(size, self.RECENT_TURNS_CAPACITY))
+        recent.next_id = max(record_ids, default=recent.count) + 1
+        self.logger.debug(f"Warmed chat history buffer with {len(records)} of {recent.count} records")
+
+    def _reset_recent(self, collection_name=None) -> None:
+        """
+        Forget the buffer of one collection, or by default the buffers of this node's collection
+        and all of its sessions.
+        """
+        base = self.collection_name
+
+        def matches(name):
+            if collection_name is not None:
+                return name == collection_name
+            return name == base or name.startswith(base + "_")
+
+        with ChatHistoryMemory._recent_registry_lock:
+            buffers = [recent for (_, name), recent in ChatHistoryMemory._recent_registry.items()
+                       if recent.storage is self.storage and matches(name)]
+        for recent in buffers:
+            with recent.lock:
+                recent.records.clear()
+                recent.next_id = None
+                recent.count = 0
+
+    def delete(self, ids, _ctx=None) -> None:
+        """
+        Delete records from the session named by ``_ctx`` (the unscoped history by default).
+        Record ids are only unique within a session, so the session must be given to delete its records.
+        """
+        collection_name = self.session_collection_name(**self._session_key(_ctx))
+        self._prepare_delete(ids)
+        try:
+            self._execute_delete(ids, collection_name)
+            self._post_delete(ids, collection_name)
+        except Exception as e:
+            self._handle_delete_error(e, ids)
+
+    def _execute_delete(self, ids, collection_name=None):
+        self.storage.delete_from_storage(collection_name=collection_name or self.collection_name, ids=ids)
+
+    def _post_delete(self, ids, collection_name=None):
+        self._reset_recent(collection_name or self.collection_name)
+        super()._post_delete(ids)
+
+    def _post_wipe(self):
+        self._reset_recent()
+        super()._post_wipe()
 
     # ------------------------
     # Helpers
@@ -52,19 +212,23 @@ class ChatHistoryMemory(Memory):
             })
         return formatted
 
-    def _get_recency_records(self, num_results):
-        raw = self.storage.get_last_x_entries(
-            self.collection_name,
-            num_results,
-            include=["documents", "metadatas"],
-        )
-        records = [
-            {"content": d, "meta": m}
-            for d, m in zip(raw["documents"], raw["metadatas"])
-        ]
-        return self._sort_records(records)
+    def _get_recency_records(self, num_results, collection_name=None):
+        """
+        Return the newest ``num_results`` records (all of them for 0), oldest first, from the
+        recency buffer. Storage is only read to warm the buffer or when more records are requested
+        than it holds.
+        """
+        collection_name = collection_name or self.collection_name
+        recent = self._recent_turns(collection_name)
+        with recent.lock:
+            self._sync_recent(recent, collection_name)
+            holds_all = len(recent.records) >= recent.count
+            if not holds_all and (num_results == 0 or num_results > len(recent.records)):
+                self._warm_recent(recent, collection_name, num_results or recent.count)
+            records = [{"content": r["content"], "meta": dict(r["meta"])} for r in recent.records]
+        return records[-num_results:] if num_results else records
 
-    def _get_semantic_records(self, query_texts, max_retrieval, recency_records):
+    def _get_semantic_records(self, query_texts, max_retrieval, recency_records, collection_name=None):
         # Calculate a filter to avoid fetching items already in the recency slice
         min_id = None
         if recency_records:
@@ -79,7 +243,7 @@ class ChatHistoryMemory(Memory):
         overshoot = max_retrieval + len(recency_records) * 2
 
         raw_semantic = self.storage.query_storage(
-            collection_name=self.collection_name,
+            collection_name=collection_name or self.collection_name,
             query=query_texts,
             filter_condition=filter_condition,
             num_results=overshoot,
@@ -105,9 +269,14 @@ class ChatHistoryMemory(Memory):
     # Public
     # ------------------------
     def query_memory(self, num_results=20, max_retrieval=20, query_keys=None, _ctx=None, _state=None, **kwargs):
-        """Populate self.store with 'history' (recency) and optionally 'relevant' (semantic)."""
+        """
+        Populate self.store with 'history' (recency) and optionally 'relevant' (semantic),
+        both limited to the session named by ``_ctx`` (see session_collection_name).
+        """
+        collection_name = self.session_collection_name(**self._session_key(_ctx))
+
         # Phase 1 – recency slice
-        recency_records = self._get_recency_records(num_results)
+        recency_records = self._get_recency_records(num_results, collection_name)
         self.store["history"] = self._format_records(recency_records)
 
         # Phase 2 – semantic slice
@@ -124,7 +293,8 @@ class ChatHistoryMemory(Memory):
                 if not query_texts and recency_records:
                     query_texts = recency_records[-1]["content"]
             if query_texts:
-                semantic_records = self._get_semantic_records(query_texts, max_retrieval, recency_records)
+                semantic_records = self._get_semantic_records(query_texts, max_retrieval, recency_records,
+                                                              collection_name)
                 if not semantic_records:
                     semantic_records = [{"content": "No relevant records found in memory", "meta": {"role": "memory_system"}}]
 
@@ -76,6 +76,79 @@ def get_collection_info(db_path: str, collection_name: str) -> Tuple[Optional[st
         conn.close()
 
 
+HNSW_INDEX_FILES = ("header.bin", "data_level0.bin", "length.bin", "link_lists.bin")
+
+
+def inspect_storage(db_path: str) -> List[Dict[str, Any]]:
+    """
+    Reads per-collection sizes and vector index health straight from SQLite and disk.
+
+    No Chroma client or embedding model is created, so this is safe to run against a
+    live database. Each entry reports the collection name, record count, vector segment
+    UUID, on-disk index size and a status:
+
+      - ``ok``: the HNSW index files are present
+      - ``empty``: the collection has no records
+      - ``unflushed``: records exist but Chroma has not persisted an index yet
+        (small collections are served from the write-ahead log until they grow)
+      - ``missing_segment``: no vector segment is registered for the collection
+      - ``incomplete_index``: the index directory is missing some HNSW files
+    """
+    sqlite_path = os.path.join(db_path, "chroma.sqlite3")
+    if not os.path.exists(sqlite_path):
+        return []
+
+    conn = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id, name FROM collections ORDER BY name")
+        collections = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT s.collection, COUNT(*)
+            FROM embeddings e
+            JOIN segments s ON e.segment_id = s.id
+            GROUP BY s.collection
+        """)
+        counts = dict(cursor.fetchall())
+
+        try:
+            cursor.execute("SELECT collection, id FROM segments WHERE scope = 'VECTOR'")
+            vector_segments = dict(cursor.fetchall())
+        except sqlite3.OperationalError:
+            vector_segments = {}
+    finally:
+        conn.close()
+
+    report = []
+    for collection_uuid, name in collections:
+        count = counts.get(collection_uuid, 0)
+        segment_uuid = vector_segments.get(collection_uuid)
+        index_dir = os.path.join(db_path, segment_uuid) if segment_uuid else None
+        present = [f for f in HNSW_INDEX_FILES if index_dir and os.path.exists(os.path.join(index_dir, f))]
+        index_bytes = sum(os.path.getsize(os.path.join(index_dir, f)) for f in present)
+
+        if not segment_uuid:
+            status = "missing_segment"
+        elif count == 0:
+            status = "empty"
+        elif not present:
+            status = "unflushed"
+        elif len(present) < len(HNSW_INDEX_FILES):
+            status = "incomplete_index"
+        else:
+            status = "ok"
+
+        report.append({
+            "collection": name,
+            "records": count,
+            "vector_segment": segment_uuid,
+            "index_bytes": index_bytes,
+            "status": status,
+        })
+    return report
+
+
 def backup_target_files(db_path: str, segment_uuid: Optional[str]) -> str:
     """Backs up only the specific files being modified to a .dbbackup directory."""
     sqlite_path = os.path.join(db_path, "chroma.sqlite3")
@@ -5,17 +5,19 @@ from datetime import datetime
 from typing import Optional, Union
 import threading
 from agentforge.storage.chroma_recover import auto_recover
-import chromadb
-from chromadb.config import Settings
-from chromadb.utils import embedding_functions
 # from scipy.ndimage import value_indices
 
-from agentforge.utils.logger import Logger
+from agentforge import metrics
+from agentforge.utils.logger import LazyLogger
 from agentforge.config import Config
 
-logger = Logger(name="Chroma Utils", default_logger='chroma_utils')
+# chromadb is imported where the client and embeddings are created, not at module import
+logger = LazyLogger(name="Chroma Utils", default_logger='chroma_utils')
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+STORAGE_OPERATION_SECONDS = metrics.histogram(
+    "agentforge_storage_operation_seconds", "Latency of Chroma storage operations, by operation.", ("operation",))
+
 
 ##########################################################
 # Section 1: Static Methods
@@ -247,6 +249,9 @@ class ChromaStorage:
         """
         try:
             if self.client is None:
+                import chromadb
+                from chromadb.config import Settings
+
                 storage_settings = self.config.settings.storage
 
                 if storage_settings['options'].get('use_http_client', False):
@@ -284,6 +289,8 @@ class ChromaStorage:
             Exception: For any errors that occur during the initialization of embeddings.
         """
         try:
+            from chromadb.utils import embedding_functions
+
             self.db_path, self.db_embed = self.chromadb_settings()
 
             # Initialize embedding based on the specified backend in the configuration
@@ -341,6 +348,7 @@ class ChromaStorage:
 
         self.client.reset()
 
+    @STORAGE_OPERATION_SECONDS.time(operation="embed")
     def return_embedding(self, text_to_embed: str):
         """
         Generates an embedding for the given text using the configured embedding function.
@@ -358,8 +366,7 @@ class ChromaStorage:
     ##########################################################
 
     def _calculate_num_results(self, num_results, collection_name):
-        self.select_collection(collection_name)
-        max_result_count = self.collection.count()
+        max_result_count = self.select_collection(collection_name).count()
         return max_result_count if num_results == 0 else min(num_results, max_result_count)
 
     def _prepare_query_params(self, query, filter_condition, include, embeddings, num_results, collection_name):
@@ -403,19 +410,28 @@ class ChromaStorage:
         """
         Selects (or creates if not existent) a collection within the storage by name.
 
+        One storage instance is shared by every memory node of a cog or persona, and nodes are
+        queried from several threads, so operations use the returned handle. ``self.collection``
+        only records the last selection and must not be read back by another operation.
+
         Parameters:
             collection_name (str): The name of the collection to select or create.
 
+        Returns:
+            The selected collection.
+
         Raises:
             ValueError: If there's an error in getting or creating the collection.
         """
         try:
             collection_name = validate_collection_name(collection_name)
-            self.collection = self.client.get_or_create_collection(name=collection_name,
-                                                                   embedding_function=self.embedding,
-                                                                   metadata={"hnsw:space": "cosine"})
+            collection = self.client.get_or_create_collection(name=collection_name,
+                                                              embedding_function=self.embedding,
+                                                              metadata={"hnsw:space": "cosine"})
         except Exception as e:
             raise ValueError(f"\n\nError getting or creating collection. Error: {e}")
+        self.collection = collection
+        return collection
 
     @auto_recover
     def delete_collection(self, collection_name: str):
@@ -441,8 +457,7 @@ class ChromaStorage:
         Returns:
             int: The number of documents in the specified collection.
         """
-        self.select_collection(collection_name)
-        return self.collection.count()
+        return self.select_collection(collection_name).count()
 
     @auto_recover
     def peek(self, collection_name: str):
@@ -456,13 +471,13 @@ class ChromaStorage:
             dict or None: A dictionary containing a brief overview of the collection's contents or None if an error occurs.
         """
         try:
-            self.select_collection(collection_name)
+            collection = self.select_collection(collection_name)
 
-            max_result_count = self.collection.count()
+            max_result_count = collection.count()
             num_results = min(10, max_result_count)
 
             if num_results > 0:
-                result = self.collection.peek()
+                result = collection.peek()
             else:
                 result = {'documents': "No Results!"}
 
@@ -471,8 +486,10 @@ class ChromaStorage:
             logger.error(f"Error peeking collection: {e}")
             return None
 
+    @STORAGE_OPERATION_SECONDS.time(operation="load")
     @auto_recover
-    def load_collection(self, collection_name: str, include: list = None, where: dict = None, where_doc: dict = None):
+    def load_collection(self, collection_name: str, include: list = None, where: dict = None, where_doc: dict = None,
+                        ids: list = None):
         """
         Loads data from a specified collection based on provided filters.
         Parameters:
@@ -480,6 +497,7 @@ class ChromaStorage:
             include(dict, optional): Specify which data to return. Will return all results if no filters are specified.
             where (dict, optional): Filter to apply in metadata. Will return documents and metadata by default.
             where_doc (dict, optional): Filter to apply in document. Not applied if not specified.
+            ids (list, optional): Only load the records with these IDs.
         Returns:
             list or None: The data loaded from the collection, or None if an error occurs.
         """
@@ -497,9 +515,11 @@ class ChromaStorage:
         if where_doc is not None:
             params.update(where_document=where_doc)
 
+        if ids is not None:
+            params.update(ids=ids)
+
         try:
-            self.select_collection(collection_name)
-            data = self.collection.get(**params)
+            data = self.select_collection(collection_name).get(**params)
             logger.debug(
                 f"\nCollection: {collection_name}"
                 f"\nData: {data}",
@@ -530,6 +550,7 @@ class ChromaStorage:
             metadata[i]['id'] = next_id
         return new_ids, metadata
 
+    @STORAGE_OPERATION_SECONDS.time(operation="save")
     @auto_recover
     def save_to_storage(self, collection_name: str, data: list, ids: Optional[list] = None,
                         metadata: Optional[list[dict]] = None):
@@ -560,8 +581,7 @@ class ChromaStorage:
             apply_unix_timestamps(metadata, self.config.settings.storage)
             apply_iso_timestamps(metadata, self.config.settings.storage)
 
-            self.select_collection(collection_name)
-            self.collection.upsert(
+            self.select_collection(collection_name).upsert(
                 documents=data,
                 metadatas=metadata,
                 ids=ids
@@ -569,6 +589,7 @@ class ChromaStorage:
         except Exception as e:
             raise ValueError(f"[ChromaStorage][save_to_storage] Error saving to storage. Error: {e}\n\nData:\n{data}")
 
+    @STORAGE_OPERATION_SECONDS.time(operation="query")
     @auto_recover
     def query_storage(self, collection_name: str, query: Optional[Union[str, list]] = None,
                       filter_condition: Optional[dict] = None, include: Optional[list] = None,
@@ -603,8 +624,7 @@ class ChromaStorage:
 
             result = {}
             if query_params:
-                self.select_collection(collection_name)
-                unformatted_result = self.collection.query(**query_params)
+                unformatted_result = self.select_collection(collection_name).query(**query_params)
 
                 if unformatted_result:
                     for key, value in unformatted_result.items():
@@ -617,18 +637,36 @@ class ChromaStorage:
             logger.error(f"[query_memory] Error querying storage: {e}")
             return None
 
+    @STORAGE_OPERATION_SECONDS.time(operation="update")
+    @auto_recover
+    def update_metadata(self, collection_name: str, ids: list, metadata: list[dict]):
+        """
+        Replaces the metadata of existing records without re-embedding their documents.
+
+        Parameters:
+            collection_name (str): The name of the collection holding the records.
+            ids (list): The IDs of the records to update.
+            metadata (list[dict]): The new metadata for each record, in the same order as `ids`.
+        """
+        if len(ids) != len(metadata):
+            raise ValueError("[ChromaStorage][update_metadata] ids and metadata must have the same length")
+        if not ids:
+            return
+        self.select_collection(collection_name).update(ids=ids, metadatas=metadata)
+
+    @STORAGE_OPERATION_SECONDS.time(operation="delete")
     @auto_recover
     def delete_from_storage(self, collection_name, ids):
         if ids and not isinstance(ids, list):
             ids = [ids]
 
-        self.select_collection(collection_name)
-        self.collection.delete(ids=ids)
+        self.select_collection(collection_name).delete(ids=ids)
 
     ##########################################################
     # Section 7: Advanced
     ##########################################################
 
+    @STORAGE_OPERATION_SECONDS.time(operation="search_threshold")
     @auto_recover
     def search_storage_by_threshold(self, collection_name: str, query: str, threshold: float = 0.8,
                                     num_results: int = 1):
@@ -681,8 +719,8 @@ class ChromaStorage:
     @auto_recover
     def search_metadata_min_max(self, collection_name, metadata_tag, min_max):
         try:
-            self.select_collection(collection_name)
-            results = self.collection.get()
+            collection = self.select_collection(collection_name)
+            results = collection.get()
 
             # Gracefully handle empty or missing lists
             metadatas = results.get("metadatas", [])
@@ -711,7 +749,7 @@ class ChromaStorage:
             if target_index >= len(ids):
                 return None
 
-            target_entry = self.collection.get(ids=[ids[target_index]])
+            target_entry = collection.get(ids=[ids[target_index]])
             return {
                 "ids": target_entry["ids"][0],
                 "target": target_entry["metadatas"][0][metadata_tag],
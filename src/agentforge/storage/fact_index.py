@@ -0,0 +1,296 @@
+"""
+Exact and near-duplicate index for the facts in a storage collection.
+
+A FactIndex keeps, for every document in a collection, a hash of its normalized text (for O(1)
+exact matches) and a MinHash signature of its words (for near duplicates such as rephrasings that
+add or drop a word). Facts whose negation words differ ("likes" / "does not like") are never
+treated as near duplicates. Signatures are split into LSH bands, so a lookup only compares against facts
+sharing at least one band instead of the whole collection.
+
+The index lives in a JSON sidecar next to the Chroma database (``<persist_directory>/fact_index/``).
+Facts saved or deleted through it are appended to a JSON-lines log beside the snapshot, and the
+log is folded back into the snapshot once it grows as large as the snapshot, so each update costs one
+short append rather than a rewrite of the whole sidecar. When the sidecar is missing or its
+document count no longer matches the collection, it is rebuilt from ``load_collection`` in one pass.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from agentforge.utils.logger import Logger
+
+_WORDS = re.compile(r"[\w']+")
+
+NUM_PERM = 64
+BANDS = 16
+_ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_NEGATIONS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without"}
+
+
+def normalize_fact(text: str) -> str:
+    """Lower-case, drop punctuation and collapse whitespace."""
+    return " ".join(_WORDS.findall(str(text).lower()))
+
+
+def fact_hash(text: str) -> str:
+    """Stable hash of a fact's normalized text."""
+    return hashlib.blake2b(normalize_fact(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def minhash(text: str) -> List[int]:
+    """
+    Signature of a fact: its negation parity followed by the MinHash of its distinct words.
+    """
+    words = set(normalize_fact(text).split()) or {""}
+    polarity = sum(1 for w in words if w in _NEGATIONS or w.endswith("n't")) % 2
+    hashes = [int.from_bytes(hashlib.blake2b(w.encode("utf-8"), digest_size=8).digest(), "big") for w in words]
+    return [polarity] + [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures (0 when their negation parity differs)."""
+    if a[0] != b[0]:
+        return 0.0
+    return sum(1 for x, y in zip(a[1:], b[1:]) if x == y) / NUM_PERM
+
+
+def _bands(signature: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+    values = signature[1:]
+    return [(band, (signature[0],) + tuple(values[band * _ROWS:(band + 1) * _ROWS])) for band in range(BANDS)]
+
+
+class FactIndex:
+    """
+    Per-collection exact and near-duplicate index.
+
+    Use ``FactIndex.for_collection(storage, collection_name)`` to get the shared instance for a
+    collection. ``threshold`` is the estimated word-level Jaccard similarity at or above which a
+    fact counts as a near duplicate of a stored one.
+    """
+
+    # The update log is compacted once it holds this many entries, or as many as the snapshot if more
+    COMPACT_EVERY = 256
+
+    _registry: Dict[Tuple[str, str], "FactIndex"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, storage: Any, collection_name: str, threshold: float = 0.8):
+        self.storage = storage
+        self.collection_name = collection_name
+        self.threshold = threshold
+        self.logger = Logger("FactIndex", "memory")
+        self._lock = threading.RLock()
+        self._signatures: Dict[str, List[int]] = {}
+        self._band_index: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._count: Optional[int] = None
+        self._path = self._sidecar_path()
+        self._log_path = self._path.with_suffix(".log") if self._path is not None else None
+        self._log_entries = 0
+        self._snapshot_size = 0
+
+    @classmethod
+    def for_collection(cls, storage: Any, collection_name: str) -> "FactIndex":
+        """Return the shared index for a storage collection, creating it on first use."""
+        key = (getattr(storage, "storage_id", str(id(storage))), collection_name)
+        with cls._registry_lock:
+            index = cls._registry.get(key)
+            if index is None or index.storage is not storage:
+                index = cls._registry[key] = cls(storage, collection_name)
+            return index
+
+    @classmethod
+    def clear_registry(cls) -> None:
+        with cls._registry_lock:
+            cls._registry.clear()
+
+    # ---------------------------------
+    # Lookups
+    # ---------------------------------
+
+    def find_duplicate(self, fact: str) -> Optional[str]:
+        """Return ``"exact"`` or ``"near"`` if the collection already holds this fact, else None."""
+        self.sync()
+        with self._lock:
+            return self._match(fact_hash(fact), minhash(fact))
+
+    def filter_new(self, facts: Iterable[str]) -> List[str]:
+        """
+        Return the facts that are neither in the collection nor duplicates of an earlier fact
+        in the same list, preserving order. The whole batch is checked in one pass.
+        """
+        self.sync()
+        accepted: List[str] = []
+        batch_hashes: Set[str] = set()
+        batch_signatures: List[List[int]] = []
+        with self._lock:
+            for fact in facts:
+                digest, signature = fact_hash(fact), minhash(fact)
+                if self._match(digest, signature) or digest in batch_hashes or any(
+                        similarity(signature, other) >= self.threshold for other in batch_signatures):
+                    self.logger.debug(f"Skipping duplicate fact: {fact}")
+                    continue
+                accepted.append(fact)
+                batch_hashes.add(digest)
+                batch_signatures.append(signature)
+        return accepted
+
+    # ---------------------------------
+    # Updates
+    # ---------------------------------
+
+    def add(self, facts: Iterable[str]) -> None:
+        """Record facts that were just saved to the collection, then append them to the sidecar log."""
+        with self._lock:
+            entries = []
+            for fact in facts:
+                digest, signature = fact_hash(fact), minhash(fact)
+                self._insert(digest, signature)
+                self._count = (self._count or 0) + 1
+                entries.append({"add": digest, "signature": signature, "count": self._count})
+            self._append(entries)
+
+    def remove(self, facts: Iterable[str]) -> None:
+        """Forget facts that were deleted from the collection, then append them to the sidecar log."""
+        with self._lock:
+            entries = []
+            for fact in facts:
+                digest = fact_hash(fact)
+                self._discard(digest)
+                self._count = max(0, (self._count or 0) - 1)
+                entries.append({"remove": digest, "count": self._count})
+            self._append(entries)
+
+    def sync(self) -> None:
+        """Load the sidecar on first use and rebuild it if the collection changed behind its back."""
+        with self._lock:
+            if self._count is None:
+                self._load()
+            try:
+                actual = self.storage.count_collection(self.collection_name)
+            except Exception as e:
+                self.logger.warning(f"Could not count collection '{self.collection_name}': {e}")
+                return
+            if actual != self._count:
+                self.rebuild()
+
+    def rebuild(self) -> None:
+        """Re-index every document in the collection."""
+        with self._lock:
+            data = self.storage.load_collection(self.collection_name, include=["documents"]) or {}
+            documents = data.get("documents") or []
+            self._signatures.clear()
+            self._band_index.clear()
+            for document in documents:
+                self._insert(fact_hash(document), minhash(document))
+            self._count = len(documents)
+            self.logger.debug(f"Rebuilt fact index for '{self.collection_name}' with {len(documents)} facts")
+            self._save()
+
+    # ---------------------------------
+    # Internals
+    # ---------------------------------
+
+    def _match(self, digest: str, signature: List[int]) -> Optional[str]:
+        if digest in self._signatures:
+            return "exact"
+        candidates: Set[str] = set()
+        for band in _bands(signature):
+            candidates |= self._band_index.get(band, set())
+        if any(similarity(signature, self._signatures[c]) >= self.threshold for c in candidates):
+            return "near"
+        return None
+
+    def _insert(self, digest: str, signature: List[int]) -> None:
+        self._signatures[digest] = signature
+        for band in _bands(signature):
+            self._band_index.setdefault(band, set()).add(digest)
+
+    def _discard(self, digest: str) -> None:
+        signature = self._signatures.pop(digest, None)
+        if signature is not None:
+            for band in _bands(signature):
+                self._band_index.get(band, set()).discard(digest)
+
+    def _sidecar_path(self) -> Optional[Path]:
+        db_path = getattr(self.storage, "db_path", None)
+        if not isinstance(db_path, (str, os.PathLike)):
+            return None
+        return Path(db_path) / "fact_index" / f"{self.collection_name}.json"
+
+    def _load(self) -> None:
+        if self._path is None or not self._path.exists():
+            return
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+            for digest, signature in data.get("facts", {}).items():
+                self._insert(digest, [int(v) for v in signature])
+            self._count = data.get("count")
+            self._snapshot_size = len(self._signatures)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable fact index '{self._path}': {e}")
+            self._signatures.clear()
+            self._band_index.clear()
+            return
+        self._replay_log()
+
+    def _replay_log(self) -> None:
+        """
+        Apply the updates logged since the last snapshot. Entries carry absolute counts, so entries
+        already folded into the snapshot replay harmlessly; a torn last line ends the replay.
+        """
+        if not self._log_path.exists():
+            return
+        with self._log_path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                    if "add" in entry:
+                        self._insert(entry["add"], [int(v) for v in entry["signature"]])
+                    else:
+                        self._discard(entry["remove"])
+                    self._count = entry["count"]
+                except Exception:
+                    self.logger.warning(f"Ignoring the rest of fact index log '{self._log_path}' after a bad entry")
+                    break
+                self._log_entries += 1
+            else:
+                return
+        # Start a clean log so later appends do not land behind the bad entry
+        self._save()
+
+    def _append(self, entries: List[Dict[str, Any]]) -> None:
+        if self._path is None or not entries:
+            return
+        self._log_entries += len(entries)
+        if self._log_entries >= max(self.COMPACT_EVERY, self._snapshot_size) or not self._path.exists():
+            self._save()
+            return
+        try:
+            with self._log_path.open("a", encoding="utf-8") as fh:
+                fh.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        except Exception as e:
+            self.logger.warning(f"Could not append to fact index log '{self._log_path}': {e}")
+
+    def _save(self) -> None:
+        """Write a full snapshot and start a new log."""
+        if self._path is None:
+            return
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"count": self._count, "facts": self._signatures}), encoding="utf-8")
+            os.replace(tmp, self._path)
+            self._log_path.unlink(missing_ok=True)
+            self._log_entries = 0
+            self._snapshot_size = len(self._signatures)
+        except Exception as e:
+            self.logger.warning(f"Could not write fact index '{self._path}': {e}")
@@ -163,6 +163,15 @@ class Memory:
         )
         self.logger.debug(f"Updated memory with {len(processed_data)} entries.")
 
+    def end_run(self, run_id: Optional[str]) -> None:
+        """
+        Hook called by the MemoryManager when a cog run finishes. Override to drop per-run state.
+
+        Args:
+            run_id (Optional[str]): The finished run's id (see agentforge.utils.token_accounting).
+        """
+        pass
+
     # -----------------------------------------------------------------
     # Delete Methods
     # -----------------------------------------------------------------
@@ -6,11 +6,55 @@ and narratives, integrating with specialized agents for retrieval, narrative gen
 and updates.
 """
 
+import time
+from dataclasses import dataclass
 from typing import Optional, Dict, Any, List, Union, Tuple
 from agentforge.storage.memory import Memory
 from agentforge.agent import Agent
 from agentforge.utils.logger import Logger
 from agentforge.utils.prompt_processor import PromptProcessor
+from agentforge.utils.token_accounting import current_run_id
+from agentforge.storage.fact_index import FactIndex, normalize_fact
+from agentforge.storage.persona_update_worker import PersonaUpdateWorker, UpdateJob, snapshot
+
+# Retrieval only considers facts that have not been superseded by a later update.
+# $ne also matches facts stored without the flag, such as those saved before it existed.
+ACTIVE_FACTS_FILTER = {"superseded": {"$ne": True}}
+
+
+def compact_superseded_facts(storage: Any, collection_name: str, retention_seconds: float,
+                             fact_index: Optional[FactIndex] = None) -> int:
+    """
+    Delete facts that were superseded more than ``retention_seconds`` ago.
+
+    Superseded facts are already excluded from retrieval; compaction removes them from storage
+    (and from the fact index) so the collection does not grow without bound.
+    Returns the number of facts deleted.
+    """
+    data = storage.load_collection(collection_name, include=["documents", "metadatas"],
+                                   where={"superseded": True}) or {}
+    cutoff = time.time() - retention_seconds
+    expired_ids, expired_docs = [], []
+    for fact_id, document, meta in zip(data.get("ids") or [], data.get("documents") or [], data.get("metadatas") or []):
+        if float((meta or {}).get("superseded_at", 0)) <= cutoff:
+            expired_ids.append(fact_id)
+            expired_docs.append(document)
+    if expired_ids:
+        storage.delete_from_storage(collection_name=collection_name, ids=expired_ids)
+        if fact_index is not None:
+            fact_index.remove(expired_docs)
+    return len(expired_ids)
+
+
+@dataclass
+class _RetrievalContext:
+    """Facts retrieved by query_memory during one cog run, kept for update_memory to reuse."""
+    run_id: Optional[str]
+    query_keys: List[str]
+    num_results: int
+    static_persona: str
+    facts: List[str]
+
 
 # -----------------------------------------------------------------
 # Public Interface
@@ -32,6 +76,8 @@ class PersonaMemory(Memory):
         self.prompt_processor = PromptProcessor()
         self._initialize_agents()
         self.narrative: Optional[str] = None
+        self._turn_context: Optional[_RetrievalContext] = None
+        self.fact_index = FactIndex.for_collection(self.storage, self.collection_name)
 
     def _initialize_agents(self) -> None:
         """
@@ -58,9 +104,8 @@ class PersonaMemory(Memory):
     # -----------------------------------------------------------------
     # Context Preparation and Fact Retrieval
     # -----------------------------------------------------------------
-    def _load_context(self, keys: Optional[List[str]], _ctx: dict, _state: dict, num_results: int) -> Tuple[str, List[str]]:
+    def _load_context(self, query_keys: List[str], num_results: int) -> Tuple[str, List[str]]:
         static_persona = self._get_static_persona_markdown()
-        query_keys = self._extract_query_keys(keys, _ctx, _state)
         initial_facts = self._retrieve_initial_facts(query_keys, num_results)
         return static_persona, initial_facts
 
@@ -101,9 +146,55 @@ class PersonaMemory(Memory):
         results = self.storage.query_storage(
             collection_name=self.collection_name,
             query=query_keys,
+            filter_condition=ACTIVE_FACTS_FILTER,
             num_results=num_results
         )
-        return results.get('documents', [])
+        return (results or {}).get('documents', [])
+
+    # -----------------------------------------------------------------
+    # Per-Run Retrieval Reuse
+    # -----------------------------------------------------------------
+    def _remember_turn_context(self, query_keys: List[str], num_results: int, static_persona: str,
+                               facts: List[str]) -> None:
+        """
+        Keep the query phase's retrieval for the rest of the current cog run.
+        Nothing is kept outside a cog run, so direct calls always retrieve fresh.
+        """
+        run_id = current_run_id.get()
+        if run_id is None:
+            self._turn_context = None
+            return
+        self._turn_context = _RetrievalContext(run_id, list(query_keys), num_results, static_persona, list(facts))
+
+    def _current_turn_context(self) -> Optional[_RetrievalContext]:
+        """The retrieval kept for the cog run this call belongs to, if any."""
+        cached = self._turn_context
+        if cached is None or cached.run_id != current_run_id.get():
+            return None
+        return cached
+
+    def _reuse_turn_context(self, update_keys: List[str], num_results: int,
+                            cached: Optional[_RetrievalContext]) -> Optional[_RetrievalContext]:
+        """
+        Return the cached retrieval if the update can reuse it.
+
+        Reuse applies when the update keys resolve to the same values as the query keys, or when
+        looking them up surfaces no fact the query phase had not already retrieved. Otherwise the
+        update keys materially differ and the caller runs a full retrieval.
+        """
+        if cached is None or cached.num_results != num_results:
+            return None
+        if update_keys != cached.query_keys:
+            known = set(cached.facts)
+            if any(fact not in known for fact in self._retrieve_initial_facts(update_keys, num_results)):
+                return None
+        self.logger.debug("Reusing persona facts retrieved earlier in this run")
+        return cached
+
+    def end_run(self, run_id: Optional[str]) -> None:
+        """Drop the retrieval kept for a cog run once that run finishes."""
+        if self._turn_context is not None and self._turn_context.run_id == run_id:
+            self._turn_context = None
 
     # -----------------------------------------------------------------
     # Semantic Retrieval
@@ -143,9 +234,10 @@ class PersonaMemory(Memory):
         results = self.storage.query_storage(
             collection_name=self.collection_name,
             query=queries,
+            filter_condition=ACTIVE_FACTS_FILTER,
             num_results=num_results
         )
-        return results.get('documents', [])
+        return (results or {}).get('documents', [])
 
     def _deduplicate_facts(self, facts: List[str]) -> List[str]:
         """
@@ -192,24 +284,12 @@ class PersonaMemory(Memory):
     def _get_static_persona_markdown(self) -> str:
         """
         Get the static persona information formatted as markdown.
+        The rendered markdown is cached by Config per persona, cog and character cap.
         Returns:
             Markdown formatted static persona data.
         """
         from agentforge.config import Config
-        config = Config()
-        cog_config = None
-        if hasattr(self, 'cog_name') and self.cog_name:
-            try:
-                cog_data = config.load_cog_data(self.cog_name)
-                cog_config = cog_data.get('cog', {}) if cog_data else None
-            except Exception:
-                pass
-        persona_data = config.resolve_persona(cog_config=cog_config, agent_config=None)
-        if not persona_data or 'static' not in persona_data:
-            return "No static persona information available."
-        static_content = persona_data.get('static', {})
-        persona_settings = config.settings.system.persona
-        persona_md = self.prompt_processor.build_persona_markdown(static_content, persona_settings)
+        persona_md = Config().static_persona_markdown(cog_name=getattr(self, 'cog_name', None))
         return persona_md or "No static persona information available."
 
     # -----------------------------------------------------------------
@@ -227,6 +307,12 @@ class PersonaMemory(Memory):
         return 'none', []
 
     def _apply_update_action(self, action: str, new_facts: List[dict]) -> None:
+        """
+        Store the update agent's facts. For ``add``, the whole list is checked against the fact
+        index in one pass and exact or near duplicates are skipped; ``update`` facts are always stored,
+        and the facts they supersede are then marked ``superseded`` so retrieval stops returning them.
+        """
+        facts, metadata_list, pending_supersede = [], [], []
         for fact_data in new_facts:
             if not isinstance(fact_data, dict) or 'fact' not in fact_data:
                 self.logger.warning("Invalid fact format in update response")
@@ -236,56 +322,117 @@ class PersonaMemory(Memory):
             if not new_fact:
                 self.logger.warning("Empty fact provided")
                 continue
+            fact_metadata = {
+                'type': 'persona_fact',
+                'source': 'update_agent',
+                'superseded': False
+            }
+            if action == 'update':
+                superseded_ids = self._resolve_fact_ids(supersedes)
+                pending_supersede.extend(superseded_ids)
+                fact_metadata['supersedes'] = ','.join(superseded_ids)
+            elif action != 'add':
+                continue
+            facts.append(new_fact)
+            metadata_list.append(fact_metadata)
+
+        if action == 'add' and facts:
+            accepted = set(self._filter_new_facts(facts))
+            kept = [(f, m) for f, m in zip(facts, metadata_list) if f in accepted]
+            facts, metadata_list = [f for f, _ in kept], [m for _, m in kept]
+        if not facts:
+            return
+
+        for new_fact, fact_metadata in zip(facts, metadata_list):
             if action == 'add':
-                if self._is_duplicate_fact(new_fact):
-                    self.logger.debug(f"Skipping duplicate fact: {new_fact}")
-                    continue
                 self.logger.info(f"Adding new persona fact: {new_fact}")
-                fact_metadata_list = [{
-                    'type': 'persona_fact',
-                    'source': 'update_agent',
-                    'superseded': False
-                }]
-                self.storage.save_to_storage(
-                    collection_name=self.collection_name,
-                    data=[new_fact],
-                    metadata=fact_metadata_list
-                )
-            elif action == 'update':
+            else:
                 self.logger.info(f"Updating persona with new fact: {new_fact}")
-                fact_metadata_list = [{
-                    'type': 'persona_fact',
-                    'source': 'update_agent',
-                    'superseded': False,
-                    'supersedes': ','.join(supersedes) if supersedes else ''
-                }]
-                self.storage.save_to_storage(
+        self.storage.save_to_storage(
+            collection_name=self.collection_name,
+            data=facts,
+            metadata=metadata_list
+        )
+        self.fact_index.add(facts)
+        if pending_supersede:
+            self._mark_superseded(pending_supersede)
+
+    def _resolve_fact_ids(self, supersedes: List[str]) -> List[str]:
+        """
+        Map the update agent's ``supersedes`` entries to stored fact IDs.
+        Entries may be IDs or, since the agent only sees fact text, the superseded fact itself.
+        """
+        entries = [str(e) for e in (supersedes or []) if e]
+        if not entries:
+            return []
+        try:
+            found = self.storage.load_collection(self.collection_name, include=["metadatas"], ids=entries) or {}
+            resolved = list(found.get("ids") or [])
+            for entry in entries:
+                if entry in resolved:
+                    continue
+                results = self.storage.query_storage(
                     collection_name=self.collection_name,
-                    data=[new_fact],
-                    metadata=fact_metadata_list
-                )
-                self.logger.debug(f"Marked facts as superseded: {supersedes}")
+                    query=entry,
+                    filter_condition=ACTIVE_FACTS_FILTER,
+                    include=["documents"],
+                    num_results=5
+                ) or {}
+                target = normalize_fact(entry)
+                for fact_id, document in zip(results.get('ids') or [], results.get('documents') or []):
+                    if normalize_fact(document) == target and fact_id not in resolved:
+                        resolved.append(fact_id)
+                        break
+                else:
+                    self.logger.debug(f"Superseded fact not found: {entry}")
+            return resolved
+        except Exception as e:
+            self.logger.warning(f"Error resolving superseded facts: {e}")
+            return []
+
+    def _mark_superseded(self, fact_ids: List[str]) -> None:
+        """Flag stored facts as superseded, keeping the rest of their metadata."""
+        try:
+            records = self.storage.load_collection(self.collection_name, include=["metadatas"], ids=fact_ids) or {}
+            ids = list(records.get("ids") or [])
+            now = time.time()
+            metadata = [{**(meta or {}), 'superseded': True, 'superseded_at': now}
+                        for meta in records.get("metadatas") or []]
+            self.storage.update_metadata(self.collection_name, ids, metadata)
+            self.logger.debug(f"Marked facts as superseded: {ids}")
+        except Exception as e:
+            self.logger.warning(f"Error marking facts as superseded: {e}")
+
+    def compact(self, retention_seconds: Optional[float] = None) -> int:
+        """
+        Delete this persona's facts that were superseded longer ago than the retention window.
+        Defaults to ``system.persona.superseded_retention_days``. Returns the number deleted.
+        """
+        if retention_seconds is None:
+            retention_seconds = self._persona_settings().superseded_retention_days * 86400
+        removed = compact_superseded_facts(self.storage, self.collection_name, retention_seconds, self.fact_index)
+        if removed:
+            self.logger.info(f"Compacted {removed} superseded persona fact(s) from '{self.collection_name}'")
+        return removed
+
+    def _filter_new_facts(self, facts: List[str]) -> List[str]:
+        """Drop facts already in the collection, or repeated within the list, using the fact index."""
+        try:
+            return self.fact_index.filter_new(facts)
+        except Exception as e:
+            self.logger.warning(f"Error checking for duplicate facts: {e}")
+            return facts
 
     def _is_duplicate_fact(self, new_fact: str) -> bool:
         """
-        Check if an exact duplicate of the new fact already exists in storage.
+        Check if the new fact, or a near duplicate of it, already exists in storage.
         Args:
             new_fact (str): The fact to check for duplicates.
         Returns:
-            bool: True if an exact duplicate exists, False otherwise.
+            bool: True if a duplicate exists, False otherwise.
         """
         try:
-            results = self.storage.query_storage(
-                collection_name=self.collection_name,
-                query=new_fact,
-                num_results=10
-            )
-            if not results or not results.get('documents'):
-                return False
-            for document in results['documents']:
-                if document.strip() == new_fact.strip():
-                    return True
-            return False
+            return self.fact_index.find_duplicate(new_fact) is not None
         except Exception as e:
             self.logger.warning(f"Error checking for duplicate facts: {e}")
             return False
@@ -306,8 +453,10 @@ class PersonaMemory(Memory):
             num_results: Number of results to retrieve per query.
         """
         try:
-            static_persona, initial_facts = self._load_context(query_keys, _ctx, _state, num_results)
+            keys = self._extract_query_keys(query_keys, _ctx, _state)
+            static_persona, initial_facts = self._load_context(keys, num_results)
             semantic_facts = self._retrieve_semantic_facts(_ctx, _state, static_persona, initial_facts, num_results)
+            self._remember_turn_context(keys, num_results, static_persona, semantic_facts)
             narrative = self._generate_narrative(_ctx, _state, static_persona, semantic_facts)
             self.narrative = narrative
             self.store = {
@@ -327,6 +476,12 @@ class PersonaMemory(Memory):
                      num_results: int = 5) -> None:
         """
         Update persona memory using retrieval and update agents.
+
+        Within a cog run, the facts retrieved by query_memory are reused instead of running the
+        retrieval agent again, unless the update keys surface facts that query did not see.
+        When ``system.persona.async_updates`` is enabled, the update is queued for the background
+        PersonaUpdateWorker with a snapshot of _ctx and _state, and this call returns immediately.
+
         Args:
             update_keys: Keys to extract from context/state, or None to use all data.
             _ctx: External context data.
@@ -336,12 +491,38 @@ class PersonaMemory(Memory):
             num_results: Number of results to retrieve per query.
         """
         try:
-            static_persona, initial_facts = self._load_context(update_keys, _ctx, _state, num_results)
-            semantic_facts = self._retrieve_semantic_facts(_ctx, _state, static_persona, initial_facts, num_results)
-            action, new_facts = self._determine_update_action(_ctx, _state, static_persona, semantic_facts)
-            if action != 'none':
-                self._apply_update_action(action, new_facts)
+            persona_settings = self._persona_settings()
+            if persona_settings.async_updates:
+                job = UpdateJob(update_keys, snapshot(_ctx), snapshot(_state), num_results,
+                                self._current_turn_context(), current_run_id.get())
+                PersonaUpdateWorker.submit(self, job, max_queue=persona_settings.update_queue_size)
+                return
+            self.apply_update_job(UpdateJob(update_keys, _ctx, _state, num_results, run_id=current_run_id.get()),
+                                  self._current_turn_context())
         except Exception as e:
             self.logger.error(f"Error in update_memory: {e}")
             raise Exception(f"Error in update_memory: {e}")
 
+    def apply_update_job(self, job: UpdateJob, turn_context: Optional[_RetrievalContext] = None) -> Optional[_RetrievalContext]:
+        """
+        Run one update: retrieve facts (or reuse turn_context), ask the update agent, store new facts.
+        Returns the retrieval used, for a following job to reuse, or None once stored facts changed.
+        """
+        keys = self._extract_query_keys(job.update_keys, job.ctx, job.state)
+        retrieval = self._reuse_turn_context(keys, job.num_results, turn_context)
+        if retrieval is None:
+            static_persona, initial_facts = self._load_context(keys, job.num_results)
+            semantic_facts = self._retrieve_semantic_facts(job.ctx, job.state, static_persona, initial_facts, job.num_results)
+            retrieval = _RetrievalContext(job.run_id, keys, job.num_results, static_persona, semantic_facts)
+        action, new_facts = self._determine_update_action(job.ctx, job.state, retrieval.static_persona, retrieval.facts)
+        if action == 'none':
+            return retrieval
+        # Stored facts changed; a later query in this run must not see the old retrieval
+        self._turn_context = None
+        self._apply_update_action(action, new_facts)
+        return None
+
+    @staticmethod
+    def _persona_settings():
+        from agentforge.config import Config
+        return Config().settings.system.persona
@@ -0,0 +1,194 @@
+"""
+Background worker for asynchronous PersonaMemory updates.
+
+When ``system.persona.async_updates`` is enabled, ``PersonaMemory.update_memory`` snapshots its
+inputs and hands them to this worker instead of running the update agent on the request path.
+A single daemon thread processes jobs one persona at a time; jobs that arrive for a persona while
+it is still waiting are coalesced into the same batch.
+
+Jobs use the memory's own storage while the cog keeps querying it from the request thread. This is
+safe because every ChromaStorage operation works on the collection handle it selected, not on
+state shared across calls.
+"""
+
+import atexit
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from agentforge import metrics
+
+PERSONA_UPDATES = metrics.counter(
+    "agentforge_persona_updates_total",
+    "Background persona update jobs, by result (ok, error, coalesced, duplicate).",
+    ("result",))
+PERSONA_UPDATE_QUEUE_DEPTH = metrics.gauge(
+    "agentforge_persona_update_queue_depth", "Persona update jobs waiting for the background worker.")
+
+
+@dataclass
+class UpdateJob:
+    """One deferred update_memory call, with its inputs copied at enqueue time."""
+    update_keys: Optional[List[str]]
+    ctx: dict
+    state: dict
+    num_results: int
+    turn_context: Any = None  # The run's query-phase retrieval, if it had one
+    run_id: Optional[str] = None  # The cog run that enqueued the job
+
+    def signature(self) -> str:
+        """Identity used to drop exact repeats of a job within a batch."""
+        return repr((self.update_keys, self.ctx, self.state, self.num_results))
+
+
+def snapshot(data: Optional[dict]) -> dict:
+    """Deep-copy a context dict so later changes by the cog do not leak into a queued job."""
+    try:
+        return copy.deepcopy(data or {})
+    except Exception:
+        return dict(data or {})
+
+
+class PersonaUpdateWorker:
+    """
+    Process-wide queue and worker thread for deferred persona updates.
+
+    The queue holds at most ``max_queue`` jobs; ``submit`` blocks when it is full, so a cog that
+    outpaces the worker slows down instead of growing memory without bound. Jobs are grouped by
+    memory instance: the worker takes a whole batch for one persona and runs it back to back, so
+    the retrieval from one job can be reused by the next. ``flush`` waits for the queue to drain
+    and runs automatically at interpreter exit.
+    """
+
+    max_queue: int = 64
+
+    _batches: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+    _depth: int = 0
+    _active: int = 0
+    _thread: Optional[threading.Thread] = None
+    _stopping: bool = False
+    _atexit_registered: bool = False
+    _cond = threading.Condition()
+
+    # ---------------------------------
+    # Public Interface
+    # ---------------------------------
+
+    @classmethod
+    def submit(cls, memory: Any, job: UpdateJob, max_queue: Optional[int] = None) -> None:
+        """Queue an update job for a PersonaMemory instance, starting the worker on first use."""
+        with cls._cond:
+            if max_queue:
+                cls.max_queue = max_queue
+            cls._ensure_started()
+            batch = cls._batches.get(id(memory))
+            if batch is not None and any(j.signature() == job.signature() for j in batch["jobs"]):
+                PERSONA_UPDATES.inc(result="duplicate")
+                return
+            if cls._depth >= cls.max_queue:
+                memory.logger.warning(f"Persona update queue is full ({cls.max_queue}); waiting for the worker.")
+            while cls._depth >= cls.max_queue and not cls._stopping:
+                cls._cond.wait()
+            batch = cls._batches.get(id(memory))
+            if batch is None:
+                batch = cls._batches[id(memory)] = {"memory": memory, "jobs": []}
+            elif batch["jobs"]:
+                PERSONA_UPDATES.inc(result="coalesced")
+            batch["jobs"].append(job)
+            cls._depth += 1
+            PERSONA_UPDATE_QUEUE_DEPTH.set(cls._depth)
+            cls._cond.notify_all()
+
+    @classmethod
+    def pending(cls) -> int:
+        """Number of jobs queued or being processed."""
+        with cls._cond:
+            return cls._depth + cls._active
+
+    @classmethod
+    def flush(cls, timeout: Optional[float] = None) -> bool:
+        """Block until every queued job has been processed. Returns False if the timeout expired first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with cls._cond:
+            while cls._depth or cls._active:
+                if cls._thread is None or not cls._thread.is_alive():
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                cls._cond.wait(remaining)
+            return not (cls._depth or cls._active)
+
+    @classmethod
+    def shutdown(cls, timeout: Optional[float] = None) -> None:
+        """Flush the queue and stop the worker thread. A later submit starts a new one."""
+        cls.flush(timeout)
+        with cls._cond:
+            thread = cls._thread
+            cls._stopping = True
+            cls._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        with cls._cond:
+            cls._thread = None
+            cls._stopping = False
+            cls._batches.clear()
+            cls._depth = 0
+            PERSONA_UPDATE_QUEUE_DEPTH.set(0)
+            cls._cond.notify_all()
+
+    # ---------------------------------
+    # Worker Thread
+    # ---------------------------------
+
+    @classmethod
+    def _ensure_started(cls) -> None:
+        if cls._thread is not None and cls._thread.is_alive():
+            return
+        cls._stopping = False
+        cls._thread = threading.Thread(target=cls._work, name="agentforge-persona-updates", daemon=True)
+        cls._thread.start()
+        if not cls._atexit_registered:
+            atexit.register(cls.shutdown)
+            cls._atexit_registered = True
+
+    @classmethod
+    def _work(cls) -> None:
+        while True:
+            with cls._cond:
+                while not cls._batches and not cls._stopping:
+                    cls._cond.wait()
+                if not cls._batches:
+                    return
+                _, batch = cls._batches.popitem(last=False)
+                jobs = batch["jobs"]
+                cls._depth -= len(jobs)
+                cls._active = len(jobs)
+                PERSONA_UPDATE_QUEUE_DEPTH.set(cls._depth)
+                cls._cond.notify_all()
+            try:
+                cls._run_batch(batch["memory"], jobs)
+            finally:
+                with cls._cond:
+                    cls._active = 0
+                    cls._cond.notify_all()
+
+    @staticmethod
+    def _run_batch(memory: Any, jobs: List[UpdateJob]) -> None:
+        """Apply a persona's jobs in order, carrying each job's retrieval forward to the next job of the same run."""
+        turn_context = None
+        for job in jobs:
+            if job.turn_context is not None:
+                turn_context = job.turn_context
+            elif turn_context is not None and turn_context.run_id != job.run_id:
+                turn_context = None  # Retrieved for another cog run; this job retrieves fresh
+            try:
+                turn_context = memory.apply_update_job(job, turn_context)
+                PERSONA_UPDATES.inc(result="ok")
+            except Exception as e:
+                turn_context = None
+                PERSONA_UPDATES.inc(result="error")
+                memory.logger.error(f"Background persona update failed: {e}")
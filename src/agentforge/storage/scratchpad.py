@@ -1,12 +1,40 @@
+import hashlib
 import re
-from typing import Optional, Union, List, Any
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional, Union, List, Any, Dict, Tuple
 
+from agentforge import metrics
 from agentforge.utils.logger import Logger
 from agentforge.utils.parsing_processor import ParsingProcessor
 from agentforge.utils.prompt_processor import PromptProcessor
+from agentforge.utils.token_accounting import estimate_tokens
 from agentforge.agent import Agent
 from agentforge.storage.memory import Memory
 
+SCRATCHPAD_CONSOLIDATIONS = metrics.counter(
+    "agentforge_scratchpad_consolidations_total",
+    "ScratchPad log consolidations, by result (ok, error).",
+    ("result",))
+
+
+@dataclass
+class _LogState:
+    """
+    In-process bookkeeping for one scratchpad, shared by every ScratchPad instance on the same collection.
+    """
+    storage: Any = None
+    next_id: Optional[int] = None  # Next log entry id; None until the log has been read once
+    pending: int = 0  # Log entries written but not yet consolidated
+    scheduled: bool = False  # A background consolidation is queued or running
+    scratchpad: Optional[List[str]] = None  # Last consolidated scratchpad documents; None until loaded
+    partials: Dict[str, str] = field(default_factory=dict)  # Chunk summaries by chunk hash, kept until consolidation succeeds
+    retry_at: int = 0  # Pending count needed before retrying a consolidation whose summaries did not shrink the log
+    mutex: threading.Lock = field(default_factory=threading.Lock)  # Guards the fields above
+    consolidation_lock: threading.Lock = field(default_factory=threading.Lock)  # One consolidation at a time
+
 
 class ScratchPad(Memory):
     """
@@ -16,8 +44,21 @@ class ScratchPad(Memory):
     This class maintains two collections:
     1. The main scratchpad which contains the current summarized knowledge
     2. A log collection that stores individual entries before they're consolidated
+
+    The log size is tracked by an in-process counter, so appending and checking the threshold do not
+    read the log back. Once ``system.scratchpad.log_threshold`` entries have accumulated, the log is
+    consolidated by the scratchpad agent, by default on a background thread that shares the node's
+    storage with the cog (each storage operation uses its own collection handle). Logs larger than
+    ``system.scratchpad.chunk_tokens`` are summarized chunk by chunk in parallel first, then merged
+    with the existing scratchpad. The consolidated scratchpad is cached in-process and served by
+    ``query_memory`` without a storage read.
     """
 
+    _states: Dict[Tuple[str, str], _LogState] = {}
+    _states_lock = threading.Lock()
+    _executor: Optional[ThreadPoolExecutor] = None
+    _futures: "set[Future]" = set()
+
     def __init__(self, cog_name: str, persona: Optional[str] = None, collection_id: Optional[str] = None):
         """
         Initialize the ScratchPad memory.
@@ -31,10 +72,12 @@ class ScratchPad(Memory):
         self.logger = Logger('Memory')
         self.parser = ParsingProcessor()
         self.prompt_processor = PromptProcessor()
+        self._idle_agents: List[Agent] = []
         
         # Define the log collection name based on the main collection
         self.log_collection_name = f"scratchpad_log_{self.collection_name}"
         self.log_collection_name = self.parser.format_string(self.log_collection_name)
+        self._state = self._get_state()
 
     def query_memory(self, query_keys: Optional[List[str]], _ctx: dict, _state: dict, num_results: int = 5) -> dict[str, Any]:
         """
@@ -47,12 +90,12 @@ class ScratchPad(Memory):
             num_results (int): Number of results to retrieve.
         """
         # For scratchpads, we don't use semantic search but instead just retrieve the content
-        result = self.storage.load_collection(collection_name=self.collection_name)
-        self.logger.debug(f"Retrieved scratchpad: {result}")
+        documents = self._get_main_scratchpad()
+        self.logger.debug(f"Retrieved scratchpad: {documents}")
         
-        if result and result.get('documents') and len(result['documents']) > 0:
-            self.store.update({"readable": result.get('documents')})
-            self.logger.debug(f"Query returned {len(result.get('ids', []))} results.")
+        if documents:
+            self.store.update({"readable": documents})
+            self.logger.debug(f"Query returned {len(documents)} results.")
             return
         
         # Return default message if no scratchpad exists
@@ -82,32 +125,44 @@ class ScratchPad(Memory):
             return
             
         # Save to the log collection
-        self._save_scratchpad_log(content)
-        self._save_scratchpad_log(state)
+        self._save_scratchpad_log([content, state])
         
         # Check if it's time to consolidate the log
         self.check_scratchpad()
 
-    def _save_scratchpad_log(self, content: str) -> None:
+    def _save_scratchpad_log(self, entries: Union[str, List[str]]) -> None:
         """
-        Save an entry to the scratchpad log.
+        Append entries to the scratchpad log in a single write.
         
         Args:
-            content (str): The content to save in the log.
+            entries (Union[str, List[str]]): The content to save in the log.
         """
-        collection_size = self.storage.count_collection(self.log_collection_name)
-        memory_id = [str(collection_size + 1)]
-        
-        self.logger.debug(
-            f"Saving to Scratchpad Log: {self.log_collection_name}\nContent: {content}\nID: {memory_id}", 
-        )
-        
-        self.storage.save_to_storage(
-            collection_name=self.log_collection_name,
-            data=[content],
-            ids=memory_id,
-            metadata=[{}]  # No special metadata needed for log entries
-        )
+        entries = [entries] if isinstance(entries, str) else list(entries)
+        with self._state.mutex:
+            if self._state.next_id is None:
+                self._load_log_counters()
+            first_id = self._state.next_id
+            memory_ids = [str(first_id + i) for i in range(len(entries))]
+            
+            self.logger.debug(
+                f"Saving to Scratchpad Log: {self.log_collection_name}\nContent: {entries}\nID: {memory_ids}", 
+            )
+            
+            self.storage.save_to_storage(
+                collection_name=self.log_collection_name,
+                data=entries,
+                ids=memory_ids,
+                metadata=[{} for _ in entries]  # No special metadata needed for log entries
+            )
+            self._state.next_id = first_id + len(entries)
+            self._state.pending += len(entries)
+
+    def _load_log_counters(self) -> None:
+        """Initialize the log counters from storage. Runs once per scratchpad per process."""
+        result = self.storage.load_collection(collection_name=self.log_collection_name, include=[]) or {}
+        log_ids = [int(i) for i in result.get('ids', []) if str(i).isdigit()]
+        self._state.next_id = max(log_ids, default=0) + 1
+        self._state.pending = len(result.get('ids', []))
 
     def _save_main_scratchpad(self, content: str) -> None:
         """
@@ -127,52 +182,91 @@ class ScratchPad(Memory):
             metadata=[{}]  # No special metadata needed for main scratchpad
         )
 
-    def _get_scratchpad_log(self) -> list:
+    def _get_main_scratchpad(self) -> List[str]:
+        """
+        Return the consolidated scratchpad documents, reading storage only on first use.
+        """
+        with self._state.mutex:
+            if self._state.scratchpad is not None:
+                return self._state.scratchpad
+        result = self.storage.load_collection(collection_name=self.collection_name)
+        documents = list(result.get('documents') or []) if result else []
+        with self._state.mutex:
+            if self._state.scratchpad is None:
+                self._state.scratchpad = documents
+            return self._state.scratchpad
+
+    def _get_scratchpad_log(self) -> Tuple[List[str], List[str]]:
         """
-        Retrieve the scratchpad log entries.
+        Retrieve the scratchpad log entries in the order they were written.
         
         Returns:
-            list: The scratchpad log entries as a list or an empty list if not found.
+            Tuple[List[str], List[str]]: The log entry ids and their documents, both empty if not found.
         """
         result = self.storage.load_collection(collection_name=self.log_collection_name)
         self.logger.debug(f"Scratchpad Log: {result}")
         
-        if result and result.get('documents'):
-            return result['documents']
-        return []
+        if not result or not result.get('documents'):
+            return [], []
+        entries = sorted(zip(result['ids'], result['documents']),
+                         key=lambda entry: int(entry[0]) if str(entry[0]).isdigit() else 0)
+        return [entry_id for entry_id, _ in entries], [document for _, document in entries]
 
     def check_scratchpad(self) -> Optional[str]:
         """
         Check if it's time to update the scratchpad based on the log entries.
-        If there are enough log entries, consolidate them into the main scratchpad.
+        If there are enough log entries, consolidate them into the main scratchpad, on a background
+        thread when ``system.scratchpad.background_consolidation`` is enabled.
         
         Returns:
-            Optional[str]: Updated scratchpad content if updated, None otherwise.
+            Optional[str]: Updated scratchpad content if it was consolidated inline, None otherwise.
         """
-        scratchpad_log = self._get_scratchpad_log()
-        log_count = len(scratchpad_log)
-        
-        self.logger.debug(f"Checking scratchpad log. Number of entries: {log_count}")
-        
-        # If we have enough log entries, consolidate them
-        if log_count >= 20:
-            self.logger.debug(f"Scratchpad log count >= 20, updating scratchpad")
-            
-            # Create an agent to summarize the log
-            scratchpad_agent = Agent(agent_name="scratchpad_agent")
-            
+        settings = self._scratchpad_settings()
+        with self._state.mutex:
+            if self._state.next_id is None:
+                self._load_log_counters()
+            log_count = self._state.pending
+            self.logger.debug(f"Checking scratchpad log. Number of entries: {log_count}")
+            if log_count < max(settings.log_threshold, self._state.retry_at) or self._state.scheduled:
+                return None
+            if settings.background_consolidation:
+                self._state.scheduled = True
+
+        self.logger.debug(f"Scratchpad log count >= {settings.log_threshold}, updating scratchpad")
+        if not settings.background_consolidation:
+            return self.consolidate()
+        self._submit(self._consolidate_in_background)
+        return None
+
+    def consolidate(self) -> Optional[str]:
+        """
+        Summarize the current log into the main scratchpad and remove the consolidated entries.
+        Entries appended while the agent runs stay in the log for the next consolidation. A log that
+        does not fit in one prompt is map-reduced first (see ``_reduce_log``).
+
+        Returns:
+            Optional[str]: The updated scratchpad content, or None if the log was empty.
+        """
+        with self._state.consolidation_lock:
+            log_ids, scratchpad_log = self._get_scratchpad_log()
+            if not scratchpad_log:
+                return None
+
+            settings = self._scratchpad_settings()
+
             # Get the current scratchpad content
-            current_scratchpad = self.store.get('readable', '')
+            current_scratchpad = "\n".join(self._get_main_scratchpad())
             
-            # Join all log entries
-            scratchpad_log_content = "\n".join(scratchpad_log)
+            # Summarize the log chunk by chunk until it fits in one prompt
+            reduced_log = self._reduce_log(scratchpad_log, settings)
             
-            # Run the agent to generate a new scratchpad
+            # Run the agent to merge the log into a new scratchpad
             agent_vars = {
-                "scratchpad_log": scratchpad_log_content,
+                "scratchpad_log": "\n".join(reduced_log),
                 "scratchpad": current_scratchpad
             }
-            scratchpad_result = scratchpad_agent.run(**agent_vars)
+            with self._scratchpad_agent() as agent:
+                scratchpad_result = agent.run(**agent_vars)
             
             # Extract the updated scratchpad from the agent's response
             updated_scratchpad = self._extract_updated_scratchpad(scratchpad_result)
@@ -180,29 +274,197 @@ class ScratchPad(Memory):
             # Save the updated scratchpad
             self._save_main_scratchpad(updated_scratchpad)
             
-            # Clear the log after processing
-            self.storage.delete_collection(self.log_collection_name)
-            self.logger.debug(f"Cleared scratchpad log")
+            # Remove only the entries that were consolidated
+            self.storage.delete_from_storage(self.log_collection_name, log_ids)
+            with self._state.mutex:
+                self._state.scratchpad = [updated_scratchpad]
+                self._state.pending = max(0, self._state.pending - len(log_ids))
+                self._state.partials.clear()
+                self._state.retry_at = 0
+            self.logger.debug(f"Consolidated {len(log_ids)} scratchpad log entries")
             
             return updated_scratchpad
-            
-        return None
 
-    def _extract_updated_scratchpad(self, scratchpad_result: str) -> str:
+    # ---------------------------------
+    # Map-Reduce Consolidation
+    # ---------------------------------
+
+    def _reduce_log(self, entries: List[str], settings) -> List[str]:
+        """
+        Shrink the log until it fits in one ``chunk_tokens`` budget. Each round splits the entries into
+        chunks, summarizes the chunks in parallel and continues with the summaries, keeping a chunk's
+        own text where its summary came out longer. Returns the entries unchanged when they already
+        fit or map-reduce is disabled (``chunk_tokens: 0``).
+
+        Raises:
+            ValueError: If no summary in a round shrinks its chunk. The consolidation fails and the
+                entries stay in the log; the summaries stay cached, and ``check_scratchpad`` waits for
+                another ``log_threshold`` entries before retrying.
+        """
+        budget = settings.chunk_tokens
+        level = entries
+        while budget > 0:
+            chunks = self._chunk_log(level, budget)
+            if len(chunks) <= 1:
+                break
+            self.logger.debug(f"Summarizing {len(level)} scratchpad entries in {len(chunks)} chunks")
+            summaries = self._summarize_chunks(chunks, settings.map_workers)
+            reduced = [summary if estimate_tokens(summary) < estimate_tokens(chunk) else chunk
+                       for summary, chunk in zip(summaries, chunks)]
+            if estimate_tokens("\n".join(reduced)) >= estimate_tokens("\n".join(level)):
+                with self._state.mutex:
+                    self._state.retry_at = self._state.pending + settings.log_threshold
+                raise ValueError("Scratchpad chunk summaries did not shrink the log; "
+                                 "keeping the log entries for the next consolidation.")
+            level = reduced
+        return level
+
+    @staticmethod
+    def _chunk_log(entries: List[str], budget: int) -> List[str]:
+        """
+        Pack entries, in order, into chunks of at most ``budget`` estimated tokens. An entry larger
+        than the budget is split on line boundaries (and a single oversized line on characters).
+        The packing is deterministic, so the same log always yields the same chunks.
+        """
+        pieces: List[str] = []
+        for entry in entries:
+            if estimate_tokens(entry) <= budget:
+                pieces.append(entry)
+                continue
+            width = budget * 4  # Roughly four characters per token
+            for line in entry.splitlines():
+                if estimate_tokens(line) <= budget:
+                    pieces.append(line)
+                else:
+                    pieces.extend(line[i:i + width] for i in range(0, len(line), width))
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for piece in pieces:
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > budget:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+
+    def _summarize_chunks(self, chunks: List[str], max_workers: int) -> List[str]:
+        """
+        Summarize chunks in parallel, reusing summaries cached by an earlier attempt. Summaries are
+        cached as soon as they finish, so if one chunk fails a retry only redoes the failed ones.
+        """
+        keys = [hashlib.blake2b(chunk.encode("utf-8"), digest_size=16).hexdigest() for chunk in chunks]
+        with self._state.mutex:
+            cached = dict(self._state.partials)
+        missing = [(key, chunk) for key, chunk in zip(keys, chunks) if key not in cached]
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing))),
+                                    thread_name_prefix="agentforge-scratchpad-map") as executor:
+                futures = [executor.submit(self._summarize_chunk, key, chunk) for key, chunk in missing]
+                errors = [f.exception() for f in futures if f.exception() is not None]
+            if errors:
+                raise errors[0]
+            with self._state.mutex:
+                cached = dict(self._state.partials)
+        return [cached[key] for key in keys]
+
+    def _summarize_chunk(self, key: str, chunk: str) -> str:
+        with self._scratchpad_agent() as agent:
+            result = agent.run(scratchpad_log=chunk, scratchpad="")
+        summary = self._extract_updated_scratchpad(result, required=True)
+        with self._state.mutex:
+            self._state.partials[key] = summary
+        return summary
+
+    def _consolidate_in_background(self) -> None:
+        try:
+            self.consolidate()
+            SCRATCHPAD_CONSOLIDATIONS.inc(result="ok")
+        except Exception as e:
+            SCRATCHPAD_CONSOLIDATIONS.inc(result="error")
+            self.logger.error(f"Background scratchpad consolidation failed: {e}")
+        finally:
+            with self._state.mutex:
+                self._state.scheduled = False
+
+    @contextmanager
+    def _scratchpad_agent(self):
+        """
+        Lend out an idle scratchpad agent, creating one only when every existing agent is busy.
+        Agents are returned to the pool afterwards and reused by later consolidations.
+        """
+        try:
+            agent = self._idle_agents.pop()
+        except IndexError:
+            agent = Agent(agent_name="scratchpad_agent")
+        try:
+            yield agent
+        finally:
+            self._idle_agents.append(agent)
+
+    def _get_state(self) -> _LogState:
+        key = (getattr(self.storage, 'storage_id', str(id(self.storage))), self.collection_name)
+        with ScratchPad._states_lock:
+            state = ScratchPad._states.get(key)
+            if state is None or state.storage is not self.storage:
+                state = ScratchPad._states[key] = _LogState(storage=self.storage)
+            return state
+
+    @staticmethod
+    def _scratchpad_settings():
+        from agentforge.config import Config
+        return Config().settings.system.scratchpad
+
+    # ---------------------------------
+    # Background Consolidation
+    # ---------------------------------
+
+    @classmethod
+    def _submit(cls, fn) -> None:
+        with cls._states_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="agentforge-scratchpad")
+            future = cls._executor.submit(fn)
+            cls._futures.add(future)
+        future.add_done_callback(cls._futures.discard)
+
+    @classmethod
+    def flush(cls, timeout: Optional[float] = None) -> bool:
+        """Block until queued background consolidations finish. Returns False if the timeout expired first."""
+        with cls._states_lock:
+            futures = list(cls._futures)
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+    @classmethod
+    def reset_state(cls) -> None:
+        """Forget cached scratchpads and log counters, e.g. after the storage was changed outside this process."""
+        cls.flush()
+        with cls._states_lock:
+            cls._states.clear()
+
+    def _extract_updated_scratchpad(self, scratchpad_result: str, required: bool = False) -> str:
         """
         Extract the updated scratchpad content from the ScratchpadAgent's output.
         
         Parameters:
             scratchpad_result (str): The full output from the ScratchpadAgent.
+            required (bool): Raise instead of returning a placeholder when no content is found.
             
         Returns:
             str: The extracted updated scratchpad content.
         """
         pattern = r'<updated_scratchpad>(.*?)</updated_scratchpad>'
-        match = re.search(pattern, scratchpad_result, re.DOTALL)
+        match = re.search(pattern, scratchpad_result or "", re.DOTALL)
         
         if match:
             return match.group(1).strip()
+        elif required:
+            raise ValueError("No updated scratchpad content found in the result.")
         else:
             self.logger.warning("No updated scratchpad content found in the result.")
             return "No updated scratchpad content could be extracted."
@@ -215,6 +477,11 @@ class ScratchPad(Memory):
             ids (Union[str, list[str]], optional): Not used for scratchpads.
         """
         # Delete both the main scratchpad and the log
-        self.storage.delete_collection(self.collection_name)
-        self.storage.delete_collection(self.log_collection_name)
+        with self._state.consolidation_lock, self._state.mutex:
+            self.storage.delete_collection(self.collection_name)
+            self.storage.delete_collection(self.log_collection_name)
+            self._state.next_id = None
+            self._state.pending = 0
+            self._state.retry_at = 0
+            self._state.scratchpad = None
         self.logger.debug(f"Deleted scratchpad and log collections") 
\ No newline at end of file
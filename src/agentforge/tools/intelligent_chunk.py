@@ -1,4 +1,15 @@
-import spacy
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def _get_sentencizer():
+    """Build the blank English sentencizer pipeline once and reuse it across calls."""
+    import spacy
+
+    nlp = spacy.blank('en')
+    nlp.add_pipe('sentencizer', config={"punct_chars": None})
+    nlp.max_length = 3000000  # Increase the max_length limit to accommodate large texts
+    return nlp
 
 
 def intelligent_chunk(text, chunk_size):
@@ -39,11 +50,8 @@ def intelligent_chunk(text, chunk_size):
         raise ValueError("chunk_size must be an integer between 0 and 3")
 
     try:
-        # Load the spacy model
-        nlp = spacy.blank('en')
-        nlp.add_pipe('sentencizer', config={"punct_chars": None})
-        nlp.max_length = 3000000  # Increase the max_length limit to accommodate large texts
-        
+        nlp = _get_sentencizer()
+
         # Tokenize the text into sentences using spacy
         doc = nlp(str(text))
         sentences = [sent.text for sent in doc.sents]
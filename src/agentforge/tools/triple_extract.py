@@ -1,5 +1,6 @@
-import spacy
 import sys
+import threading
+
 
 def download_spacy_model(model_name):
     """
@@ -11,6 +12,8 @@ def download_spacy_model(model_name):
     Raises:
         Exception: If the download fails.
     """
+    import spacy
+
     try:
         print(f"Downloading the {model_name} model...")
         spacy.cli.download(model_name)
@@ -18,19 +21,36 @@ def download_spacy_model(model_name):
     except Exception as e:
         raise Exception(f"Failed to download model {model_name}: {str(e)}")
 
-# Attempt to load the English model
 spacy_model_name = "en_core_web_trf"
 
-try:
-    nlp = spacy.load(spacy_model_name)
-except OSError:
-    # Model not found, attempt to download it
-    try:
-        download_spacy_model(spacy_model_name)
-        nlp = spacy.load(spacy_model_name)
-    except Exception as e:
-        print(f"Error: {str(e)}", file=sys.stderr)
-        sys.exit(1)
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """
+    Load the English transformer pipeline on first use and reuse it afterwards.
+
+    Loading is deferred so importing this tool does not pay for spaCy or the model
+    until a triple is actually extracted.
+    """
+    global _nlp
+    if _nlp is not None:
+        return _nlp
+    with _nlp_lock:
+        if _nlp is None:
+            import spacy
+            try:
+                _nlp = spacy.load(spacy_model_name)
+            except OSError:
+                # Model not found, attempt to download it
+                try:
+                    download_spacy_model(spacy_model_name)
+                    _nlp = spacy.load(spacy_model_name)
+                except Exception as e:
+                    print(f"Error: {str(e)}", file=sys.stderr)
+                    raise
+    return _nlp
 
 class TripleExtract:
     """
@@ -56,7 +76,7 @@ class TripleExtract:
             raise ValueError("Input sentence must be a non-empty string")
 
         try:
-            doc = nlp(sentence)
+            doc = get_nlp()(sentence)
             subject, predicate, _object = None, None, None
 
             # Identify named entities using SpaCy NER
@@ -72,7 +92,7 @@ class TripleExtract:
                     subject = token
                 elif token.pos_ == "VERB":
                     # Check if it's part of a verb phrase indicating the predicate
-                    if token.dep_ == "aux" and nlp(token.head.text).pos_ == "VERB":
+                    if token.dep_ == "aux" and get_nlp()(token.head.text).pos_ == "VERB":
                         continue  # Skip auxiliary verbs
                     else:
                         predicate = token.head  # Consider the head of the verb phrase as the predicate
@@ -156,8 +176,9 @@ class TripleExtract:
             raise ValueError("Input chunk must be a non-empty string")
 
         try:
-            doc = nlp(chunk)  # Process the chunk for context
-            sentence_doc = nlp(sentence)  # Process the sentence separately
+            doc = get_nlp()(chunk)  # Process the chunk for context
+            sentence_doc = get_nlp()(sentence)  # Process the sentence separately
+            from spacy.tokens import Doc
 
             # Identify named entities using SpaCy NER
             entities = [ent for ent in doc.ents if ent.label_ in ("PERSON", "ORG")]
@@ -170,7 +191,7 @@ class TripleExtract:
                     subject = token
 
                     # Filter irrelevant words based on POS tags and additional stop words
-                    if subject and isinstance(subject, spacy.tokens.Doc):
+                    if subject and isinstance(subject, Doc):
                         filtered_subject_words = [
                             word.text
                             for word in subject.words
@@ -185,7 +206,7 @@ class TripleExtract:
 
                 elif token.pos_ == "VERB":
                     # Check if it's part of a verb phrase indicating the predicate
-                    if token.dep_ == "aux" and nlp(token.head.text).pos_ == "VERB":
+                    if token.dep_ == "aux" and get_nlp()(token.head.text).pos_ == "VERB":
                         continue  # Skip auxiliary verbs
                     else:
                         predicate = token.head  # Consider the head of the verb phrase as the predicate
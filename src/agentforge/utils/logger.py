@@ -1,10 +1,30 @@
 import os
 import re
+import atexit
+import queue
 import logging
+import logging.handlers
 import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 from agentforge.config import Config
 
 
+def get_logging_settings(config: Config) -> dict:
+    """
+    Returns the raw ``settings.system.logging`` dict from the loaded config.
+
+    Reads the dict in place rather than through ``config.settings``, which is a frozen snapshot
+    that only changes on reload. A reload replaces the dict, so callers should not hold on to it.
+    """
+    system = config.data.setdefault('settings', {}).setdefault('system', {})
+    logging_settings = system.get('logging')
+    if logging_settings is None:
+        logging_settings = system['logging'] = {}
+    if logging_settings.get('files') is None:
+        logging_settings['files'] = {}
+    return logging_settings
+
+
 def encode_msg(msg: str) -> str:
     """Encodes a message to UTF-8, replacing any invalid characters."""
     return msg.encode('utf-8', 'replace').decode('utf-8')
@@ -31,6 +51,68 @@ class ColoredFormatter(logging.Formatter):
         return f"{color_code}{message}{self.RESET_CODE}"
 
 
+class LazyMessage:
+    """
+    Defers building a log message until a handler actually formats the record.
+
+    Wraps either a zero-argument callable or a %-style template with its args. The text is
+    produced once, on the log writer thread, and only for records whose level is enabled.
+    """
+
+    __slots__ = ('msg', 'args', '_text')
+
+    def __init__(self, msg: Union[str, Callable[[], Any]], args: Tuple = ()) -> None:
+        self.msg = msg
+        self.args = args
+        self._text = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            text = self.msg() if callable(self.msg) else self.msg
+            text = str(text)
+            if self.args:
+                text = text % self.args
+            self._text = encode_msg(text)
+        return self._text
+
+
+class _QueueForwarder(logging.handlers.QueueHandler):
+    """
+    Hands records for one destination handler to the shared log writer queue.
+
+    Records are queued as (handler, record) pairs and left unformatted; the writer thread does
+    the message interpolation and file/console I/O. Level and formatter calls are mirrored onto
+    the destination handler so existing set_level calls keep working.
+    """
+
+    def __init__(self, target: logging.Handler) -> None:
+        super().__init__(BaseLogger.get_log_queue())
+        self.target = target
+        super().setLevel(target.level)
+
+    def setLevel(self, level) -> None:
+        super().setLevel(level)
+        self.target.setLevel(level)
+
+    def setFormatter(self, fmt) -> None:
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        BaseLogger.get_log_queue().put_nowait((self.target, record))
+
+
+class _LogWriter(logging.handlers.QueueListener):
+    """Single background thread that formats and writes every queued log record."""
+
+    def handle(self, item) -> None:
+        target, record = item
+        if record.levelno >= target.level:
+            target.handle(record)
+
+
 class BaseLogger:
     """
     A base logger class for setting up file and console logging with support for multiple handlers and log levels.
@@ -38,6 +120,10 @@ class BaseLogger:
     This class provides mechanisms for initializing file and console log handlers, logging messages at various
     levels, and dynamically adjusting log levels.
 
+    Handlers are never called on the logging thread: each one is wrapped in a QueueHandler that
+    feeds a single QueueListener writer thread, so file writes and message formatting happen
+    off the request path.
+
     Attributes:
         file_handlers (dict): A class-level dictionary tracking file handlers by log file name.
         console_handlers (dict): A class-level dictionary tracking console handlers by logger name.
@@ -47,6 +133,11 @@ class BaseLogger:
     file_handlers = {}
     console_handlers = {}
 
+    # Shared writer queue and its listener thread
+    _log_queue = None
+    _listener = None
+    _listener_lock = threading.Lock()
+
     def __init__(self, name: str = 'BaseLogger', log_file: str = 'default.log', log_level: str = 'error') -> None:
         """
         Initializes the BaseLogger with optional name, log file, and log level.
@@ -57,23 +148,49 @@ class BaseLogger:
             log_level (str): The initial log level for the file handler.
         """
         self.config = Config()
+        logging_settings = get_logging_settings(self.config)
         self.logger = logging.getLogger(name)
-        self.log_folder = self.config.settings.system.logging.folder
+        self.log_folder = logging_settings.get('folder', './logs')
         self.log_file = log_file
 
-        if not self.config.settings.system.logging.enabled:
+        if not logging_settings.get('enabled', True):
             self.logger.setLevel(logging.CRITICAL + 1)  # Disable logging
             return
 
         file_level = self._get_level_code(log_level)
-        console_level = self._get_level_code(
-            self.config.settings.system.logging.console_level
-        )
+        console_level = self._get_level_code(logging_settings.get('console_level', 'warning'))
         self.logger.setLevel(min(file_level, console_level))
 
         self._setup_file_handler(file_level)
         self._setup_console_handler(console_level)
 
+    @classmethod
+    def get_log_queue(cls) -> queue.Queue:
+        """Return the shared writer queue, starting the writer thread on first use."""
+        if cls._listener is None:
+            with cls._listener_lock:
+                if cls._listener is None:
+                    cls._log_queue = queue.Queue(-1)
+                    cls._listener = _LogWriter(cls._log_queue)
+                    cls._listener.start()
+                    atexit.register(cls.shutdown)
+        return cls._log_queue
+
+    @classmethod
+    def flush(cls) -> None:
+        """Block until every queued record has been written."""
+        if cls._log_queue is not None:
+            cls._log_queue.join()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Drain the queue and stop the writer thread. A later log call starts a new one."""
+        with cls._listener_lock:
+            if cls._listener is not None:
+                cls._listener.stop()
+                cls._listener = None
+                cls._log_queue = None
+
     @staticmethod
     def _get_level_code(level: str) -> int:
         """
@@ -111,9 +228,10 @@ class BaseLogger:
                 self.logger.addHandler(ch)
             return
 
-        ch = logging.StreamHandler()
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        ch = _QueueForwarder(stream_handler)
         ch.setLevel(level)
-        ch.setFormatter(formatter)
         self.logger.addHandler(ch)
         BaseLogger.console_handlers[self.logger.name] = ch
 
@@ -141,9 +259,10 @@ class BaseLogger:
             return
 
         log_file_path = os.path.join(self.log_folder, self.log_file)
-        fh = logging.FileHandler(log_file_path, encoding='utf-8')
+        file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        fh = _QueueForwarder(file_handler)
         fh.setLevel(level)
-        fh.setFormatter(formatter)
         self.logger.addHandler(fh)
         BaseLogger.file_handlers[self.log_file] = fh
 
@@ -154,16 +273,21 @@ class BaseLogger:
         if not os.path.exists(self.log_folder):
             os.makedirs(self.log_folder)
 
-    def log_msg(self, msg: str, level: str = 'info') -> None:
+    def is_enabled_for(self, level: str) -> bool:
+        """Returns True if a message at the given level would be emitted."""
+        return self.logger.isEnabledFor(self._get_level_code(level))
+
+    def log_msg(self, msg: str, level: str = 'info', args: Tuple = ()) -> None:
         """
         Logs a message at the specified log level.
 
         Parameters:
-            msg (str): The message to log.
+            msg (str): The message to log, optionally a %-style template.
             level (str): The level at which to log the message (e.g., 'info', 'debug', 'error').
+            args (tuple): Values for the %-style template, merged on the writer thread.
         """
         level_code = self._get_level_code(level)
-        self.logger.log(level_code, msg)
+        self.logger.log(level_code, msg, *args)
 
     def set_level(self, level: str) -> None:
         """
@@ -178,6 +302,27 @@ class BaseLogger:
             handler.setLevel(level_code)
 
 
+class LazyLogger:
+    """
+    Stand-in for a module-level Logger that creates the real one on first use.
+
+    Module-level ``Logger(...)`` calls load the AgentForge config at import time; declaring
+    ``logger = LazyLogger(name=...)`` instead defers that until something is actually logged.
+    """
+
+    def __init__(self, name: str, default_logger: str = 'agentforge') -> None:
+        self._name = name
+        self._default_logger = default_logger
+        self._logger = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith('__') or attr in ('_name', '_default_logger', '_logger'):
+            raise AttributeError(attr)
+        if self._logger is None:
+            self._logger = Logger(name=self._name, default_logger=self._default_logger)
+        return getattr(self._logger, attr)
+
+
 class Logger:
     """
     A wrapper class for managing multiple BaseLogger instances, supporting different log files and levels
@@ -192,23 +337,29 @@ class Logger:
     """
 
     _instances = {}
-    _lock = threading.Lock()  # Class-level lock for thread safety
+    _registered_files: Dict[str, str] = {}  # Log files added at runtime; they survive config reloads
+    _lock = threading.RLock()  # Class-level lock for thread safety
     VALID_LOGGER_NAME_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
 
     def __new__(cls, name: str, default_logger: str = 'agentforge'):
         """
         Create a new instance of Logger if one doesn't exist, or return the existing instance.
+        Lookups of an existing name do not take the lock.
 
         Parameters:
             name (str): The name of the module or component using the logger.
             default_logger (str): The default logger file to use.
         """
+        instance = cls._instances.get(name)
+        if instance is not None:
+            return instance
         with cls._lock:
-            if name not in cls._instances:
+            instance = cls._instances.get(name)
+            if instance is None:
                 instance = super(Logger, cls).__new__(cls)
-                cls._instances[name] = instance
                 instance._initialized = False
-        return cls._instances[name]
+                cls._instances[name] = instance
+        return instance
 
     def __init__(self, name: str, default_logger: str = 'agentforge') -> None:
         """
@@ -224,25 +375,40 @@ class Logger:
             return
 
         with Logger._lock:
+            # Another thread may have finished initializing while we waited
+            if self._initialized:
+                return
+
             self.config = Config()
             self.caller_name = name  # Stores the __name__ of the script that instantiated the Logger
             self.default_logger = default_logger
-            self.logging_config = None
+            self.max_payload_chars = None
             self.loggers = {}
 
             self.load_logging_config()
+            self.update_logger_config(default_logger)
+            self.init_loggers()
 
-        self.update_logger_config(default_logger)
-        self.init_loggers()
-
-        self._initialized = True
+            self._initialized = True
 
     def load_logging_config(self):
-        self.logging_config = self.config.settings.system.logging.files
+        logging_settings = get_logging_settings(self.config)
+        self.max_payload_chars = logging_settings.get('max_payload_chars', 20000)
+
+    @property
+    def logging_config(self) -> Dict[str, str]:
+        """
+        The log files and their levels: those in the loaded settings, plus any registered at runtime.
+        Built on each access, so a config reload is picked up without dropping runtime registrations.
+        """
+        files = get_logging_settings(self.config)['files']
+        with Logger._lock:
+            return {**Logger._registered_files, **files}
 
     def update_logger_config(self, logger_file: str):
         """
-        Adds a new logger to the configuration if it doesn't exist.
+        Registers a new log file in memory if it isn't configured yet.
+        Nothing is written to disk; see persist_logging_config.
 
         Parameters:
             logger_file (str): The name of the logger file to add.
@@ -253,8 +419,20 @@ class Logger:
 
         with Logger._lock:
             if logger_file not in self.logging_config:
-                self.logging_config[logger_file] = 'warning'
-                self.config.save()
+                Logger._registered_files[logger_file] = 'warning'
+
+    @staticmethod
+    def persist_logging_config() -> None:
+        """
+        Saves the current logging settings, including log files registered at runtime,
+        back to settings/system.yaml.
+        """
+        config = Config()
+        files = get_logging_settings(config)['files']
+        with Logger._lock:
+            for logger_file, log_level in Logger._registered_files.items():
+                files.setdefault(logger_file, log_level)
+        config.save()
 
     def init_loggers(self):
         # Initialize loggers dynamically based on configuration settings
@@ -269,18 +447,20 @@ class Logger:
             new_logger = BaseLogger(name=logger_name, log_file=log_file_name, log_level=log_level)
             self.loggers[logger_file] = new_logger
 
-    def log(self, msg: str, level: str = 'info', logger_file: str = None) -> None:
+    def log(self, msg: Union[str, Callable[[], Any]], level: str = 'info', logger_file: str = None,
+            args: Tuple = ()) -> None:
         """
         Logs a message to a specified logger.
 
+        Messages are only built when the level is enabled: pass a zero-argument callable or a
+        %-style template with args to defer the formatting work to the log writer thread.
+
         Parameters:
-            msg (str): The message to log.
+            msg (str | callable): The message to log, or a callable returning it.
             level (str): The log level (e.g., 'info', 'debug', 'error').
             logger_file (str): The specific logger to use. If None, uses the default logger.
+            args (tuple): Values for a %-style msg template.
         """
-        # Prepend the caller's module name to the log message
-        msg_with_caller = f'[{self.caller_name}] {msg}'
-
         if logger_file is None:
             logger_file = self.default_logger
 
@@ -289,31 +469,50 @@ class Logger:
             self.create_logger(logger_file)
 
         logger = self.loggers.get(logger_file)
-        if logger:
-            logger.log_msg(msg_with_caller, level)
+        if not logger:
+            raise ValueError(f"Logger '{logger_file}' could not be created.")
+
+        if not logger.is_enabled_for(level):
             return
 
-        raise ValueError(f"Logger '{logger_file}' could not be created.")
+        if args or callable(msg):
+            msg = LazyMessage(msg, args)
+        # Prepend the caller's module name to the log message
+        logger.log_msg('[%s] %s', level, (self.caller_name, msg))
 
-    def debug(self, msg: str, logger_file: str = None) -> None:
+    def debug(self, msg: Union[str, Callable[[], Any]], logger_file: str = None, *, args: Tuple = ()) -> None:
         """Logs a debug level message."""
-        self.log(msg, level='debug', logger_file=logger_file)
+        self.log(msg, level='debug', logger_file=logger_file, args=args)
 
-    def info(self, msg: str, logger_file: str = None) -> None:
+    def info(self, msg: Union[str, Callable[[], Any]], logger_file: str = None, *, args: Tuple = ()) -> None:
         """Logs an info level message."""
-        self.log(msg, level='info', logger_file=logger_file)
+        self.log(msg, level='info', logger_file=logger_file, args=args)
 
-    def warning(self, msg: str, logger_file: str = None) -> None:
+    def warning(self, msg: Union[str, Callable[[], Any]], logger_file: str = None, *, args: Tuple = ()) -> None:
         """Logs a warning level message."""
-        self.log(msg, level='warning', logger_file=logger_file)
+        self.log(msg, level='warning', logger_file=logger_file, args=args)
 
-    def error(self, msg: str, logger_file: str = None) -> None:
+    def error(self, msg: Union[str, Callable[[], Any]], logger_file: str = None, *, args: Tuple = ()) -> None:
         """Logs an error level message."""
-        self.log(msg, level='error', logger_file=logger_file)
+        self.log(msg, level='error', logger_file=logger_file, args=args)
 
-    def critical(self, msg: str, logger_file: str = None) -> None:
+    def critical(self, msg: Union[str, Callable[[], Any]], logger_file: str = None, *, args: Tuple = ()) -> None:
         """Logs a critical level message."""
-        self.log(msg, level='critical', logger_file=logger_file)
+        self.log(msg, level='critical', logger_file=logger_file, args=args)
+
+    def truncate(self, payload: Any, limit: Optional[int] = None) -> str:
+        """
+        Caps a prompt/response payload at the configured max_payload_chars.
+
+        Parameters:
+            payload (Any): The value to render; non-strings are converted with str().
+            limit (int, optional): Overrides the configured cap. 0 or None disables truncation.
+        """
+        text = payload if isinstance(payload, str) else str(payload)
+        limit = self.max_payload_chars if limit is None else limit
+        if not limit or len(text) <= limit:
+            return text
+        return f'{text[:limit]}\n... [truncated {len(text) - limit} chars]'
 
     def log_prompt(self, model_prompt: dict) -> None:
         """
@@ -322,14 +521,16 @@ class Logger:
         Parameters:
             model_prompt (dict): A dictionary containing the model prompts.
         """
-        system_prompt = model_prompt.get('system', '')
-        user_prompt = model_prompt.get('user', '')
-        msg = (
-            f'******\nSystem Prompt\n******\n{system_prompt}\n'
-            f'******\nUser Prompt\n******\n{user_prompt}\n'
-            f'******'
-        )
-        self.debug(msg, logger_file='model_io')
+        def build() -> str:
+            system_prompt = self.truncate(model_prompt.get('system', ''))
+            user_prompt = self.truncate(model_prompt.get('user', ''))
+            return (
+                f'******\nSystem Prompt\n******\n{system_prompt}\n'
+                f'******\nUser Prompt\n******\n{user_prompt}\n'
+                f'******'
+            )
+
+        self.debug(build, logger_file='model_io')
 
     def log_response(self, response: str) -> None:
         """
@@ -338,8 +539,8 @@ class Logger:
         Parameters:
             response (str): The model response to log.
         """
-        msg = f'******\nModel Response\n******\n{response}\n******'
-        self.debug(msg, logger_file='model_io')
+        self.debug(lambda: f'******\nModel Response\n******\n{self.truncate(response)}\n******',
+                   logger_file='model_io')
 
     def parsing_error(self, model_response: str, error: Exception) -> None:
         """
@@ -351,6 +552,6 @@ class Logger:
         """
         msg = (
             f"Parsing Error - The model may not have responded in the required format.\n\n"
-            f"Model Response:\n******\n{model_response}\n******\n\nError: {error}"
+            f"Model Response:\n******\n{self.truncate(model_response)}\n******\n\nError: {error}"
         )
         self.error(msg)
\ No newline at end of file
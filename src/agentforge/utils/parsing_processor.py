@@ -3,6 +3,7 @@ import json
 import yaml
 from typing import Optional, Dict, Any, Callable, List, Tuple
 from agentforge.utils.logger import Logger
+from agentforge.utils import stage_timing
 import xmltodict
 import configparser
 import csv
@@ -190,7 +191,8 @@ class ParsingProcessor:
                     processed_content = self.preprocess_json_string(processed_content)
                     self.logger.debug(f"Cleaned JSON string before parsing (first 500 chars): {processed_content[:500]}")
                 self.logger.debug(f"Attempting code-fenced {expected_language.upper()} parsing on content of length {len(processed_content)}")
-                result = parser_func(processed_content)
+                with stage_timing.span("parse.attempt", format=expected_language, mode="fenced"):
+                    result = parser_func(processed_content)
                 self.logger.debug(f"Code-fenced {expected_language.upper()} parsing succeeded")
                 return result
                 
@@ -236,7 +238,8 @@ class ParsingProcessor:
             if expected_language.lower() == 'yaml':
                 processed_content = self.sanitize_yaml_content(stripped_content)
             
-            result = parser_func(processed_content)
+            with stage_timing.span("parse.attempt", format=expected_language, mode="bare"):
+                result = parser_func(processed_content)
             self.logger.info(f"Bare {expected_language.upper()} parsing fallback succeeded")
             return result
             
@@ -253,7 +256,8 @@ class ParsingProcessor:
                     # More aggressive YAML cleanup as a last resort
                     cleaned_content = re.sub(r'[`~]', '', processed_content)  # Remove any remaining backticks
                     self.logger.info("Attempting alternative YAML parsing after aggressive cleanup")
-                    result = parser_func(cleaned_content)
+                    with stage_timing.span("parse.attempt", format=expected_language, mode="cleanup"):
+                        result = parser_func(cleaned_content)
                     self.logger.info("Alternative YAML parsing succeeded")
                     return result
                 except Exception as e2:
@@ -156,16 +156,21 @@ class PromptProcessor:
             self.logger.error(error_message)
             raise Exception(error_message)
 
-    def render_prompts(self, prompts, data):
+    def render_prompts(self, prompts, data, cacheable=None):
         """
         Renders the 'system' and 'user' prompts separately and validates that they are not empty.
 
         Parameters:
             prompts (dict): The dictionary containing 'system' and 'user' prompts.
             data (dict): The data dictionary containing values for the variables.
+            cacheable (list or bool, optional): Names of system prompt sections that are stable
+                across turns (or True for every system section). These are rendered first, in
+                their YAML order, so providers can cache the prompt prefix.
 
         Returns:
-            dict: A dictionary containing the rendered 'system' and 'user' prompts.
+            dict: A dictionary containing the rendered 'system' and 'user' prompts. When
+            cacheable sections were rendered, 'cache_prefix' holds the leading system text
+            made of those sections.
 
         Raises:
             Exception: Logs an error message and raises an exception if an error occurs during prompt rendering.
@@ -173,6 +178,7 @@ class PromptProcessor:
         """
         try:
             rendered_prompts = {}
+            cache_prefix = None
             for prompt_type in ['system', 'user']:
                 rendered_sections = []
                 prompt_content = prompts.get(prompt_type, {})
@@ -181,11 +187,18 @@ class PromptProcessor:
                 else:
                     prompt_sections = prompt_content
 
+                cached_names = set()
+                if prompt_type == 'system' and cacheable:
+                    prompt_sections, cached_names = self._order_cacheable_sections(prompt_sections, cacheable)
+
+                cached_sections = []
                 for prompt_name, prompt_template in prompt_sections.items():
                     template = self.handle_prompt_template(prompt_template, data)
                     if template:
                         rendered_prompt = self.render_prompt_template(template, data)
                         rendered_sections.append(rendered_prompt)
+                        if prompt_name in cached_names:
+                            cached_sections.append(rendered_prompt)
                     else:
                         self.logger.info(
                             f"Skipping '{prompt_name}' in '{prompt_type}' prompt due to missing variables."
@@ -193,7 +206,12 @@ class PromptProcessor:
                 # Join the rendered sections into a single string for each prompt type
                 final_prompt = '\n'.join(rendered_sections)
                 rendered_prompts[prompt_type] = final_prompt
-            
+                if cached_sections:
+                    cache_prefix = '\n'.join(cached_sections)
+
+            if cache_prefix:
+                rendered_prompts['cache_prefix'] = cache_prefix
+
             # Validate rendered prompts before returning
             self._validate_rendered_prompts(rendered_prompts)
             
@@ -203,6 +221,25 @@ class PromptProcessor:
             self.logger.error(error_message)
             raise Exception(error_message)
 
+    @staticmethod
+    def _order_cacheable_sections(prompt_sections, cacheable):
+        """
+        Move cacheable sections to the front, keeping YAML order within both groups so the
+        rendered prefix is byte-identical across turns.
+
+        Returns:
+            tuple: The reordered sections dict and the set of cacheable section names.
+        """
+        if cacheable is True:
+            names = set(prompt_sections)
+        elif isinstance(cacheable, str):
+            names = {cacheable} & set(prompt_sections)
+        else:
+            names = {name for name in cacheable if name in prompt_sections}
+        ordered = {name: tpl for name, tpl in prompt_sections.items() if name in names}
+        ordered.update({name: tpl for name, tpl in prompt_sections.items() if name not in names})
+        return ordered, names
+
     def _validate_rendered_prompts(self, rendered_prompts):
         """
         Internal method to validate the rendered prompts to ensure none are empty.
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+def make_request_key(*parts: Any) -> str:
+    """
+    Build a stable hash key for a request from arbitrary JSON-like parts.
+
+    Dictionaries are serialized with sorted keys so that parameter ordering never
+    changes the key; non-serializable values fall back to their ``repr``.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=repr, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """A single in-flight call shared between its leader and any waiters."""
+
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Thread-safe request coalescing.
+
+    While a call for a given key is in flight, every other caller using the same
+    key blocks until it completes and receives the same result. If the call raises,
+    the exception is re-raised in every waiter. Nothing is retained once the call
+    finishes, so this is not a cache: the next call with the same key runs again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` once per key among concurrent callers.
+
+        Args:
+            key (str): The coalescing key for the request.
+            fn (Callable): Zero-argument callable performing the actual work.
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared from another caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently in flight."""
+        with self._lock:
+            return len(self._calls)
+
+
+class _AsyncCall:
+    """A shared in-flight coroutine and the number of callers still awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    Request coalescing for coroutines.
+
+    Calls are tracked per event loop, so identical requests issued from different
+    loops never share a task. The work runs in its own task and every caller, the
+    one that started it included, awaits it through a shield: cancelling a caller
+    leaves the call running for the others, and it is only cancelled once nobody
+    is waiting for it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[int, str], _AsyncCall] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await ``fn()`` once per key among concurrent coroutines on the same loop.
+
+        Args:
+            key (str): The coalescing key for the request.
+            fn (Callable): Zero-argument callable returning an awaitable.
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared from another caller.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+
+        with self._lock:
+            call = self._calls.get(slot)
+            shared = call is not None
+            if not shared:
+                call = _AsyncCall(loop.create_task(fn()))
+                self._calls[slot] = call
+                call.task.add_done_callback(lambda task: self._finish(slot, call))
+            call.waiters += 1
+
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = call.waiters == 0
+                if abandoned and self._calls.get(slot) is call:
+                    del self._calls[slot]
+            if abandoned:
+                call.task.cancel()
+            raise
+
+    def _finish(self, slot: Tuple[int, str], call: _AsyncCall) -> None:
+        with self._lock:
+            if self._calls.get(slot) is call:
+                del self._calls[slot]
+        if not call.task.cancelled():
+            # Mark the outcome retrieved so a call whose callers all left does not warn on GC
+            call.task.exception()
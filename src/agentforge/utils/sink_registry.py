@@ -0,0 +1,63 @@
+import threading
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SinkRegistry(Generic[T]):
+    """
+    Resolves configured sink names to shared sink instances, plus sinks added at runtime.
+
+    Used by StageTiming (timing sinks) and Tracing (span exporters). The resolved list is
+    cached per settings object: settings are frozen snapshots, so a config reload brings a
+    new key, and adding or removing a sink clears the cache.
+    """
+
+    def __init__(self, resolve: Callable[[str, Any], Optional[T]]):
+        """
+        Args:
+            resolve (Callable): Maps one configured name and the settings it came from to a
+                sink, or None for unknown names. It may call :meth:`shared` for sinks that
+                depend on the settings, such as file sinks.
+        """
+        self._resolve = resolve
+        self._lock = threading.Lock()
+        self._extra: List[T] = []
+        self._shared: Dict[Any, T] = {}
+        self._resolved: Dict[Any, List[T]] = {}
+
+    def sinks_for(self, settings: Any, names: Iterable[str]) -> List[T]:
+        """Return the sinks for ``names`` under ``settings``, followed by every added sink."""
+        sinks = self._resolved.get(settings)
+        if sinks is not None:
+            return sinks
+        with self._lock:
+            sinks = [sink for sink in (self._resolve(name, settings) for name in names) if sink is not None]
+            sinks.extend(self._extra)
+            self._resolved[settings] = sinks
+        return sinks
+
+    def shared(self, key: Any, factory: Callable[[], T]) -> T:
+        """Return the instance stored under ``key``, creating it with ``factory`` on first use."""
+        sink = self._shared.get(key)
+        if sink is None:
+            sink = self._shared[key] = factory()
+        return sink
+
+    def add(self, sink: T) -> None:
+        with self._lock:
+            self._extra.append(sink)
+            self._resolved.clear()
+
+    def remove(self, sink: T) -> None:
+        with self._lock:
+            if sink in self._extra:
+                self._extra.remove(sink)
+            self._resolved.clear()
+
+    def reset(self) -> None:
+        """Drop added sinks, shared instances and cached resolution."""
+        with self._lock:
+            self._extra.clear()
+            self._shared.clear()
+            self._resolved.clear()
@@ -0,0 +1,346 @@
+import bisect
+import contextvars
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from agentforge.metrics import bucket_percentile
+from agentforge.utils.sink_registry import SinkRegistry
+
+# The timer that spans opened on this thread/task are attached to
+_current_timer: contextvars.ContextVar[Optional["StageTimer"]] = contextvars.ContextVar(
+    "agentforge_stage_timer", default=None
+)
+
+
+# ---------------------------------
+# Records
+# ---------------------------------
+
+@dataclass
+class TimingSpan:
+    """A timed sub-step inside an agent run, such as one model attempt or one parse attempt."""
+    name: str
+    offset_ms: float
+    duration_ms: float
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class TimingRecord:
+    """
+    Per-stage wall time for one agent workflow run.
+
+    ``stages`` maps each workflow stage to its duration in milliseconds, in execution order.
+    ``spans`` holds finer-grained steps (model retries, parse attempts) with their offset
+    from the start of the run. ``status`` is ``"ok"`` or the name of the exception raised.
+    """
+    agent: str
+    started_at: float
+    stages: Dict[str, float] = field(default_factory=dict)
+    spans: List[TimingSpan] = field(default_factory=list)
+    total_ms: float = 0.0
+    status: str = "ok"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000.0
+
+
+class _Span:
+    __slots__ = ("_timer", "_name", "_attributes", "_start")
+
+    def __init__(self, timer: "StageTimer", name: str, attributes: Dict[str, Any]):
+        self._timer = timer
+        self._name = name
+        self._attributes = attributes
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._timer.record.spans.append(TimingSpan(
+            name=self._name,
+            offset_ms=(self._start - self._timer.origin) * 1000.0,
+            duration_ms=_elapsed_ms(self._start),
+            status="ok" if exc_type is None else exc_type.__name__,
+            attributes=self._attributes,
+        ))
+        return False
+
+
+class _NullContext:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+def span(name: str, **attributes: Any):
+    """
+    Time a sub-step of the agent run currently being timed.
+
+    Returns a shared no-op context manager when no timed run is active, so instrumenting
+    hot paths such as model retries and parse attempts is free while timing is off.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        return _NULL_CONTEXT
+    return _Span(timer, name, attributes)
+
+
+# ---------------------------------
+# Timers
+# ---------------------------------
+
+class StageTimer:
+    """
+    Times the stages of one agent workflow run and emits the record to the sinks on exit.
+
+    Use as a context manager around the whole run, with ``stage(name)`` around each step.
+    Spans opened with :func:`span` anywhere below it are attached to the same record.
+    """
+
+    def __init__(self, agent_name: str, sinks: List["TimingSink"]):
+        self.record = TimingRecord(agent=agent_name, started_at=time.time())
+        self.origin = 0.0
+        self._sinks = sinks
+        self._token = None
+
+    def __enter__(self):
+        self.origin = time.perf_counter()
+        self._token = _current_timer.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_timer.reset(self._token)
+        self.record.total_ms = _elapsed_ms(self.origin)
+        if exc_type is not None:
+            self.record.status = exc_type.__name__
+        for sink in self._sinks:
+            try:
+                sink.emit(self.record)
+            except Exception:
+                # A broken sink must never fail the agent
+                pass
+        return False
+
+    def stage(self, name: str) -> "_Stage":
+        return _Stage(self.record, name)
+
+
+class _Stage:
+    __slots__ = ("_record", "_name", "_start")
+
+    def __init__(self, record: TimingRecord, name: str):
+        self._record = record
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stages = self._record.stages
+        stages[self._name] = stages.get(self._name, 0.0) + _elapsed_ms(self._start)
+        return False
+
+
+class _NullTimer:
+    """Stand-in used when timing is disabled; every operation is a no-op."""
+    record = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def stage(self, name: str) -> _NullContext:
+        return _NULL_CONTEXT
+
+
+_NULL_TIMER = _NullTimer()
+
+
+# ---------------------------------
+# Sinks
+# ---------------------------------
+
+class TimingSink:
+    """Receives every finished TimingRecord. Subclass and register with ``StageTiming.add_sink``."""
+
+    def emit(self, record: TimingRecord) -> None:
+        raise NotImplementedError
+
+
+class LogTimingSink(TimingSink):
+    """Writes one summary line per record to the ``timing`` log file at info level."""
+
+    def __init__(self):
+        self._logger = None
+
+    def emit(self, record: TimingRecord) -> None:
+        if self._logger is None:
+            from agentforge.utils.logger import Logger
+            self._logger = Logger(name="StageTiming", default_logger="timing")
+        self._logger.info(lambda: "%s %.1fms [%s] %s" % (
+            record.agent, record.total_ms, record.status,
+            " ".join(f"{name}={ms:.1f}" for name, ms in record.stages.items()),
+        ))
+
+
+class JsonlTimingSink(TimingSink):
+    """Appends each record as one JSON line to a file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def emit(self, record: TimingRecord) -> None:
+        line = json.dumps(record.to_dict(), default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, float("inf"),
+)
+
+
+class HistogramTimingSink(TimingSink):
+    """
+    In-memory fixed-bucket histograms of stage and span durations, keyed by (agent, name).
+
+    Cheap enough to leave on in production; percentiles are reported as the upper bound
+    of the bucket holding that rank.
+    """
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def emit(self, record: TimingRecord) -> None:
+        samples = [("total", record.total_ms)]
+        samples.extend(record.stages.items())
+        samples.extend((s.name, s.duration_ms) for s in record.spans)
+        with self._lock:
+            for name, ms in samples:
+                self._observe((record.agent, name), ms)
+
+    def _observe(self, key: Tuple[str, str], ms: float) -> None:
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = {"count": 0, "sum_ms": 0.0, "counts": [0] * len(self.buckets_ms)}
+        hist["count"] += 1
+        hist["sum_ms"] += ms
+        hist["counts"][bisect.bisect_left(self.buckets_ms, ms)] += 1
+
+    def percentile(self, agent: str, name: str, pct: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket containing the given percentile, or None without samples."""
+        with self._lock:
+            hist = self._histograms.get((agent, name))
+            counts = list(hist["counts"]) if hist else []
+        return bucket_percentile(self.buckets_ms, counts, pct) if counts else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Return ``{agent: {name: {count, sum_ms, mean_ms, p50_ms, p95_ms, p99_ms}}}``."""
+        with self._lock:
+            keys = list(self._histograms)
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for agent, name in keys:
+            with self._lock:
+                hist = dict(self._histograms[(agent, name)])
+            result.setdefault(agent, {})[name] = {
+                "count": hist["count"],
+                "sum_ms": hist["sum_ms"],
+                "mean_ms": hist["sum_ms"] / hist["count"] if hist["count"] else 0.0,
+                "p50_ms": self.percentile(agent, name, 50),
+                "p95_ms": self.percentile(agent, name, 95),
+                "p99_ms": self.percentile(agent, name, 99),
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+# ---------------------------------
+# Registry
+# ---------------------------------
+
+class StageTiming:
+    """
+    Process-wide entry point for agent stage timing.
+
+    Timing is switched on by ``system.timing.enabled``; the configured sink names
+    (``log``, ``jsonl``, ``histogram``) resolve to shared sink instances, and sinks
+    added with :meth:`add_sink` receive every record while timing is enabled.
+    """
+
+    histogram = HistogramTimingSink()
+    log_sink = LogTimingSink()
+
+    _sinks: SinkRegistry[TimingSink]
+
+    @classmethod
+    def start(cls, agent_name: str, settings: Any = None):
+        """
+        Return a StageTimer for one agent run, or a no-op timer when timing is disabled.
+
+        Args:
+            agent_name (str): The agent being timed.
+            settings (TimingSettings, optional): The ``system.timing`` settings in effect.
+        """
+        if settings is None or not settings.enabled:
+            return _NULL_TIMER
+        return StageTimer(agent_name, cls._sinks.sinks_for(settings, settings.sinks))
+
+    @classmethod
+    def add_sink(cls, sink: TimingSink) -> None:
+        cls._sinks.add(sink)
+
+    @classmethod
+    def remove_sink(cls, sink: TimingSink) -> None:
+        cls._sinks.remove(sink)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop added sinks and cached sink resolution, and clear the histograms."""
+        cls._sinks.reset()
+        cls.histogram.reset()
+
+    @classmethod
+    def _builtin_sink(cls, name: str, settings: Any) -> Optional[TimingSink]:
+        if name == "histogram":
+            return cls.histogram
+        if name == "log":
+            return cls.log_sink
+        if name == "jsonl":
+            path = settings.jsonl_path
+            return cls._sinks.shared(("jsonl", path), lambda: JsonlTimingSink(path))
+        return None
+
+
+StageTiming._sinks = SinkRegistry(StageTiming._builtin_sink)
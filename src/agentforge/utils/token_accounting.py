@@ -0,0 +1,216 @@
+import contextlib
+import contextvars
+import math
+import threading
+import uuid
+from typing import Any, Dict, Iterator, Optional
+
+# Identifies the cog run that model calls on this thread/task belong to
+current_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("agentforge_run_id", default=None)
+
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+_UNLOADED = object()
+_tiktoken: Any = _UNLOADED  # tiktoken module, None when not installed; imported on first estimate
+
+
+# ---------------------------------
+# Estimation
+# ---------------------------------
+
+def _import_tiktoken():
+    """Import tiktoken on first use rather than with the package; it is slow to import."""
+    global _tiktoken
+    if _tiktoken is _UNLOADED:
+        try:
+            import tiktoken  # type: ignore
+        except ImportError:  # pragma: no cover - optional dependency
+            tiktoken = None
+        _tiktoken = tiktoken
+    return _tiktoken
+
+
+def _get_encoding(model_name: Optional[str]):
+    """Return a cached tiktoken encoding for the model, or None when tiktoken is unavailable."""
+    tiktoken = _import_tiktoken()
+    if tiktoken is None:
+        return None
+    key = model_name or ""
+    encoding = _encodings.get(key)
+    if encoding is not None:
+        return encoding
+    with _encodings_lock:
+        encoding = _encodings.get(key)
+        if encoding is None:
+            try:
+                encoding = tiktoken.encoding_for_model(model_name) if model_name else None
+            except Exception:
+                encoding = None
+            if encoding is None:
+                try:
+                    encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    return None
+            _encodings[key] = encoding
+    return encoding
+
+
+def estimate_tokens(text: Any, model_name: Optional[str] = None) -> int:
+    """
+    Estimate the token count of a text (or any nested prompt structure).
+
+    Uses tiktoken when installed; otherwise falls back to roughly four characters per
+    token, which is close enough for budgeting across most providers.
+    """
+    text = flatten_text(text)
+    if not text:
+        return 0
+    encoding = _get_encoding(model_name)
+    if encoding is not None:
+        try:
+            return len(encoding.encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    return math.ceil(len(text) / 4)
+
+
+def flatten_text(value: Any) -> str:
+    """Collect the text out of a prompt payload (strings, message lists, content blocks)."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return ""
+    if isinstance(value, dict):
+        for key in ("content", "text"):
+            if key in value:
+                return flatten_text(value[key])
+        return "\n".join(flatten_text(v) for k, v in value.items() if k != "cache_prefix")
+    if isinstance(value, (list, tuple)):
+        return "\n".join(filter(None, (flatten_text(v) for v in value)))
+    return ""
+
+
+def _field(source: Any, name: str, default: Any = None) -> Any:
+    if isinstance(source, dict):
+        return source.get(name, default)
+    return getattr(source, name, default)
+
+
+def usage_from_openai_format(response: Any) -> Optional[Dict[str, int]]:
+    """
+    Read the ``usage`` block of an OpenAI-compatible chat response (SDK object or JSON dict).
+    Used by OpenAI, Groq, OpenRouter, vLLM and LM Studio responses.
+    """
+    usage = _field(response, "usage")
+    if not usage:
+        return None
+    details = _field(usage, "prompt_tokens_details") or {}
+    return {
+        "prompt_tokens": _field(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": _field(usage, "completion_tokens", 0) or 0,
+        "cached_tokens": _field(details, "cached_tokens", 0) or 0,
+    }
+
+
+# ---------------------------------
+# Accounting
+# ---------------------------------
+
+def _empty_totals() -> Dict[str, int]:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "estimated_calls": 0}
+
+
+class TokenAccountant:
+    """
+    Process-wide token usage aggregated per agent, per model and per cog run.
+
+    Usage is reported by the model wrappers after every successful call. Providers that
+    return usage are recorded as-is; otherwise the wrapper falls back to a local estimate
+    and the call is counted under ``estimated_calls``.
+    """
+
+    _lock = threading.Lock()
+    _by_agent: Dict[str, Dict[str, int]] = {}
+    _by_model: Dict[str, Dict[str, int]] = {}
+    _by_run: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def record(cls, agent_name: str, model_name: str, prompt_tokens: int, completion_tokens: int,
+               estimated: bool = False, run_id: Optional[str] = None, shared: bool = False) -> None:
+        """
+        Add one call's usage to the aggregates.
+
+        Args:
+            agent_name (str): The agent that issued the call.
+            model_name (str): The model identifier the call was sent to.
+            prompt_tokens (int): Input tokens for the call.
+            completion_tokens (int): Output tokens for the call.
+            estimated (bool): True when the counts are local estimates rather than provider-reported.
+            run_id (str, optional): The cog run to attribute the call to; defaults to the current run.
+            shared (bool): True when the reply was shared from another caller's identical in-flight
+                request. The usage counts toward the agent and run, but not the model, which was
+                only called once.
+        """
+        run_id = run_id if run_id is not None else current_run_id.get()
+        buckets = [(cls._by_agent, agent_name)]
+        if not shared:
+            buckets.append((cls._by_model, model_name))
+        if run_id:
+            buckets.append((cls._by_run, run_id))
+
+        with cls._lock:
+            for store, key in buckets:
+                totals = store.setdefault(key, _empty_totals())
+                totals["calls"] += 1
+                totals["prompt_tokens"] += prompt_tokens
+                totals["completion_tokens"] += completion_tokens
+                totals["total_tokens"] += prompt_tokens + completion_tokens
+                if estimated:
+                    totals["estimated_calls"] += 1
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Return a copy of all aggregates, grouped by 'agents', 'models' and 'runs'."""
+        with cls._lock:
+            return {
+                "agents": {k: dict(v) for k, v in cls._by_agent.items()},
+                "models": {k: dict(v) for k, v in cls._by_model.items()},
+                "runs": {k: dict(v) for k, v in cls._by_run.items()},
+            }
+
+    @classmethod
+    def run_totals(cls, run_id: str) -> Dict[str, int]:
+        """Return the totals for a single cog run (zeros if nothing was recorded)."""
+        with cls._lock:
+            return dict(cls._by_run.get(run_id, _empty_totals()))
+
+    @classmethod
+    def pop_run(cls, run_id: str) -> Dict[str, int]:
+        """Return and discard the totals for a finished run so long-lived processes do not grow."""
+        with cls._lock:
+            return cls._by_run.pop(run_id, _empty_totals())
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._by_agent.clear()
+            cls._by_model.clear()
+            cls._by_run.clear()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def track_run(name: Optional[str] = None) -> Iterator[str]:
+        """
+        Attribute every model call made inside the block to a new run id.
+
+        Yields:
+            str: The run id, e.g. ``"example_cog:1f2e..."``.
+        """
+        run_id = f"{name or 'run'}:{uuid.uuid4().hex[:12]}"
+        token = current_run_id.set(run_id)
+        try:
+            yield run_id
+        finally:
+            current_run_id.reset(token)
@@ -0,0 +1,335 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from agentforge.utils.sink_registry import SinkRegistry
+
+# The open span that new spans on this thread/task become children of
+_current_span: contextvars.ContextVar[Optional["_ActiveSpan"]] = contextvars.ContextVar(
+    "agentforge_trace_span", default=None
+)
+
+# OTLP enum values (opentelemetry/proto/trace/v1/trace.proto)
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_UNSET = 0
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+# ---------------------------------
+# Spans
+# ---------------------------------
+
+@dataclass
+class Span:
+    """
+    One timed operation in a cog trace.
+
+    Identifiers and timestamps follow OpenTelemetry: hex trace/span ids and
+    nanoseconds since the Unix epoch. ``status_code`` uses the OTLP values
+    (0 unset, 1 ok, 2 error).
+    """
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    start_time_ns: int = 0
+    end_time_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status_code: int = STATUS_CODE_UNSET
+    status_message: str = ""
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_time_ns - self.start_time_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def set_error(self, message: str) -> None:
+        self.status_code = STATUS_CODE_ERROR
+        self.status_message = message
+
+
+class _NullSpan:
+    """Returned when no trace is active; accepts and discards everything."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Trace:
+    """Collects the finished spans of one trace and exports them when the root span ends."""
+
+    def __init__(self, exporters: List["SpanExporter"]):
+        self.trace_id = _new_id(16)
+        self.spans: List[Span] = []
+        self.exporters = exporters
+        self._lock = threading.Lock()
+
+    def finish(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def export(self) -> None:
+        with self._lock:
+            spans = list(self.spans)
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception:
+                # A broken exporter must never fail the cog
+                pass
+
+
+class _ActiveSpan:
+    __slots__ = ("_trace", "_span", "_token", "_root")
+
+    def __init__(self, trace: _Trace, name: str, parent: Optional["_ActiveSpan"], attributes: Dict[str, Any]):
+        self._trace = trace
+        self._root = parent is None
+        self._span = Span(
+            name=name,
+            trace_id=trace.trace_id,
+            span_id=_new_id(8),
+            parent_span_id=parent._span.span_id if parent is not None else None,
+            attributes=attributes,
+        )
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._span.start_time_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self._span
+        span.end_time_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            span.attributes.setdefault("exception.type", exc_type.__name__)
+            span.set_error(str(exc))
+        elif span.status_code == STATUS_CODE_UNSET:
+            span.status_code = STATUS_CODE_OK
+        self._trace.finish(span)
+        if self._root:
+            self._trace.export()
+        return False
+
+
+def span(name: str, **attributes: Any):
+    """
+    Open a child span of the current span.
+
+    Returns a shared no-op span when no trace is active, so instrumented code adds no
+    spans or allocations while tracing is off. Use as
+    ``with span("memory.query", memory_node=mem_id) as s: ... s.set_attribute(...)``.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NULL_SPAN
+    return _ActiveSpan(parent._trace, name, parent, attributes)
+
+
+def is_recording() -> bool:
+    """True when a trace is active on this thread/task; use to skip computing costly attributes."""
+    return _current_span.get() is not None
+
+
+def current_span():
+    """Return the active span, or the no-op span when no trace is active."""
+    active = _current_span.get()
+    return active._span if active is not None else _NULL_SPAN
+
+
+# ---------------------------------
+# Exporters
+# ---------------------------------
+
+class SpanExporter:
+    """Receives the spans of every finished trace. Subclass and register with ``Tracing.add_exporter``."""
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps the most recent finished traces in memory, for tests and in-process inspection."""
+
+    def __init__(self, max_traces: int = 100):
+        self.max_traces = max_traces
+        self._lock = threading.Lock()
+        self._traces: List[List[Span]] = []
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self._traces.append(spans)
+            if self.max_traces and len(self._traces) > self.max_traces:
+                del self._traces[:-self.max_traces]
+
+    def get_finished_traces(self) -> List[List[Span]]:
+        with self._lock:
+            return [list(spans) for spans in self._traces]
+
+    def last_trace(self) -> List[Span]:
+        with self._lock:
+            return list(self._traces[-1]) if self._traces else []
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def to_otlp_json(spans: List[Span], service_name: str = "agentforge") -> Dict[str, Any]:
+    """Build an OTLP/JSON ``ExportTraceServiceRequest`` document for a list of spans."""
+    otlp_spans = []
+    for s in spans:
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(s.start_time_ns),
+            "endTimeUnixNano": str(s.end_time_ns),
+            "attributes": _otlp_attributes(s.attributes),
+            "status": {"code": s.status_code},
+        }
+        if s.parent_span_id:
+            item["parentSpanId"] = s.parent_span_id
+        if s.status_message:
+            item["status"]["message"] = s.status_message
+        otlp_spans.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": "agentforge"}, "spans": otlp_spans}],
+        }]
+    }
+
+
+class OtlpJsonFileExporter(SpanExporter):
+    """
+    Appends each finished trace to a file as one OTLP/JSON request per line.
+
+    This is the format read by the OpenTelemetry Collector's ``otlpjsonfile`` receiver,
+    so traces can be replayed into Jaeger, Tempo or similar after the fact.
+    """
+
+    def __init__(self, path: str, service_name: str = "agentforge"):
+        self.path = Path(path)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(to_otlp_json(spans, self.service_name), default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+# ---------------------------------
+# Registry
+# ---------------------------------
+
+class Tracing:
+    """
+    Process-wide entry point for cog tracing.
+
+    Tracing is switched on by ``system.tracing.enabled``; the configured exporter names
+    (``memory``, ``otlp_json``) resolve to shared exporter instances, and exporters added
+    with :meth:`add_exporter` receive every trace while tracing is enabled.
+    """
+
+    memory = InMemorySpanExporter()
+
+    _exporters: SinkRegistry[SpanExporter]
+
+    @classmethod
+    def start_trace(cls, name: str, settings: Any = None, **attributes: Any):
+        """
+        Open the root span of a new trace, or a child span when a trace is already active.
+
+        Returns the no-op span when tracing is disabled.
+
+        Args:
+            name (str): The root span name, e.g. ``"cog example_cog"``.
+            settings (TracingSettings, optional): The ``system.tracing`` settings in effect.
+            **attributes: Attributes recorded on the span.
+        """
+        parent = _current_span.get()
+        if parent is not None:
+            return _ActiveSpan(parent._trace, name, parent, attributes)
+        if settings is None or not settings.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(_Trace(cls._exporters.sinks_for(settings, settings.exporters)), name, None, attributes)
+
+    @classmethod
+    def add_exporter(cls, exporter: SpanExporter) -> None:
+        cls._exporters.add(exporter)
+
+    @classmethod
+    def remove_exporter(cls, exporter: SpanExporter) -> None:
+        cls._exporters.remove(exporter)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop added exporters and cached exporter resolution, and clear the in-memory traces."""
+        cls._exporters.reset()
+        cls.memory.clear()
+
+    @classmethod
+    def _builtin_exporter(cls, name: str, settings: Any) -> Optional[SpanExporter]:
+        if name == "memory":
+            return cls.memory
+        if name == "otlp_json":
+            key = (settings.otlp_path, settings.service_name)
+            return cls._exporters.shared(key, lambda: OtlpJsonFileExporter(settings.otlp_path, settings.service_name))
+        return None
+
+
+Tracing._exporters = SinkRegistry(Tracing._builtin_exporter)
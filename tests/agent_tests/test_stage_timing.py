@@ -0,0 +1,121 @@
+import copy
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from agentforge.agent import Agent
+from agentforge.apis.base_api import BaseModel
+from agentforge.config import Config
+from agentforge.core.config_manager import ConfigManager
+from agentforge.utils.stage_timing import StageTiming, TimingSink, span
+
+STAGES = ["load_data", "process_data", "render_prompt", "run_model", "parse_result", "post_process_result",
+          "build_output"]
+
+
+@pytest.fixture(autouse=True)
+def _reset_timing():
+    StageTiming.reset()
+    yield
+    StageTiming.reset()
+
+
+class _FlakyModel(BaseModel):
+    """Fails the first call, then returns a fenced JSON reply."""
+
+    def __init__(self):
+        super().__init__("flaky-model", base_backoff=0)
+        self.calls = 0
+        self.logger = SimpleNamespace(
+            log_prompt=lambda *args, **kwargs: None,
+            log_response=lambda *args, **kwargs: None,
+            warning=lambda *args, **kwargs: None,
+            critical=lambda *args, **kwargs: None,
+        )
+
+    def _init_logger(self, model_prompt, params):
+        params.pop("agent_name", None)
+
+    def _do_api_call(self, prompt, **filtered_params):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("transient")
+        return '```json\n{"answer": 42}\n```'
+
+
+def _timed_agent(isolated_config, timing):
+    settings = copy.deepcopy(isolated_config.data["settings"])
+    settings["system"]["misc"]["on_the_fly"] = False
+    settings["system"]["debug"]["mode"] = False
+    settings["system"]["timing"] = timing
+    raw = {
+        "name": "TimedAgent",
+        "params": {},
+        "prompts": {"system": "Answer.", "user": "Go."},
+        "model": _FlakyModel(),
+        "settings": settings,
+        "parse_response_as": "json",
+    }
+    agent_config = ConfigManager().build_agent_config(raw)
+    with patch.object(Config, "load_agent_data", return_value=agent_config):
+        return Agent("TimedAgent")
+
+
+def test_stages_and_retry_and_parse_spans_are_recorded(isolated_config, tmp_path):
+    jsonl = tmp_path / "timings.jsonl"
+    collected = []
+
+    class _ListSink(TimingSink):
+        def emit(self, record):
+            collected.append(record)
+
+    StageTiming.add_sink(_ListSink())
+    agent = _timed_agent(isolated_config, {"enabled": True, "sinks": ["histogram", "jsonl"], "jsonl_path": str(jsonl)})
+    agent._execute_workflow()
+
+    record = agent.last_timing
+    assert agent.output == {"answer": 42}
+    assert list(record.stages) == STAGES
+    assert record.total_ms >= sum(record.stages.values()) * 0.99
+    assert record.status == "ok"
+
+    attempts = [s for s in record.spans if s.name == "model.attempt"]
+    assert [(s.attributes["attempt"], s.status) for s in attempts] == [(1, "RuntimeError"), (2, "ok")]
+    assert [s.attributes["mode"] for s in record.spans if s.name == "parse.attempt"] == ["fenced"]
+
+    assert collected == [record]
+    line = json.loads(jsonl.read_text().strip())
+    assert line["agent"] == "TimedAgent" and list(line["stages"]) == STAGES
+    histogram = StageTiming.histogram.snapshot()["TimedAgent"]
+    assert histogram["run_model"]["count"] == 1
+    assert histogram["model.attempt"]["count"] == 2
+
+
+def test_timing_disabled_leaves_no_record(isolated_config):
+    agent = _timed_agent(isolated_config, {"enabled": False})
+    agent._execute_workflow()
+
+    assert agent.output == {"answer": 42}
+    assert agent.last_timing is None
+    assert StageTiming.histogram.snapshot() == {}
+
+
+def test_span_outside_a_timed_run_is_a_shared_noop():
+    assert span("a") is span("b", key=1)
+    with span("a"):
+        pass
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    from agentforge.utils.stage_timing import HistogramTimingSink, TimingRecord
+
+    sink = HistogramTimingSink(buckets_ms=(10, 100, float("inf")))
+    for ms in (5, 5, 5, 50, 500):
+        sink.emit(TimingRecord(agent="A", started_at=0.0, stages={"run_model": ms}, total_ms=ms))
+
+    assert sink.percentile("A", "run_model", 50) == 10
+    assert sink.percentile("A", "run_model", 80) == 100
+    assert sink.percentile("A", "run_model", 99) == float("inf")
+    assert sink.percentile("A", "missing", 50) is None
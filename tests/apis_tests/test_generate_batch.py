@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agentforge.apis.async_base_api import AsyncBaseModel
+from agentforge.apis.base_api import BaseModel
+from agentforge.apis.vllm_api import VLLM
+from agentforge.apis.ollama_api import Ollama
+
+
+def _stub_logger(model, monkeypatch):
+    model.logger = SimpleNamespace(
+        log_prompt=lambda *args, **kwargs: None,
+        log_response=lambda *args, **kwargs: None,
+        warning=lambda *args, **kwargs: None,
+        critical=lambda *args, **kwargs: None,
+        error=lambda *args, **kwargs: None,
+    )
+    monkeypatch.setattr(model, "_init_logger", lambda model_prompt, params: params.pop("agent_name", None))
+
+
+class _EchoModel(BaseModel):
+    def __init__(self, model_name="echo", **kwargs):
+        super().__init__(model_name, num_retries=1, **kwargs)
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def _do_api_call(self, prompt, **filtered_params):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        user = prompt["messages"][-1]["content"]
+        time.sleep(0.02 if user.endswith("0") else 0.005)
+        with self.lock:
+            self.active -= 1
+        if user == "fail":
+            raise ValueError("bad prompt")
+        return user.upper()
+
+
+def _prompts(*users):
+    return [{"system": "sys", "user": u} for u in users]
+
+
+def test_generate_batch_preserves_order_and_bounds_concurrency(monkeypatch):
+    model = _EchoModel()
+    _stub_logger(model, monkeypatch)
+
+    users = [f"p{i}" for i in range(10)]
+    results = model.generate_batch(_prompts(*users), max_concurrency=3)
+
+    assert results == [u.upper() for u in users]
+    assert 1 < model.peak <= 3
+
+
+def test_generate_batch_return_exceptions(monkeypatch):
+    model = _EchoModel()
+    model.base_backoff = 0
+    _stub_logger(model, monkeypatch)
+
+    results = model.generate_batch(_prompts("a", "fail", "b"), return_exceptions=True)
+    assert results[0] == "A" and results[2] == "B"
+    assert isinstance(results[1], ValueError)
+
+    with pytest.raises(ValueError):
+        model.generate_batch(_prompts("a", "fail"))
+
+
+def test_local_servers_post_through_shared_pooled_session(monkeypatch):
+    posted = []
+
+    class _Response:
+        status_code = 200
+
+        def __init__(self, payload):
+            self._payload = payload
+
+        def json(self):
+            return self._payload
+
+    def fake_post(url, **kwargs):
+        posted.append((url, kwargs["json"]))
+        content = kwargs["json"]["messages"][-1]["content"]
+        return _Response({"choices": [{"message": {"content": f"ok:{content}"}}]})
+
+    session = VLLM._get_session()
+    assert session is VLLM._get_session()
+    assert session is not Ollama._get_session()
+    monkeypatch.setattr(session, "post", fake_post)
+
+    model = VLLM("local-model")
+    _stub_logger(model, monkeypatch)
+    results = model.generate_batch(_prompts("x", "y", "z"))
+
+    assert results == ["ok:x", "ok:y", "ok:z"]
+    assert len(posted) == 3
+    assert model.batch_concurrency > BaseModel.batch_concurrency
+
+
+class _AsyncEchoModel(AsyncBaseModel):
+    def __init__(self, model_name="async-echo", **kwargs):
+        super().__init__(model_name, num_retries=1, **kwargs)
+        self.active = 0
+        self.peak = 0
+
+    async def _do_api_call_async(self, prompt, **filtered_params):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return prompt["messages"][-1]["content"].upper()
+
+
+def test_generate_batch_async(monkeypatch):
+    model = _AsyncEchoModel()
+    _stub_logger(model, monkeypatch)
+
+    users = [f"q{i}" for i in range(6)]
+    results = asyncio.run(model.generate_batch_async(_prompts(*users), max_concurrency=2))
+
+    assert results == [u.upper() for u in users]
+    assert model.peak == 2
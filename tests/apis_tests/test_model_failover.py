@@ -0,0 +1,249 @@
+import copy
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from agentforge.agent import Agent
+from agentforge.apis.base_api import BaseModel
+from agentforge.apis.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from agentforge.apis.fallback_model import FallbackModel, ModelCandidate
+from agentforge.config import Config
+from agentforge.core.config_manager import ConfigManager
+
+
+@pytest.fixture(autouse=True)
+def _fresh_breakers():
+    CircuitBreakerRegistry.clear()
+    yield
+    CircuitBreakerRegistry.clear()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _ScriptedModel(BaseModel):
+    """Returns queued replies; raises them when they are exceptions."""
+
+    def __init__(self, model_name, replies=None):
+        super().__init__(model_name)
+        self.replies = list(replies or [])
+        self.calls = []
+
+    def generate(self, model_prompt=None, **params):
+        self.calls.append(params)
+        reply = self.replies.pop(0) if self.replies else f"{self.model_name}-ok"
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+# ---------------------------------
+# Circuit breaker
+# ---------------------------------
+
+def test_breaker_opens_on_failure_rate_and_half_opens_after_timeout():
+    clock = _Clock()
+    breaker = CircuitBreaker("api/model", failure_rate_threshold=0.5, window_size=4,
+                             min_calls=2, recovery_timeout=10, clock=clock)
+
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+
+    clock.now = 11
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False  # only one probe at a time
+
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_counts_slow_calls_and_reopens_on_failed_probe():
+    clock = _Clock()
+    breaker = CircuitBreaker("api/model", window_size=2, min_calls=1, slow_call_seconds=1.0,
+                             recovery_timeout=5, clock=clock)
+
+    breaker.record_success(2.5)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 6
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+# ---------------------------------
+# Fallback routing
+# ---------------------------------
+
+def _fallback(primary, secondary, settings=None):
+    return FallbackModel([
+        ModelCandidate("fast_api", "Fast", primary, {"temperature": 0.8, "max_tokens": 10}),
+        ModelCandidate("backup_api", "Backup", secondary, {"temperature": 0.2}),
+    ], settings)
+
+
+def test_fallback_routes_to_next_candidate_with_its_own_params():
+    primary = _ScriptedModel("primary", [RuntimeError("down")])
+    secondary = _ScriptedModel("secondary")
+    model = _fallback(primary, secondary)
+
+    reply = model.generate({"system": "s", "user": "u"}, temperature=0.8, max_tokens=10, agent_name="a")
+
+    assert reply == "secondary-ok"
+    assert secondary.calls == [{"temperature": 0.2, "agent_name": "a"}]
+    assert primary.calls[0]["num_retries"] == 1  # non-final candidates fail over quickly
+    assert primary.num_retries == BaseModel.default_retries
+
+
+def test_open_circuit_skips_candidate_until_recovery():
+    primary = _ScriptedModel("primary", [RuntimeError("down")] * 3)
+    secondary = _ScriptedModel("secondary")
+    model = _fallback(primary, secondary, {"min_calls": 1, "recovery_timeout": 60})
+
+    assert model.generate({"user": "u"}) == "secondary-ok"
+    assert model.breakers[0].state == CircuitBreaker.OPEN
+
+    model.generate({"user": "u"})
+    assert len(primary.calls) == 1
+    assert len(secondary.calls) == 2
+
+
+def test_all_circuits_open_probes_the_earliest_opened_candidate():
+    primary = _ScriptedModel("primary", [RuntimeError("down")])
+    secondary = _ScriptedModel("secondary", [RuntimeError("down")])
+    model = _fallback(primary, secondary, {"min_calls": 1, "recovery_timeout": 60})
+
+    with pytest.raises(ValueError):
+        model.generate({"user": "u"})
+    assert [b.state for b in model.breakers] == [CircuitBreaker.OPEN, CircuitBreaker.OPEN]
+
+    assert model.generate({"user": "u"}) == "primary-ok"
+    assert len(primary.calls) == 2 and len(secondary.calls) == 1
+    assert model.breakers[0].state == CircuitBreaker.CLOSED
+
+
+def test_all_candidates_failing_raises():
+    model = _fallback(_ScriptedModel("a", [RuntimeError("x")]), _ScriptedModel("b", [RuntimeError("y")]))
+    with pytest.raises(ValueError):
+        model.generate({"user": "u"})
+
+
+class _FailingModel(BaseModel):
+    """Fails every API call, counting the attempts."""
+
+    def __init__(self, model_name):
+        super().__init__(model_name, base_backoff=0)
+        self.attempts = 0
+
+    def _init_logger(self, model_prompt, params):
+        params.pop("agent_name", None)
+        return SimpleNamespace(warning=lambda *args: None, critical=lambda *args: None)
+
+    def _do_api_call(self, prompt, **filtered_params):
+        self.attempts += 1
+        raise RuntimeError("down")
+
+
+def test_reduced_retries_do_not_change_a_shared_model():
+    """A model used as a fallback candidate keeps its full retry budget for its other callers."""
+    shared = _FailingModel("shared")
+    model = _fallback(shared, _ScriptedModel("secondary"))
+
+    assert model.generate({"user": "u"}) == "secondary-ok"
+    assert shared.attempts == 1
+
+    with pytest.raises(ValueError):
+        shared.generate({"user": "u"})
+    assert shared.attempts == 1 + BaseModel.default_retries
+
+
+# ---------------------------------
+# Config resolution
+# ---------------------------------
+
+def test_default_model_list_resolves_to_fallback_chain(isolated_config):
+    models = isolated_config.data["settings"]["models"]
+    models["default_model"] = [
+        {"api": "gemini_api", "model": "gemini_flash"},
+        {"api": "anthropic_api", "model": "claude4sonnet", "params": {"temperature": 0.1}},
+    ]
+    agent = isolated_config.find_config("prompts", "cog_analyze_agent")
+
+    candidates = isolated_config.resolve_model_candidates(agent)
+    assert [c[0] for c in candidates] == ["gemini_api", "anthropic_api"]
+    assert candidates[1][3]["temperature"] == 0.1
+    assert isolated_config.resolve_model_overrides(agent) == candidates[0]
+
+    model = isolated_config.build_model(candidates)
+    assert isinstance(model, FallbackModel)
+    assert model.model_name == candidates[0][2]
+
+
+def test_agent_model_override_replaces_default_fallbacks(isolated_config):
+    models = isolated_config.data["settings"]["models"]
+    models["default_model"]["fallbacks"] = [{"api": "anthropic_api", "model": "claude4sonnet"}]
+
+    agent = {"model_overrides": {"api": "openai_api", "model": "omni_model"}}
+    assert len(isolated_config.resolve_model_candidates(agent)) == 1
+
+    agent = {"model_overrides": {"params": {"temperature": 0}}}
+    candidates = isolated_config.resolve_model_candidates(agent)
+    assert [c[0] for c in candidates] == ["gemini_api", "anthropic_api"]
+    assert all(c[3]["temperature"] == 0 for c in candidates)
+
+
+# ---------------------------------
+# Cascade mode
+# ---------------------------------
+
+def _cascade_agent(isolated_config, cheap, large, **policy):
+    settings = copy.deepcopy(isolated_config.data["settings"])
+    settings["system"]["misc"]["on_the_fly"] = False
+    settings["system"]["debug"]["mode"] = False
+    raw = {
+        "name": "TestCascadeAgent",
+        "params": {"temperature": 0.5},
+        "prompts": {"system": "sys", "user": "usr"},
+        "model": cheap,
+        "settings": settings,
+        "parse_response_as": "json",
+        "cascade": {"steps": [{"model": large, "params": {"temperature": 0}, "label": "big/large"}], **policy},
+    }
+    agent_config = ConfigManager().build_agent_config(raw)
+    with patch.object(Config, "load_agent_data", return_value=agent_config):
+        return Agent("TestCascadeAgent")
+
+
+def test_cascade_escalates_on_parse_failure(isolated_config):
+    cheap = _ScriptedModel("cheap", ["not json at all {"])
+    large = _ScriptedModel("large", ['{"answer": 42}'])
+    agent = _cascade_agent(isolated_config, cheap, large)
+
+    agent._execute_workflow()
+
+    assert agent.output == {"answer": 42}
+    assert large.calls[0]["temperature"] == 0
+
+
+def test_cascade_escalates_on_missing_or_low_confidence(isolated_config):
+    cheap = _ScriptedModel("cheap", ['{"answer": 1, "confidence": 0.3}'])
+    large = _ScriptedModel("large", ['{"answer": 2, "confidence": 0.9}'])
+    agent = _cascade_agent(isolated_config, cheap, large, confidence_key="confidence", min_confidence=0.7)
+
+    agent._execute_workflow()
+    assert agent.output == {"answer": 2, "confidence": 0.9}
+
+    cheap.replies = ['{"answer": 3, "confidence": 0.95}']
+    agent._execute_workflow()
+    assert agent.output["answer"] == 3
+    assert len(large.calls) == 1
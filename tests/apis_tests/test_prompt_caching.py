@@ -0,0 +1,156 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agentforge.apis.anthropic_api import Claude
+from agentforge.apis.gemini_api import Gemini
+from agentforge.apis.openai_api import GPT
+from agentforge.apis.prompt_cache import PromptCacheStats, split_cache_prefix
+from agentforge.utils.prompt_processor import PromptProcessor
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    PromptCacheStats.reset()
+    yield
+    PromptCacheStats.reset()
+
+
+def _stub_logger(model, monkeypatch):
+    model.logger = SimpleNamespace(
+        log_prompt=lambda *args, **kwargs: None,
+        log_response=lambda *args, **kwargs: None,
+        warning=lambda *args, **kwargs: None,
+        critical=lambda *args, **kwargs: None,
+    )
+    monkeypatch.setattr(model, "_init_logger", lambda model_prompt, params: params.pop("agent_name", None))
+
+
+PROMPTS = {
+    "system": {
+        "task": "Task for {name}.",
+        "persona": "Persona: stable text.",
+        "intro": "You are helpful.",
+    },
+    "user": "Hi {name}",
+}
+
+
+def test_render_prompts_places_cacheable_sections_first():
+    processor = PromptProcessor()
+    rendered = processor.render_prompts(PROMPTS, {"name": "Ada"}, cacheable=["intro", "persona"])
+
+    # Cacheable sections keep their YAML order and come before dynamic ones
+    assert rendered["system"] == "Persona: stable text.\nYou are helpful.\nTask for Ada."
+    assert rendered["cache_prefix"] == "Persona: stable text.\nYou are helpful."
+    assert split_cache_prefix(rendered) == (rendered["cache_prefix"], "Task for Ada.")
+
+
+def test_render_prompts_without_cacheable_is_unchanged():
+    rendered = PromptProcessor().render_prompts(PROMPTS, {"name": "Ada"})
+    assert "cache_prefix" not in rendered
+    assert rendered["system"].startswith("Task for Ada.")
+
+
+def test_claude_emits_cache_control_block():
+    prompt = {"system": "PREFIX\nrest", "user": "u", "cache_prefix": "PREFIX"}
+    payload = Claude._prepare_prompt(prompt)
+
+    assert payload["system"] == [
+        {"type": "text", "text": "PREFIX", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "rest"},
+    ]
+    assert Claude._prepare_prompt({"system": "plain", "user": "u"})["system"] == "plain"
+
+
+def test_claude_reports_cache_usage():
+    usage = SimpleNamespace(cache_read_input_tokens=900, cache_creation_input_tokens=0, input_tokens=100,
+                            output_tokens=25)
+    model = Claude("claude-test")
+    assert model._extract_usage(SimpleNamespace(usage=usage)) == {
+        "prompt_tokens": 1000, "completion_tokens": 25, "cached_tokens": 900, "cache_write_tokens": 0,
+    }
+
+
+def test_gpt_cache_hits_and_misses_are_recorded(monkeypatch):
+    model = GPT("gpt-test")
+    _stub_logger(model, monkeypatch)
+
+    def response(cached):
+        usage = SimpleNamespace(prompt_tokens=2000, prompt_tokens_details=SimpleNamespace(cached_tokens=cached))
+        message = SimpleNamespace(content="ok")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    replies = iter([response(0), response(1536)])
+    monkeypatch.setattr(model.runtime, "chat_completions_response", lambda model, messages, params: next(replies))
+
+    assert model.generate({"system": "s", "user": "u"}) == "ok"
+    assert model.generate({"system": "s", "user": "u"}) == "ok"
+
+    stats = PromptCacheStats.snapshot()["gpt-test"]
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["cached_tokens"] == 1536
+
+
+def test_gemini_sends_prefix_as_cached_content_with_inline_fallback(monkeypatch):
+    model = Gemini("gemini-test")
+    messages = Gemini._prepare_prompt({"system": "PREFIX\nrest", "user": "u", "cache_prefix": "PREFIX"})
+    assert messages[0] == {"role": "system", "content": "PREFIX", "cacheable": True}
+
+    sent = []
+
+    class _FakeModel:
+        def __init__(self, source):
+            self.source = source
+
+        def generate_content(self, content, **kwargs):
+            sent.append((self.source, content))
+            return SimpleNamespace(text="ok")
+
+    import agentforge.apis.gemini_api as gemini_mod
+    monkeypatch.setattr(gemini_mod.genai, "GenerativeModel", lambda name: _FakeModel("plain"))
+    monkeypatch.setattr(Gemini, "_cached_contents", {})
+
+    # Cache creation unavailable -> prefix stays inline
+    monkeypatch.setattr(model, "_create_cached_content", lambda prefix: None)
+    model._do_api_call({"messages": messages})
+    assert sent[-1] == ("plain", "PREFIX\n\nrest\n\nu")
+
+    # Cache available -> only the dynamic remainder is sent
+    monkeypatch.setattr(model, "_get_cached_model", lambda prefix: _FakeModel("cached"))
+    model._do_api_call({"messages": messages})
+    assert sent[-1] == ("cached", "rest\n\nu")
+
+
+def test_gemini_cache_creation_only_blocks_its_own_prefix(monkeypatch):
+    import agentforge.apis.gemini_api as gemini_mod
+    monkeypatch.setattr(gemini_mod.genai, "GenerativeModel",
+                        SimpleNamespace(from_cached_content=lambda cached_content: cached_content))
+    monkeypatch.setattr(Gemini, "_cached_contents", {})
+    monkeypatch.setattr(Gemini, "_cache_key_locks", {})
+
+    release = threading.Event()
+    created = []
+
+    def create(prefix):
+        created.append(prefix)
+        if prefix == "slow":
+            release.wait(timeout=5)
+        return f"cache-{prefix}"
+
+    model = Gemini("gemini-test")
+    monkeypatch.setattr(model, "_create_cached_content", create)
+
+    slow = threading.Thread(target=model._get_cached_model, args=("slow",))
+    slow.start()
+    while not created:
+        time.sleep(0.01)
+
+    assert model._get_cached_model("fast") == "cache-fast"
+    assert slow.is_alive()
+    release.set()
+    slow.join()
+    assert model._get_cached_model("slow") == "cache-slow"
+    assert created == ["slow", "fast"]
@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from agentforge.apis.async_base_api import AsyncBaseModel
+from agentforge.apis.base_api import BaseModel
+from agentforge.utils.single_flight import SingleFlight, AsyncSingleFlight, make_request_key
+from agentforge.utils.token_accounting import TokenAccountant
+
+
+def _stub_logger(model, monkeypatch):
+    model.logger = SimpleNamespace(
+        log_prompt=lambda *args, **kwargs: None,
+        log_response=lambda *args, **kwargs: None,
+        warning=lambda *args, **kwargs: None,
+        critical=lambda *args, **kwargs: None,
+    )
+
+    def init_logger(model_prompt, params):
+        params.pop("agent_name", None)
+
+    monkeypatch.setattr(model, "_init_logger", init_logger)
+
+
+class _SlowModel(BaseModel):
+    def __init__(self, model_name="slow", **kwargs):
+        super().__init__(model_name, num_retries=1, **kwargs)
+        self.calls = 0
+        self.release = threading.Event()
+        self.error = None
+
+    def _do_api_call(self, prompt, **filtered_params):
+        self.calls += 1
+        self.release.wait(timeout=5)
+        if self.error:
+            raise self.error
+        return f"reply-{self.calls}"
+
+
+def _run_concurrently(fn, count):
+    results, errors = [None] * count, [None] * count
+
+    def worker(i):
+        try:
+            results[i] = fn()
+        except Exception as e:  # noqa: BLE001 - collected for assertions
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def test_request_key_ignores_param_order():
+    assert make_request_key({"a": 1, "b": 2}) == make_request_key({"b": 2, "a": 1})
+    assert make_request_key({"a": 1}) != make_request_key({"a": 2})
+
+
+def test_single_flight_shares_result_between_concurrent_callers():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "done"
+
+    threads, results, errors = _run_concurrently(lambda: flight.do("k", work), 4)
+    while flight.in_flight() == 0:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert [r[0] for r in results] == ["done"] * 4
+    assert sorted(r[1] for r in results) == [False, True, True, True]
+    assert flight.in_flight() == 0
+
+
+def test_deterministic_generations_are_coalesced(monkeypatch):
+    model = _SlowModel()
+    _stub_logger(model, monkeypatch)
+    prompt = {"system": "sys", "user": "status?"}
+
+    threads, results, errors = _run_concurrently(lambda: model.generate(prompt, temperature=0), 3)
+    time.sleep(0.1)
+    model.release.set()
+    for t in threads:
+        t.join()
+
+    assert model.calls == 1
+    assert results == ["reply-1"] * 3
+    assert errors == [None] * 3
+
+
+def test_waiters_are_credited_to_their_own_agent(monkeypatch):
+    TokenAccountant.reset()
+    model = _SlowModel()
+    _stub_logger(model, monkeypatch)
+    monkeypatch.setattr(model, "_extract_usage", lambda raw: {"prompt_tokens": 10, "completion_tokens": 2})
+    prompt = {"system": "sys", "user": "status?"}
+    agents = iter(["Writer", "Reviewer"])
+
+    threads, results, errors = _run_concurrently(
+        lambda: model.generate(prompt, temperature=0, agent_name=next(agents)), 2)
+    time.sleep(0.1)
+    model.release.set()
+    for t in threads:
+        t.join()
+
+    snapshot = TokenAccountant.snapshot()
+    assert model.calls == 1
+    assert snapshot["agents"]["Writer"]["total_tokens"] == 12
+    assert snapshot["agents"]["Reviewer"]["total_tokens"] == 12
+    assert snapshot["models"]["slow"]["calls"] == 1
+    assert model._agent_name == "NamelessAgent"
+    TokenAccountant.reset()
+
+
+def test_failures_propagate_to_all_waiters(monkeypatch):
+    model = _SlowModel()
+    model.error = ValueError("boom")
+    _stub_logger(model, monkeypatch)
+    prompt = {"system": "sys", "user": "status?"}
+
+    threads, results, errors = _run_concurrently(lambda: model.generate(prompt, coalesce=True), 3)
+    time.sleep(0.1)
+    model.release.set()
+    for t in threads:
+        t.join()
+
+    assert model.calls == 1
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_non_deterministic_generations_are_not_coalesced_by_default(monkeypatch):
+    model = _SlowModel()
+    model.release.set()
+    _stub_logger(model, monkeypatch)
+    prompt = {"system": "sys", "user": "status?"}
+
+    assert model._coalesce_key({"messages": []}, {"temperature": 0.7}, None) is None
+    assert model._coalesce_key({"messages": []}, {"temperature": 0}, False) is None
+    assert model._coalesce_key({"messages": []}, {"temperature": 0.7}, True) is not None
+    assert model._coalesce_key({"messages": []}, {}, True, images=["x.png"]) is None
+
+    model.generate(prompt, temperature=0.7)
+    model.generate(prompt, temperature=0.7)
+    assert model.calls == 2
+
+
+class _AsyncSlowModel(AsyncBaseModel):
+    def __init__(self, model_name="async-slow", **kwargs):
+        super().__init__(model_name, num_retries=1, **kwargs)
+        self.calls = 0
+
+    async def _do_api_call_async(self, prompt, **filtered_params):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return "async-reply"
+
+
+def test_async_generations_are_coalesced(monkeypatch):
+    model = _AsyncSlowModel()
+    _stub_logger(model, monkeypatch)
+    prompt = {"system": "sys", "user": "status?"}
+
+    async def main():
+        return await asyncio.gather(*[model.generate_async(prompt, coalesce=True) for _ in range(3)])
+
+    assert asyncio.run(main()) == ["async-reply"] * 3
+    assert model.calls == 1
+
+
+def test_async_single_flight_propagates_errors():
+    flight = AsyncSingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("bad")
+
+    async def main():
+        return await asyncio.gather(*[flight.do("k", boom) for _ in range(2)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_async_leader_cancellation_does_not_cancel_waiters():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await waiter
+        return leader.cancelled(), result
+
+    assert asyncio.run(main()) == (True, ("done", True))
+    assert calls == [1]
+
+
+def test_async_call_is_cancelled_once_every_caller_leaves():
+    flight = AsyncSingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def main():
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert finished == []
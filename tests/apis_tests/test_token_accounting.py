@@ -0,0 +1,130 @@
+import copy
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from agentforge.agent import Agent
+from agentforge.apis.base_api import BaseModel
+from agentforge.config import Config
+from agentforge.core.config_manager import ConfigManager
+from agentforge.utils.token_accounting import TokenAccountant, estimate_tokens, current_run_id
+
+
+@pytest.fixture(autouse=True)
+def _reset_accounting():
+    TokenAccountant.reset()
+    yield
+    TokenAccountant.reset()
+
+
+class _UsageModel(BaseModel):
+    """Returns a canned reply with optional provider usage."""
+
+    def __init__(self, model_name, usage=None):
+        super().__init__(model_name)
+        self.usage = usage
+        self.logger = SimpleNamespace(
+            log_prompt=lambda *args, **kwargs: None,
+            log_response=lambda *args, **kwargs: None,
+            warning=lambda *args, **kwargs: None,
+            critical=lambda *args, **kwargs: None,
+        )
+
+    def _init_logger(self, model_prompt, params):
+        params.pop("agent_name", None)
+
+    def _do_api_call(self, prompt, **filtered_params):
+        return {"text": "four words of reply", "usage": self.usage}
+
+    def _process_response(self, raw_response):
+        return raw_response["text"]
+
+    def _extract_usage(self, raw_response):
+        return raw_response["usage"]
+
+
+def test_provider_usage_is_recorded_per_agent_and_model():
+    model = _UsageModel("m1", {"prompt_tokens": 120, "completion_tokens": 30})
+    model.generate({"system": "s", "user": "u"}, agent_name="Writer")
+    model.generate({"system": "s", "user": "u"}, agent_name="Writer")
+
+    snapshot = TokenAccountant.snapshot()
+    assert snapshot["agents"]["Writer"]["total_tokens"] == 300
+    assert snapshot["models"]["m1"]["calls"] == 2
+    assert snapshot["models"]["m1"]["estimated_calls"] == 0
+
+
+def test_missing_usage_falls_back_to_estimate():
+    model = _UsageModel("m2")
+    model.generate({"system": "x" * 400, "user": "u"}, agent_name="Guess")
+
+    totals = TokenAccountant.snapshot()["agents"]["Guess"]
+    assert totals["estimated_calls"] == 1
+    assert totals["prompt_tokens"] >= estimate_tokens("x" * 400, "m2")
+    assert totals["completion_tokens"] > 0
+
+
+def test_track_run_attributes_calls_to_the_run():
+    model = _UsageModel("m3", {"prompt_tokens": 10, "completion_tokens": 5})
+    with TokenAccountant.track_run("cog") as run_id:
+        assert current_run_id.get() == run_id
+        model.generate_batch([{"user": "a"}, {"user": "b"}], agent_name="A")
+
+    assert current_run_id.get() is None
+    assert TokenAccountant.run_totals(run_id)["total_tokens"] == 30
+    assert TokenAccountant.pop_run(run_id)["calls"] == 2
+    assert run_id not in TokenAccountant.snapshot()["runs"]
+
+
+# ---------------------------------
+# Pre-flight budget
+# ---------------------------------
+
+def _budget_agent(isolated_config, budget):
+    settings = copy.deepcopy(isolated_config.data["settings"])
+    settings["system"]["misc"]["on_the_fly"] = False
+    settings["system"]["debug"]["mode"] = False
+    raw = {
+        "name": "TestBudgetAgent",
+        "params": {},
+        "prompts": {
+            "system": {"task": "Do the task.", "history": "{history}", "notes": "{notes}"},
+            "user": "Go.",
+        },
+        "model": _UsageModel("m4"),
+        "settings": settings,
+        "token_budget": budget,
+    }
+    agent_config = ConfigManager().build_agent_config(raw)
+    with patch.object(Config, "load_agent_data", return_value=agent_config):
+        agent = Agent("TestBudgetAgent")
+    agent.template_data = {"history": "h " * 2000, "notes": "n " * 200}
+    return agent
+
+
+def test_budget_drops_trim_sections_until_prompt_fits(isolated_config):
+    agent = _budget_agent(isolated_config, {
+        "context_window": 600, "reserve_output_tokens": 100, "trim_sections": ["system.history", "notes"],
+    })
+    agent.render_prompt()
+
+    assert "h h" not in agent.prompt["system"]
+    assert "n n" in agent.prompt["system"]
+    assert "history" in agent.prompt_template["system"]  # the template itself is untouched
+
+
+def test_budget_leaves_prompt_alone_when_it_fits(isolated_config):
+    agent = _budget_agent(isolated_config, {
+        "context_window": 100000, "reserve_output_tokens": 100, "trim_sections": ["history"],
+    })
+    agent.render_prompt()
+    assert "h h" in agent.prompt["system"]
+
+
+def test_context_window_and_reserve_resolve_from_model_library(isolated_config):
+    agent = {"model_overrides": {"api": "openai_api", "model": "omni_model"}, "token_budget": {"trim_sections": "x"}}
+    budget = isolated_config.resolve_token_budget(agent, {"max_tokens": 15000})
+    assert budget == {"context_window": 128000, "reserve_output_tokens": 15000, "trim_sections": "x"}
+    assert ConfigManager._build_token_budget(budget).trim_sections == ["x"]
+    assert isolated_config.resolve_token_budget({}, {}) is None
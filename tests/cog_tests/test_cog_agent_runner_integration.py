@@ -164,6 +164,10 @@ class TestCogAgentRunnerIntegration:
         
         # Reload configuration
         isolated_config.load_all_configurations()
+
+        # Template-level settings do not override system settings; enable debug mode explicitly
+        isolated_config.data["settings"]["system"]["debug"]["mode"] = True
+        isolated_config.refresh_settings()
         
         # Create Cog
         cog = Cog("MemoryCog")
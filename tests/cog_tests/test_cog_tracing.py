@@ -0,0 +1,149 @@
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import yaml
+
+from agentforge.config_structs import TracingSettings
+from agentforge.core.agent_runner import AgentRunner
+from agentforge.utils.token_accounting import TokenAccountant
+from agentforge.utils.tracing import STATUS_CODE_ERROR, STATUS_CODE_OK, Tracing, span, to_otlp_json
+
+TRACED_COG = {
+    "cog": {
+        "name": "TracedCog",
+        "chat_memory_enabled": False,
+        "agents": [{"id": "analysis", "template_file": "cog_analyze_agent"}],
+        "memory": [{
+            "id": "notes",
+            "type": "agentforge.storage.memory.Memory",
+            "collection_id": "traced_notes",
+            "query_before": ["analysis"],
+            "update_after": ["analysis"],
+        }],
+        "flow": {"start": "analysis", "transitions": {"analysis": {"end": True}}},
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def _reset_tracing():
+    Tracing.reset()
+    yield
+    Tracing.reset()
+
+
+@pytest.fixture()
+def traced_cog(isolated_config, fake_chroma, tmp_path):
+    otlp_path = tmp_path / "traces.jsonl"
+    cog_path = Path(isolated_config.project_root) / ".agentforge" / "cogs" / "TracedCog.yaml"
+    cog_path.write_text(yaml.dump(TRACED_COG))
+    isolated_config.load_all_configurations()
+    isolated_config.data["settings"]["system"]["tracing"] = {
+        "enabled": True, "exporters": ["memory", "otlp_json"], "otlp_path": str(otlp_path),
+    }
+    isolated_config.refresh_settings()
+
+    from agentforge.cog import Cog
+    yield Cog("TracedCog"), otlp_path
+    cog_path.unlink()
+
+
+def _by_name(spans):
+    return {s.name: s for s in spans}
+
+
+def test_cog_run_is_exported_as_one_nested_trace(traced_cog):
+    cog, otlp_path = traced_cog
+    cog.run(user_input="hello")
+
+    spans = Tracing.memory.last_trace()
+    named = _by_name(spans)
+    root = named["cog TracedCog"]
+    assert root.parent_span_id is None
+    assert root.attributes["cog.run_id"].startswith("TracedCog:")
+    assert {s.trace_id for s in spans} == {root.trace_id}
+
+    # Every span but the root hangs off another span of the same trace
+    ids = {s.span_id for s in spans}
+    assert all(s.parent_span_id in ids for s in spans if s is not root)
+
+    cycle = named["agent.cycle"]
+    assert cycle.parent_span_id == root.span_id
+    for child in ("memory.query_before", "agent.run", "memory.update_after", "flow.transition"):
+        assert named[child].parent_span_id == cycle.span_id
+    assert named["agent.attempt"].parent_span_id == named["agent.run"].span_id
+
+    query = named["memory.query"]
+    assert query.parent_span_id == named["memory.query_before"].span_id
+    assert query.attributes["memory.node"] == "notes"
+    assert query.attributes["memory.collection"] == "traced_notes"
+    assert query.attributes["memory.results"] == 0
+    assert named["memory.update"].attributes["memory.node"] == "notes"
+    assert named["flow.transition"].attributes["flow.next_agent"] is None
+    assert all(s.status_code == STATUS_CODE_OK for s in spans)
+
+    request = json.loads(otlp_path.read_text().splitlines()[-1])
+    resource_spans = request["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0] == {
+        "key": "service.name", "value": {"stringValue": "agentforge"},
+    }
+    assert len(resource_spans["scopeSpans"][0]["spans"]) == len(spans)
+
+
+def test_failed_agent_marks_the_cycle_and_root_as_errors(traced_cog, monkeypatch):
+    cog, _ = traced_cog
+    monkeypatch.setattr(cog.agents["analysis"], "run", MagicMock(side_effect=RuntimeError("boom")))
+
+    with pytest.raises(RuntimeError):
+        cog.run(user_input="hello")
+
+    named = _by_name(Tracing.memory.last_trace())
+    for name in ("cog TracedCog", "agent.cycle", "agent.run", "agent.attempt"):
+        assert named[name].status_code == STATUS_CODE_ERROR
+        assert named[name].attributes["exception.type"] == "RuntimeError"
+    assert "memory.update_after" not in named
+
+
+def test_agent_runner_records_each_attempt_with_tokens():
+    agent = MagicMock()
+    outputs = iter(["", "ok"])
+
+    def run(**_):
+        TokenAccountant.record("TraceAgent", "m", 10, 5)
+        return next(outputs)
+
+    agent.run.side_effect = run
+    with TokenAccountant.track_run("traced") as run_id:
+        with Tracing.start_trace("root", TracingSettings(enabled=True)):
+            assert AgentRunner().run_agent("a1", agent, {}, {}, {}) == "ok"
+        TokenAccountant.pop_run(run_id)
+
+    spans = Tracing.memory.last_trace()
+    attempts = [s for s in spans if s.name == "agent.attempt"]
+    assert [s.attributes["agent.attempt"] for s in attempts] == [1, 2]
+    assert [s.status_code for s in attempts] == [STATUS_CODE_ERROR, STATUS_CODE_OK]
+    assert [s.attributes["tokens.total"] for s in attempts] == [15, 15]
+    assert _by_name(spans)["agent.run"].attributes["agent.attempts"] == 2
+
+
+def test_tracing_disabled_records_nothing(example_cog):
+    example_cog.run(user_input="hello")
+
+    assert Tracing.memory.get_finished_traces() == []
+    assert span("a") is span("b")
+    assert Tracing.start_trace("root", TracingSettings(enabled=False)) is span("c")
+
+
+def test_otlp_json_encodes_attribute_types():
+    with Tracing.start_trace("root", TracingSettings(enabled=True), flag=True, count=3, ratio=0.5, tags=["x"]):
+        pass
+
+    attributes = to_otlp_json(Tracing.memory.last_trace())["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["attributes"]
+    assert attributes == [
+        {"key": "flag", "value": {"boolValue": True}},
+        {"key": "count", "value": {"intValue": "3"}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+        {"key": "tags", "value": {"arrayValue": {"values": [{"stringValue": "x"}]}}},
+    ]
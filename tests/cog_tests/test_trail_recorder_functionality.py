@@ -154,6 +154,10 @@ class TestTrailRecorderFunctionality:
         
         # Reload configuration
         isolated_config.load_all_configurations()
+
+        # Template-level settings do not override system settings; enable debug mode explicitly
+        isolated_config.data["settings"]["system"]["debug"]["mode"] = True
+        isolated_config.refresh_settings()
         
         # Test cog execution and trail
         cog = Cog("TrailTestCog")
@@ -100,4 +100,108 @@ def test_config_resolve_class(isolated_config: Config):
     
     # Test error when no path and no default
     with pytest.raises(ValueError, match="No class path provided"):
-        Config.resolve_class('', context='test no default') 
\ No newline at end of file
+        Config.resolve_class('', context='test no default') 
+
+def test_settings_snapshot_is_shared_frozen_and_swapped_on_reload(isolated_config: Config):  # noqa: D103
+    import dataclasses
+
+    cfg = isolated_config
+    snapshot = cfg.settings
+    assert cfg.settings is snapshot
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.system.debug.mode = True
+
+    # Raw data edits do not leak into the snapshot until it is refreshed
+    cfg.data["settings"]["system"]["debug"]["mode"] = not snapshot.system.debug.mode
+    assert cfg.settings is snapshot
+
+    cfg.load_all_configurations()
+    assert cfg.settings is not snapshot
+    assert cfg.settings.system.debug.mode == snapshot.system.debug.mode
+
+
+def test_static_persona_markdown_is_memoized_until_reload(isolated_config: Config, monkeypatch):  # noqa: D103
+    from agentforge.utils.prompt_processor import PromptProcessor
+
+    cfg = isolated_config
+    calls = []
+    original = PromptProcessor.build_persona_markdown
+
+    def counting(self, static_content, persona_settings):
+        calls.append(persona_settings.static_char_cap)
+        return original(self, static_content, persona_settings)
+
+    monkeypatch.setattr(PromptProcessor, "build_persona_markdown", counting)
+
+    first = cfg.static_persona_markdown(cog_name="example_cog_with_persona_memory")
+    assert first and cfg.static_persona_markdown(cog_name="example_cog_with_persona_memory") is first
+    assert len(calls) == 1
+
+    # A changed character cap is a different cache entry once the settings are reloaded
+    cfg.data["settings"]["system"]["persona"]["static_char_cap"] = 20
+    cfg.refresh_settings()
+    capped = cfg.static_persona_markdown(cog_name="example_cog_with_persona_memory")
+    assert capped == first[:20] + "..."
+    assert calls == [8000, 20]
+
+    cfg.data["settings"]["system"]["persona"]["enabled"] = False
+    cfg.refresh_settings()
+    assert cfg.static_persona_markdown(cog_name="example_cog_with_persona_memory") is None
+
+
+def test_static_persona_markdown_follows_the_cog_persona(isolated_config: Config):  # noqa: D103
+    cfg = isolated_config
+    cfg.data["personas"]["pirate"] = {"static": {"name": "Captain Test"}}
+    cfg.data["cogs"]["pirate_cog"] = {"cog": {"persona": "pirate", "agents": [], "flow": {}}}
+
+    assert "Captain Test" in cfg.static_persona_markdown(cog_name="pirate_cog")
+    assert "Captain Test" not in cfg.static_persona_markdown(cog_name="example_cog_with_persona_memory")
+
+
+def test_find_config_uses_index_and_reports_duplicates(isolated_config: Config):  # noqa: D103
+    cfg = isolated_config
+    prompts_dir = Path(cfg.config_path) / "prompts"
+    (prompts_dir / "zz_nested").mkdir()
+    (prompts_dir / "zz_nested" / "cog_analyze_agent.yaml").write_text("prompts:\n  user: shadowed\n")
+    (prompts_dir / "zz_nested" / "indexed_only.yaml").write_text("prompts:\n  user: nested\n")
+
+    cfg.load_all_configurations()
+
+    assert ("prompts", "indexed_only") in cfg._config_index
+    assert cfg.find_config("prompts", "indexed_only")["prompts"]["user"] == "nested"
+    # The file walked first (sorted order) wins and the clash is recorded
+    assert cfg.find_config("prompts", "cog_analyze_agent")["prompts"]["user"] != "shadowed"
+    assert [(c, n) for c, n, _, _ in cfg.duplicate_configs] == [("prompts", "cog_analyze_agent")]
+
+    # Keys that are not files still resolve through the nested search
+    cfg.data["prompts"]["runtime_only"] = {"prompts": {"user": "x"}}
+    assert cfg.find_config("prompts", "runtime_only")["prompts"]["user"] == "x"
+
+
+def test_config_snapshot_reparses_only_changed_files(monkeypatch, tmp_path, isolated_config: Config):  # noqa: D103
+    snapshot = tmp_path / "snapshot.pickle"
+    monkeypatch.setenv("AGENTFORGE_CONFIG_SNAPSHOT", str(snapshot))
+    parsed = []
+    original = Config.load_yaml_file
+
+    def counting_load(file_path):
+        parsed.append(Path(file_path).name)
+        return original(file_path)
+
+    monkeypatch.setattr(Config, "load_yaml_file", staticmethod(counting_load))
+    # Load from the isolated copy so the system.yaml edit below leaves the repo settings alone
+    monkeypatch.setattr(Config, "find_project_root", lambda self, root_path=None: tmp_path)
+
+    cfg = Config.reset(root_path=str(tmp_path))
+    assert snapshot.exists()
+    assert "system.yaml" in parsed
+
+    parsed.clear()
+    system_yaml = Path(cfg.config_path) / "settings" / "system.yaml"
+    system_yaml.write_text(system_yaml.read_text().replace("on_the_fly: true", "on_the_fly: false"))
+    cfg.load_all_configurations()
+
+    assert parsed == ["system.yaml"]
+    assert cfg.settings.system.misc.on_the_fly is False
+    assert cfg.find_config("prompts", "cog_analyze_agent")
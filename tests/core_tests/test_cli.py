@@ -0,0 +1,128 @@
+import builtins
+import json
+import sqlite3
+import time
+
+import pytest
+
+from agentforge import cli
+from agentforge.storage.chroma_recover import HNSW_INDEX_FILES, inspect_storage
+
+# The test bootstrap replaces print with a no-op and keeps the original here
+_PRINT = getattr(builtins, "__orig_print", builtins.print)
+
+
+@pytest.fixture(autouse=True)
+def _cli_output(monkeypatch):
+    # conftest silences print; the CLI's output is what these tests check
+    monkeypatch.setattr(builtins, "print", _PRINT)
+
+
+def test_run_prints_result_and_per_agent_timings(isolated_config, capsys):
+    assert cli.main(["--root", str(isolated_config.project_root), "run", "example_cog",
+                     "-i", "user_input=hello", "--json"]) == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert set(report["timings"]) == {"config_load", "cog_build", "run"}
+    assert report["agents"]["analysis"]["calls"] >= 1
+
+
+def test_bench_reports_latency_over_jsonl_inputs(isolated_config, tmp_path, capsys):
+    inputs = tmp_path / "inputs.jsonl"
+    inputs.write_text('{"user_input": "a"}\n\n{"user_input": "b"}\n{"user_input": "c"}\n')
+
+    assert cli.main(["bench", "example_cog", "--inputs", str(inputs), "--concurrency", "2", "--json"]) == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["runs"] == 3 and report["errors"] == 0
+    assert report["concurrency"] == 2
+    assert report["latency_s"]["p50"] <= report["latency_s"]["max"]
+
+
+def test_profile_prints_agent_breakdown_and_writes_stats(isolated_config, tmp_path, capsys):
+    output = tmp_path / "run.prof"
+    assert cli.main(["profile", "example_cog", "-i", "user_input=hi", "--limit", "5", "--output", str(output)]) == 0
+
+    out = capsys.readouterr().out
+    assert "Per-agent timing:" in out and "analysis" in out
+    assert output.exists()
+
+
+def test_warm_builds_cog_models_and_embeddings(isolated_config, fake_chroma):
+    steps = cli.warm(["example_cog"], ["extra_store"])
+
+    names = [s["step"] for s in steps]
+    assert names[0] == "cog:example_cog"
+    assert any(name.startswith("model:analysis:") for name in names)
+    assert "embeddings:extra_store" in names
+    assert all(s["error"] is None for s in steps)
+
+
+def test_parse_inputs_reads_json_values():
+    assert cli._parse_inputs(["n=3", "flag=true", "text=hello world"]) == {"n": 3, "flag": True, "text": "hello world"}
+    with pytest.raises(ValueError):
+        cli._parse_inputs(["missing-separator"])
+
+
+def _make_chroma_db(db_path, collections):
+    db_path.mkdir(parents=True)
+    conn = sqlite3.connect(db_path / "chroma.sqlite3")
+    conn.executescript("""
+        CREATE TABLE collections (id TEXT, name TEXT);
+        CREATE TABLE segments (id TEXT, collection TEXT, scope TEXT);
+        CREATE TABLE embeddings (id INTEGER, segment_id TEXT, embedding_id TEXT);
+    """)
+    for name, records, index_files in collections:
+        conn.execute("INSERT INTO collections VALUES (?, ?)", (f"c-{name}", name))
+        conn.execute("INSERT INTO segments VALUES (?, ?, 'METADATA')", (f"m-{name}", f"c-{name}"))
+        conn.execute("INSERT INTO segments VALUES (?, ?, 'VECTOR')", (f"v-{name}", f"c-{name}"))
+        for i in range(records):
+            conn.execute("INSERT INTO embeddings VALUES (?, ?, ?)", (i, f"m-{name}", str(i)))
+        if index_files:
+            (db_path / f"v-{name}").mkdir()
+            for filename in index_files:
+                (db_path / f"v-{name}" / filename).write_bytes(b"x" * 10)
+    conn.commit()
+    conn.close()
+
+
+def test_inspect_storage_reports_sizes_and_index_health(tmp_path):
+    _make_chroma_db(tmp_path / "db", [
+        ("healthy", 3, HNSW_INDEX_FILES),
+        ("fresh", 2, ()),
+        ("broken", 5, HNSW_INDEX_FILES[:1]),
+        ("blank", 0, ()),
+    ])
+
+    report = {c["collection"]: c for c in inspect_storage(str(tmp_path / "db"))}
+    assert report["healthy"]["records"] == 3
+    assert report["healthy"]["index_bytes"] == 10 * len(HNSW_INDEX_FILES)
+    assert {name: c["status"] for name, c in report.items()} == {
+        "healthy": "ok", "fresh": "unflushed", "broken": "incomplete_index", "blank": "empty",
+    }
+    assert inspect_storage(str(tmp_path / "missing")) == []
+
+
+def test_storage_stats_discovers_storages_under_persist_directory(isolated_config, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(isolated_config, "project_root", tmp_path)
+    persist = tmp_path / isolated_config.settings.storage["options"]["persist_directory"]
+    _make_chroma_db(persist / "default", [("memories", 4, HNSW_INDEX_FILES)])
+
+    assert cli.main(["storage", "stats", "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert [s["storage_id"] for s in report] == ["default"]
+    assert report[0]["collections"][0]["records"] == 4
+
+
+def test_storage_compact_removes_expired_superseded_facts(isolated_config, fake_chroma, capsys):
+    storage = fake_chroma.get_or_create("default")
+    storage.save_to_storage("persona_facts", data=["old", "recent", "active"], ids=["1", "2", "3"], metadata=[
+        {"superseded": True, "superseded_at": time.time() - 10 * 86400},
+        {"superseded": True, "superseded_at": time.time()},
+        {"superseded": False},
+    ])
+
+    assert cli.main(["storage", "compact", "persona_facts", "--retention-days", "7"]) == 0
+
+    assert "Removed 1 superseded fact(s)" in capsys.readouterr().out
+    assert sorted(storage.load_collection("persona_facts")["ids"]) == ["2", "3"]
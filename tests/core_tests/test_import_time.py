@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[2] / "src"
+
+HEAVY_MODULES = (
+    "chromadb",
+    "openai",
+    "anthropic",
+    "groq",
+    "google.generativeai",
+    "spacy",
+    "sentence_transformers",
+    "tiktoken",
+)
+
+# Generous ceiling for importing the package: well above a cold import on a slow machine, far below
+# what pulling in any of the heavy modules costs.
+IMPORT_BUDGET_SECONDS = 3.0
+
+_PROBE = (
+    "import json, sys\n"
+    "import agentforge.agent, agentforge.cog\n"
+    "import agentforge.tools.triple_extract, agentforge.tools.intelligent_chunk\n"
+    f"heavy = sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)\n"
+    "print(json.dumps({'heavy': heavy}))\n"
+)
+
+
+def _run_probe(tmp_path):
+    env = dict(os.environ, PYTHONPATH=str(SRC_PATH))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["import_seconds"] = _top_level_import_seconds(result.stderr)
+    return report
+
+
+def _top_level_import_seconds(importtime_output):
+    """Sum the cumulative time of top-level imports in ``-X importtime`` output."""
+    total_us = 0
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1_000_000
+
+
+def test_importing_agent_cog_and_tools_does_not_load_heavy_dependencies(tmp_path):
+    report = _run_probe(tmp_path)
+    assert report["heavy"] == []
+
+
+def test_importing_agent_cog_and_tools_stays_within_budget(tmp_path):
+    report = _run_probe(tmp_path)
+    assert 0 < report["import_seconds"] < IMPORT_BUDGET_SECONDS
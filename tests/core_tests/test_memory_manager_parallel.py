@@ -0,0 +1,169 @@
+"""Tests for concurrent memory queries in MemoryManager.query_before."""
+
+import threading
+import time
+
+import pytest
+
+from agentforge.core.config_manager import ConfigManager
+from agentforge.core.memory_manager import MemoryManager
+
+
+class _ScriptedNode:
+    """Memory node stand-in whose query blocks until released, meets a barrier or sleeps for a delay."""
+
+    def __init__(self, result, delay=0.0, gate=None, error=None, barrier=None):
+        self.result = result
+        self.delay = delay
+        self.gate = gate
+        self.barrier = barrier
+        self.error = error
+        self.store = {}
+        self.collection_name = "scripted"
+        self.threads = []
+
+    def query_memory(self, query_keys, _ctx, _state):
+        self.threads.append(threading.current_thread().name)
+        self.store = {}
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.barrier is not None:
+            # Raises BrokenBarrierError unless every node's query is running at the same time
+            self.barrier.wait(5)
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        self.store = dict(self.result)
+
+
+def _manager(nodes, concurrency=4, **node_settings):
+    raw = {
+        "cog": {
+            "name": "ParallelCog",
+            "agents": [{"id": "reader", "template_file": "cog_analyze_agent"}],
+            "memory": [
+                {"id": mem_id, "query_before": "reader", **node_settings.get(mem_id, {})}
+                for mem_id in nodes
+            ],
+            "memory_query_concurrency": concurrency,
+            "flow": {"start": "reader", "transitions": {"reader": {"end": True}}},
+        }
+    }
+    manager = MemoryManager(ConfigManager().build_cog_config(raw), "ParallelCog")
+    for mem_id, node in nodes.items():
+        manager.memory_nodes[mem_id]["instance"] = node
+    return manager
+
+
+def test_independent_nodes_are_queried_concurrently(isolated_config, fake_chroma):
+    barrier = threading.Barrier(2)
+    nodes = {"facts": _ScriptedNode({"readable": "f"}, barrier=barrier),
+             "notes": _ScriptedNode({"readable": "n"}, barrier=barrier)}
+    manager = _manager(nodes)
+
+    manager.query_before("reader", {"user_input": "hi"}, {})
+
+    assert not barrier.broken
+    assert nodes["facts"].store == {"readable": "f"} and nodes["notes"].store == {"readable": "n"}
+    assert {o["status"] for o in manager.last_query_report.values()} == {"ok"}
+    assert all(name.startswith("agentforge-memory") for node in nodes.values() for name in node.threads)
+
+
+def test_single_node_without_timeout_runs_inline(isolated_config, fake_chroma):
+    node = _ScriptedNode({"readable": "x"})
+    manager = _manager({"only": node})
+
+    manager.query_before("reader", {}, {})
+
+    assert node.threads == [threading.current_thread().name]
+    assert manager._query_executor is None
+    assert manager.last_query_report["only"]["found"] is True
+
+
+def test_skip_policy_continues_with_empty_store(isolated_config, fake_chroma):
+    gate = threading.Event()
+    slow = _ScriptedNode({"readable": "late"}, gate=gate)
+    fast = _ScriptedNode({"readable": "fast"})
+    manager = _manager({"slow": slow, "fast": fast},
+                       slow={"query_timeout": 0.05, "on_timeout": "skip"})
+    try:
+        start = time.perf_counter()
+        manager.query_before("reader", {}, {})
+        assert time.perf_counter() - start < 1
+
+        assert slow.store == {}
+        assert fast.store == {"readable": "fast"}
+        assert manager.last_query_report["slow"]["status"] == "skipped"
+
+        # The abandoned query is still running, so the next turn does not start a second one
+        manager.query_before("reader", {}, {})
+        assert len(slow.threads) == 1
+        assert manager.last_query_report["slow"]["status"] == "skipped"
+
+        # Once it finishes, its late result is dropped instead of replacing the skipped store
+        gate.set()
+        assert manager._pending_queries["slow"].result(5)["status"] == "abandoned"
+        assert slow.store == {}
+    finally:
+        gate.set()
+
+
+def test_cached_policy_reuses_last_store(isolated_config, fake_chroma):
+    node = _ScriptedNode({"readable": "first"})
+    manager = _manager({"facts": node}, facts={"query_timeout": 0.05, "on_timeout": "cached"})
+    manager.query_before("reader", {}, {})
+    assert manager.last_query_report["facts"]["status"] == "ok"
+
+    gate = threading.Event()
+    node.gate, node.result = gate, {"readable": "second"}
+    try:
+        manager.query_before("reader", {}, {})
+        assert node.store == {"readable": "first"}
+        report = manager.last_query_report["facts"]
+        assert (report["status"], report["found"]) == ("cached", True)
+
+        # The agent may change the store it was given without touching the cached copy
+        node.store["readable"] = "edited by agent"
+        assert manager._last_stores["facts"] == {"readable": "first"}
+
+        gate.set()
+        manager._pending_queries["facts"].result(5)
+        assert node.store == {"readable": "edited by agent"}
+    finally:
+        gate.set()
+
+
+def test_only_cached_nodes_keep_a_store_snapshot(isolated_config, fake_chroma):
+    nodes = {"cached": _ScriptedNode({"readable": "c"}), "skipped": _ScriptedNode({"readable": "s"}),
+             "plain": _ScriptedNode({"readable": "p"})}
+    manager = _manager(nodes, cached={"query_timeout": 1, "on_timeout": "cached"},
+                       skipped={"query_timeout": 1, "on_timeout": "skip"})
+
+    manager.query_before("reader", {}, {})
+
+    assert manager._last_stores == {"cached": {"readable": "c"}}
+
+
+def test_wait_policy_waits_past_the_timeout(isolated_config, fake_chroma):
+    node = _ScriptedNode({"readable": "slow"}, delay=0.15)
+    manager = _manager({"facts": node}, facts={"query_timeout": 0.02})
+
+    manager.query_before("reader", {}, {})
+
+    assert node.store == {"readable": "slow"}
+    assert manager.last_query_report["facts"]["status"] == "slow"
+
+
+def test_node_error_is_raised_after_other_nodes_finish(isolated_config, fake_chroma):
+    broken = _ScriptedNode({}, error=RuntimeError("storage down"))
+    ok = _ScriptedNode({"readable": "ok"}, delay=0.1)
+    manager = _manager({"broken": broken, "ok": ok})
+
+    with pytest.raises(RuntimeError, match="storage down"):
+        manager.query_before("reader", {}, {})
+    assert ok.store == {"readable": "ok"}
+
+
+def test_invalid_timeout_policy_is_rejected(isolated_config, fake_chroma):
+    with pytest.raises(ValueError, match="on_timeout"):
+        _manager({"facts": _ScriptedNode({})}, facts={"on_timeout": "retry"})
@@ -0,0 +1,134 @@
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from agentforge import metrics
+from agentforge.apis.base_api import BaseModel
+from agentforge.core.agent_runner import AGENT_ATTEMPTS, AGENT_RUN_SECONDS
+from agentforge.metrics import MetricsRegistry
+from agentforge.utils.token_accounting import TokenAccountant
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    TokenAccountant.reset()
+    yield
+    metrics.reset()
+    TokenAccountant.reset()
+
+
+class _FlakyModel(BaseModel):
+    def __init__(self):
+        super().__init__("metrics-model", base_backoff=0)
+        self.calls = 0
+        self.logger = SimpleNamespace(
+            log_prompt=lambda *args, **kwargs: None,
+            log_response=lambda *args, **kwargs: None,
+            warning=lambda *args, **kwargs: None,
+            critical=lambda *args, **kwargs: None,
+        )
+
+    def _init_logger(self, model_prompt, params):
+        params.pop("agent_name", None)
+
+    def _do_api_call(self, prompt, **filtered_params):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("transient")
+        return "hello"
+
+
+def test_counter_gauge_and_histogram_track_labelled_values():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    in_flight = registry.gauge("in_flight", "In flight.")
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    with in_flight.track_in_progress():
+        assert in_flight.value() == 1
+    for value in (0.05, 0.05, 0.5, 5):
+        latency.observe(value, route="/a")
+
+    assert requests.value(route="/a") == 3
+    assert in_flight.value() == 0
+    assert latency.count(route="/a") == 4
+    assert latency.percentile(50, route="/a") == 0.1
+    assert latency.percentile(99, route="/a") == float("inf")
+    assert registry.counter("requests_total", "Requests.", ("route",)) is requests
+
+    with pytest.raises(ValueError):
+        requests.inc(path="/a")
+    with pytest.raises(ValueError):
+        requests.inc(-1, route="/a")
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "Clash.", ("route",))
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs run.", ("queue",)).inc(queue='a"b')
+    registry.histogram("job_seconds", "Job time.", buckets=(1,)).observe(0.5)
+    registry.gauge("idle", "Never set.")
+
+    assert registry.render_prometheus() == (
+        '# HELP jobs_total Jobs run.\n'
+        '# TYPE jobs_total counter\n'
+        'jobs_total{queue="a\\"b"} 1\n'
+        '# HELP job_seconds Job time.\n'
+        '# TYPE job_seconds histogram\n'
+        'job_seconds_bucket{le="1"} 1\n'
+        'job_seconds_bucket{le="+Inf"} 1\n'
+        'job_seconds_sum 0.5\n'
+        'job_seconds_count 1\n'
+    )
+
+
+def test_http_server_serves_the_registry():
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits.").inc()
+    server = metrics.start_http_server(port=0, registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "hits_total 1" in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_model_generation_records_latency_retries_and_outcome():
+    assert _FlakyModel().generate({"system": "s", "user": "u"}, agent_name="MetricsAgent") == "hello"
+
+    snapshot = metrics.snapshot()
+    model = {"model": "metrics-model"}
+    assert snapshot["agentforge_model_retries_total"]["samples"] == [{"labels": model, "value": 1}]
+    assert snapshot["agentforge_model_request_seconds"]["samples"][0]["count"] == 2
+    assert snapshot["agentforge_model_generations_in_flight"]["samples"] == [{"labels": model, "value": 0}]
+    assert {"labels": {**model, "outcome": "ok"}, "value": 1} in snapshot["agentforge_model_generations_total"]["samples"]
+
+    # Token usage comes from TokenAccountant at read time
+    tokens = snapshot["agentforge_model_tokens_total"]["samples"]
+    assert {s["labels"]["kind"] for s in tokens if s["labels"]["model"] == "metrics-model"} == {"prompt", "completion"}
+
+
+def test_cog_run_records_agent_attempts(example_cog):
+    example_cog.run(user_input="hello")
+
+    assert AGENT_ATTEMPTS.value(agent="analysis", outcome="ok") >= 1
+    assert AGENT_RUN_SECONDS.count(agent="analysis") == AGENT_ATTEMPTS.value(agent="analysis", outcome="ok")
+
+
+def test_histogram_timer_works_as_a_decorator():
+    latency = MetricsRegistry().histogram("op_seconds", "Op.", ("op",))
+
+    @latency.time(op="work")
+    def work(x):
+        return x * 2
+
+    assert [work(i) for i in range(3)] == [0, 2, 4]
+    assert latency.count(op="work") == 3
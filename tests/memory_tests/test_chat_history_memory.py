@@ -0,0 +1,150 @@
+"""
+Tests for the in-process recency buffer and session partitioning of ChatHistoryMemory.
+"""
+
+import pytest
+from unittest.mock import Mock
+from agentforge.storage.chat_history_memory import ChatHistoryMemory
+
+
+class TestChatHistoryRecencyBuffer:
+    """Test suite for serving recent chat turns from the ring buffer."""
+
+    @pytest.fixture
+    def chat(self, isolated_config, fake_chroma):
+        """Create a ChatHistoryMemory with two turns already in storage and a spy on tail reads."""
+        fake_chroma.clear_registry()
+        ChatHistoryMemory._recent_registry.clear()
+        memory = ChatHistoryMemory(cog_name="test_cog")
+        memory.storage.save_to_storage(
+            memory.collection_name,
+            data=["hi", "hello", "how are you", "fine"],
+            ids=["1", "2", "3", "4"],
+            metadata=[{"role": r, "turn_id": t} for r, t in
+                      (("user", "a"), ("assistant", "a"), ("user", "b"), ("assistant", "b"))]
+        )
+        memory.storage.get_last_x_entries = Mock(wraps=memory.storage.get_last_x_entries)
+        return memory
+
+    def _history(self, memory, num_results=20):
+        memory.query_memory(num_results=num_results, max_retrieval=0)
+        return [next(iter(turn.values()))[0] for turn in memory.store["history"]]
+
+    def test_recency_reads_are_served_from_the_buffer(self, chat):
+        """Storage is read once to warm the buffer; later turns come from update_memory."""
+        assert self._history(chat) == ["hi", "hello", "how are you", "fine"]
+
+        chat.update_memory({"user_input": "bye"}, {"response": "see you"})
+        history = self._history(chat, num_results=3)
+
+        assert chat.storage.get_last_x_entries.call_count == 1
+        assert history[0] == "fine" and "bye" in history[1] and "see you" in history[2]
+        stored = chat.storage.load_collection(chat.collection_name, ids=["5", "6"])
+        assert [m["id"] for m in stored["metadatas"]] == [5, 6]
+
+    def test_instances_share_the_buffer(self, chat):
+        """A second node on the same collection sees turns recorded by the first without a reload."""
+        self._history(chat)
+        other = ChatHistoryMemory(cog_name="test_cog")
+        other.update_memory({"user_input": "from other"}, {"response": "ok"})
+
+        assert "from other" in self._history(chat)[-2]
+        assert chat.storage.get_last_x_entries.call_count == 1
+
+    def test_writes_from_another_process_are_detected(self, chat):
+        """A record appended directly to storage (as another process would) triggers a reload."""
+        self._history(chat)
+        chat.storage.save_to_storage(chat.collection_name, data=["external"], ids=["5"],
+                                     metadata=[{"role": "user", "turn_id": "c"}])
+
+        assert self._history(chat)[-1] == "external"
+        assert chat.storage.get_last_x_entries.call_count == 2
+
+    def test_deletions_invalidate_the_buffer(self, chat):
+        """Deleting through the node or directly in storage drops the deleted records."""
+        self._history(chat)
+        chat.delete(["4"])
+        assert self._history(chat) == ["hi", "hello", "how are you"]
+
+        chat.storage.delete_from_storage(chat.collection_name, ["3"])
+        assert self._history(chat) == ["hi", "hello"]
+
+    def test_requests_beyond_the_buffer_fall_back_to_storage(self, chat, monkeypatch):
+        """Asking for more records than the buffer holds reloads a larger window; 0 returns everything."""
+        monkeypatch.setattr(ChatHistoryMemory, "RECENT_TURNS_CAPACITY", 2)
+        assert self._history(chat, num_results=2) == ["how are you", "fine"]
+        assert self._history(chat, num_results=0) == ["hi", "hello", "how are you", "fine"]
+        assert self._history(chat, num_results=3) == ["hello", "how are you", "fine"]
+        assert chat.storage.get_last_x_entries.call_count == 2
+
+
+class TestChatHistorySessions:
+    """Test suite for session_id / user_id partitioning of chat history."""
+
+    @pytest.fixture
+    def chat(self, isolated_config, fake_chroma):
+        fake_chroma.clear_registry()
+        ChatHistoryMemory._recent_registry.clear()
+        return ChatHistoryMemory(cog_name="test_cog")
+
+    def _history(self, memory, ctx, num_results=20):
+        memory.query_memory(num_results=num_results, max_retrieval=0, _ctx=ctx)
+        return [next(iter(turn.values()))[0] for turn in memory.store["history"]]
+
+    def test_sessions_do_not_share_history(self, chat):
+        """Turns recorded for one user are invisible to another user and to the unscoped history."""
+        chat.update_memory({"user_input": "alice here", "user_id": "alice"}, {"response": "hi alice"})
+        chat.update_memory({"user_input": "bob here", "user_id": "bob"}, {"response": "hi bob"})
+
+        alice = self._history(chat, {"user_id": "alice"})
+        assert len(alice) == 2 and "alice here" in alice[0]
+        assert "bob here" in self._history(chat, {"user_id": "bob"})[0]
+        assert self._history(chat, {}) == []
+
+    def test_session_collections_are_stable_and_scoped(self, chat):
+        """Each session key maps to its own collection with per-session sequential ids."""
+        name = chat.session_collection_name(user_id="alice", session_id="x" * 200)
+        assert name == chat.session_collection_name(user_id="alice", session_id="x" * 200)
+        assert name != chat.session_collection_name(user_id="alice")
+        assert chat.session_collection_name() == chat.collection_name
+        assert len(name) < 64
+
+        chat.update_memory({"user_id": "alice", "session_id": "x" * 200}, {"response": "ok"})
+        stored = chat.storage.load_collection(name)
+        assert stored["ids"] == ["1", "2"]
+        assert stored["metadatas"][0]["user_id"] == "alice"
+
+    def test_semantic_retrieval_stays_in_the_session(self, chat):
+        """The relevant slice only searches the caller's session."""
+        for text in ("one", "two", "three"):
+            chat.update_memory({"user_input": f"alice {text}", "user_id": "alice"}, {"response": "noted"})
+        chat.update_memory({"user_input": "bob secret", "user_id": "bob"}, {"response": "noted"})
+
+        chat.query_memory(num_results=2, max_retrieval=5, _ctx={"user_id": "alice", "user_input": "secret"})
+
+        relevant = [next(iter(turn.values()))[0] for turn in chat.store["relevant"]]
+        assert relevant and not any("bob" in text for text in relevant)
+
+    def test_deletes_are_scoped_to_the_session(self, chat):
+        """Deleting with a session's _ctx removes its records and leaves other sessions' buffers warm."""
+        chat.update_memory({"user_input": "alice here", "user_id": "alice"}, {"response": "hi alice"})
+        chat.update_memory({"user_input": "bob here", "user_id": "bob"}, {"response": "hi bob"})
+        bob = self._history(chat, {"user_id": "bob"})
+        chat.storage.get_last_x_entries = Mock(wraps=chat.storage.get_last_x_entries)
+
+        chat.delete(["2"], _ctx={"user_id": "alice"})
+
+        assert len(self._history(chat, {"user_id": "alice"})) == 1
+        assert self._history(chat, {"user_id": "bob"}) == bob
+        assert chat.storage.get_last_x_entries.call_count == 1
+
+    def test_resetting_buffers_leaves_similarly_named_collections_alone(self, chat):
+        """Wiping one node only resets its own buffers, not those of a collection sharing its prefix."""
+        other = ChatHistoryMemory(cog_name="test_cog", collection_id="chat_historyx")
+        other.update_memory({"user_input": "kept"}, {"response": "ok"})
+        chat.update_memory({"user_input": "dropped"}, {"response": "ok"})
+
+        chat._reset_recent()
+
+        assert other._recent_turns(other.collection_name).next_id == 3
+        assert chat._recent_turns(chat.collection_name).next_id is None
@@ -0,0 +1,110 @@
+"""
+Tests for the FactIndex exact and near-duplicate index used by PersonaMemory.
+"""
+
+import pytest
+from agentforge.storage.fact_index import FactIndex
+
+
+class TestFactIndex:
+    """Test suite for FactIndex lookups, batch filtering and the sidecar file."""
+
+    @pytest.fixture
+    def storage(self, isolated_config, fake_chroma):
+        fake_chroma.clear_registry()
+        FactIndex.clear_registry()
+        storage = fake_chroma.get_or_create("fact_index_test")
+        storage.save_to_storage("facts", data=["User prefers Python programming", "User likes jazz"])
+        return storage
+
+    def test_exact_and_near_duplicates_are_found(self, storage):
+        index = FactIndex.for_collection(storage, "facts")
+
+        assert index.find_duplicate("  user prefers python programming. ") == "exact"
+        assert index.find_duplicate("The user prefers Python programming") == "near"
+        assert index.find_duplicate("User likes rock") is None
+
+    def test_negated_facts_are_not_near_duplicates(self, storage):
+        storage.save_to_storage("facts", data=["User is vegetarian"])
+        index = FactIndex.for_collection(storage, "facts")
+
+        assert index.find_duplicate("User is not vegetarian") is None
+
+    def test_filter_new_checks_a_batch_in_one_pass(self, storage):
+        index = FactIndex.for_collection(storage, "facts")
+
+        accepted = index.filter_new([
+            "User likes jazz",
+            "User owns a kayak",
+            "User owns a kayak!",
+            "The user owns a kayak",
+            "User works remotely",
+        ])
+
+        assert accepted == ["User owns a kayak", "User works remotely"]
+
+    def test_external_writes_trigger_a_rebuild(self, storage):
+        index = FactIndex.for_collection(storage, "facts")
+        assert index.find_duplicate("User owns a kayak") is None
+
+        storage.save_to_storage("facts", data=["User owns a kayak"])
+
+        assert index.find_duplicate("User owns a kayak") == "exact"
+
+    def test_sidecar_is_written_and_reloaded(self, storage, tmp_path):
+        storage.db_path = str(tmp_path)
+        index = FactIndex.for_collection(storage, "facts")
+        index.sync()
+        storage.save_to_storage("facts", data=["User owns a kayak"])
+        index.add(["User owns a kayak"])
+        assert (tmp_path / "fact_index" / "facts.json").exists()
+
+        # A fresh index loads the sidecar and does not need to read the collection again
+        storage.load_collection = None
+        FactIndex.clear_registry()
+        reloaded = FactIndex.for_collection(storage, "facts")
+        assert reloaded.find_duplicate("User owns a kayak") == "exact"
+        assert reloaded.find_duplicate("User likes jazz") == "exact"
+
+    def test_updates_are_appended_and_compacted(self, storage, tmp_path, monkeypatch):
+        monkeypatch.setattr(FactIndex, "COMPACT_EVERY", 4)
+        storage.db_path = str(tmp_path)
+        snapshot, log = tmp_path / "fact_index" / "facts.json", tmp_path / "fact_index" / "facts.log"
+        index = FactIndex.for_collection(storage, "facts")
+        index.sync()
+        written = snapshot.read_text()
+
+        storage.save_to_storage("facts", data=["User owns a kayak", "User works remotely"])
+        index.add(["User owns a kayak", "User works remotely"])
+        storage.delete_from_storage("facts", ["2"])
+        index.remove(["User likes jazz"])
+
+        # Each update appended to the log instead of rewriting the snapshot
+        assert snapshot.read_text() == written
+        assert len(log.read_text().splitlines()) == 3
+
+        # A torn last line from an interrupted append is ignored
+        with log.open("a") as fh:
+            fh.write('{"add": "trunc')
+        FactIndex.clear_registry()
+        reloaded = FactIndex.for_collection(storage, "facts")
+        storage.load_collection = None
+        assert reloaded.find_duplicate("User works remotely") == "exact"
+        assert reloaded.find_duplicate("User likes jazz") is None
+        assert not log.exists()
+
+        storage.save_to_storage("facts", data=["User drinks tea", "User reads novels", "User plays chess", "User bakes"])
+        reloaded.add(["User drinks tea", "User reads novels"])
+        assert len(log.read_text().splitlines()) == 2
+        reloaded.add(["User plays chess", "User bakes"])
+        assert not log.exists() and snapshot.read_text() != written
+
+    def test_removed_facts_are_forgotten(self, storage):
+        index = FactIndex.for_collection(storage, "facts")
+        index.sync()
+
+        storage.delete_from_storage("facts", ["2"])
+        index.remove(["User likes jazz"])
+
+        assert index.find_duplicate("User likes jazz") is None
+        assert index.find_duplicate("User prefers Python programming") == "exact"
@@ -160,4 +160,13 @@ class TestPersonaMemoryAgentInterface:
                 assert "user_input" in str(ctx_content), f"{agent_name} _ctx should contain user input"
                 assert "insights" in str(ctx_content), f"{agent_name} _ctx should contain insights"
                 user_input_count = str(ctx_content).count("What are my preferences?")
-                assert user_input_count == 1, f"{agent_name} _ctx should have no duplicated content" 
\ No newline at end of file
+                assert user_input_count == 1, f"{agent_name} _ctx should have no duplicated content" 
+
+
+def test_static_persona_follows_the_cog_persona(isolated_config, fake_chroma):
+    """The static persona comes from the cog's own persona setting, not only the system default."""
+    isolated_config.data["personas"]["pirate"] = {"static": {"name": "Captain Test"}}
+    isolated_config.data["cogs"]["pirate_cog"] = {"cog": {"persona": "pirate", "agents": [], "flow": {}}}
+
+    assert "Captain Test" in PersonaMemory(cog_name="pirate_cog")._get_static_persona_markdown()
+    assert "Captain Test" not in PersonaMemory(cog_name="test_cog")._get_static_persona_markdown()
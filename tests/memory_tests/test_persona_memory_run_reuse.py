@@ -0,0 +1,92 @@
+"""
+Tests for PersonaMemory reusing its query-phase retrieval in update_memory within a cog run.
+"""
+
+import pytest
+from unittest.mock import Mock
+from agentforge.storage.persona_memory import PersonaMemory
+from agentforge.utils.token_accounting import TokenAccountant
+
+
+class TestPersonaMemoryRunReuse:
+    """Test suite for the per-run retrieval cache in PersonaMemory."""
+
+    @pytest.fixture
+    def persona_memory(self, isolated_config, fake_chroma):
+        """Create a PersonaMemory instance with mocked agents and a few stored facts."""
+        fake_chroma.clear_registry()
+        memory = PersonaMemory(cog_name="test_cog", persona="TestPersona")
+        memory.retrieval_agent = Mock()
+        memory.narrative_agent = Mock()
+        memory.update_agent = Mock()
+        memory.retrieval_agent.run.return_value = {"queries": ["hobbies"]}
+        memory.narrative_agent.run.return_value = {"narrative": "Test narrative"}
+        memory.update_agent.run.return_value = {"action": "none", "new_facts": []}
+        memory.storage.save_to_storage(
+            collection_name=memory.collection_name,
+            data=["User likes hiking", "User prefers Python"],
+            ids=["1", "2"],
+            metadata=[{}, {}]
+        )
+        return memory
+
+    def test_update_reuses_query_retrieval_within_a_run(self, persona_memory):
+        """The retrieval agent runs once per turn when update keys match query keys."""
+        ctx = {"user_input": "Tell me about hiking"}
+        with TokenAccountant.track_run("persona") as run_id:
+            persona_memory.query_memory(["user_input"], ctx, {})
+            persona_memory.update_memory(["user_input"], ctx, {})
+            TokenAccountant.pop_run(run_id)
+
+        assert persona_memory.retrieval_agent.run.call_count == 1
+        update_facts = persona_memory.update_agent.run.call_args.kwargs["retrieved_facts"]
+        assert update_facts == persona_memory.store["raw_facts"]
+
+    def test_update_keys_that_surface_no_new_facts_still_reuse(self, persona_memory):
+        """Different update keys reuse the retrieval when they find nothing the query missed."""
+        with TokenAccountant.track_run("persona") as run_id:
+            persona_memory.query_memory(["user_input"], {"user_input": "hiking"}, {})
+            persona_memory.update_memory(["user_input", "reply"], {"user_input": "hiking", "reply": "Sure"}, {})
+            TokenAccountant.pop_run(run_id)
+
+        assert persona_memory.retrieval_agent.run.call_count == 1
+
+    def test_update_keys_that_surface_new_facts_retrieve_again(self, persona_memory, fake_chroma):
+        """Update keys that find facts the query phase did not see trigger a full retrieval."""
+        with TokenAccountant.track_run("persona") as run_id:
+            persona_memory.query_memory(["user_input"], {"user_input": "hiking"}, {})
+            persona_memory.storage.save_to_storage(
+                collection_name=persona_memory.collection_name,
+                data=["User owns a bicycle"], ids=["3"], metadata=[{}]
+            )
+            persona_memory.update_memory(["user_input"], {"user_input": "cycling"}, {})
+            TokenAccountant.pop_run(run_id)
+
+        assert persona_memory.retrieval_agent.run.call_count == 2
+
+    def test_nothing_is_reused_outside_a_run_or_across_runs(self, persona_memory):
+        """Direct calls and a new run always retrieve fresh."""
+        ctx = {"user_input": "hiking"}
+        persona_memory.query_memory(["user_input"], ctx, {})
+        persona_memory.update_memory(["user_input"], ctx, {})
+        assert persona_memory.retrieval_agent.run.call_count == 2
+
+        with TokenAccountant.track_run("persona") as run_id:
+            persona_memory.query_memory(["user_input"], ctx, {})
+            TokenAccountant.pop_run(run_id)
+        persona_memory.end_run(run_id)
+        assert persona_memory._turn_context is None
+
+        with TokenAccountant.track_run("persona") as run_id:
+            persona_memory.update_memory(["user_input"], ctx, {})
+            TokenAccountant.pop_run(run_id)
+        assert persona_memory.retrieval_agent.run.call_count == 4
+
+    def test_applied_update_invalidates_the_run_retrieval(self, persona_memory):
+        """Once new facts are stored, a later query in the same run starts over."""
+        persona_memory.update_agent.run.return_value = {"action": "add", "new_facts": [{"fact": "User owns a kayak"}]}
+        with TokenAccountant.track_run("persona") as run_id:
+            persona_memory.query_memory(["user_input"], {"user_input": "hiking"}, {})
+            persona_memory.update_memory(["user_input"], {"user_input": "hiking"}, {})
+            assert persona_memory._turn_context is None
+            TokenAccountant.pop_run(run_id)
@@ -0,0 +1,97 @@
+"""
+Tests for superseded-fact tracking, filtered retrieval and compaction in PersonaMemory.
+"""
+
+import time
+
+import pytest
+from unittest.mock import Mock
+from agentforge.storage.persona_memory import PersonaMemory
+
+
+class TestPersonaMemorySupersede:
+    """Test suite for marking, filtering and compacting superseded persona facts."""
+
+    @pytest.fixture
+    def persona_memory(self, isolated_config, fake_chroma):
+        """Create a PersonaMemory instance with mocked agents and two active facts."""
+        fake_chroma.clear_registry()
+        memory = PersonaMemory(cog_name="test_cog", persona="TestPersona")
+        memory.retrieval_agent = Mock()
+        memory.narrative_agent = Mock()
+        memory.update_agent = Mock()
+        memory.retrieval_agent.run.return_value = {"queries": ["music"]}
+        memory.narrative_agent.run.return_value = {"narrative": "Test narrative"}
+        memory.storage.save_to_storage(
+            collection_name=memory.collection_name,
+            data=["User likes rock music", "User lives in Berlin"],
+            ids=["fact1", "fact2"],
+            metadata=[{"type": "persona_fact", "superseded": False}] * 2
+        )
+        return memory
+
+    def _metadata(self, memory, fact_id):
+        records = memory.storage.load_collection(memory.collection_name, ids=[fact_id])
+        return records["metadatas"][0]
+
+    @pytest.mark.parametrize("supersedes", [["fact1"], ["user likes rock music."]])
+    def test_update_marks_old_facts_superseded(self, persona_memory, supersedes):
+        """Superseded entries are resolved by id or by fact text and flagged in metadata."""
+        persona_memory.update_agent.run.return_value = {
+            "action": "update",
+            "new_facts": [{"fact": "User now prefers jazz", "supersedes": supersedes}]
+        }
+
+        persona_memory.update_memory(["user_input"], {"user_input": "I'm into jazz now"}, {})
+
+        old = self._metadata(persona_memory, "fact1")
+        assert old["superseded"] is True and old["type"] == "persona_fact"
+        assert old["superseded_at"] <= time.time()
+        assert self._metadata(persona_memory, "fact2")["superseded"] is False
+        new = persona_memory.storage.load_collection(persona_memory.collection_name, where={"supersedes": "fact1"})
+        assert new["documents"] == ["User now prefers jazz"]
+
+    def test_retrieval_skips_superseded_facts(self, persona_memory):
+        """query_memory only sees facts that have not been superseded, including facts stored without the flag."""
+        persona_memory.storage.update_metadata(
+            persona_memory.collection_name, ["fact1"], [{"superseded": True, "superseded_at": time.time()}]
+        )
+        persona_memory.storage.save_to_storage(
+            collection_name=persona_memory.collection_name, data=["User plays guitar"], ids=["legacy"], metadata=[{}]
+        )
+
+        persona_memory.query_memory(["user_input"], {"user_input": "music"}, {})
+
+        assert sorted(persona_memory.store["raw_facts"]) == ["User lives in Berlin", "User plays guitar"]
+
+    def test_unknown_supersedes_entries_are_ignored(self, persona_memory):
+        """An entry that matches no stored fact leaves existing facts active."""
+        persona_memory.update_agent.run.return_value = {
+            "action": "update",
+            "new_facts": [{"fact": "User now prefers jazz", "supersedes": ["fact999"]}]
+        }
+
+        persona_memory.update_memory(["user_input"], {"user_input": "jazz"}, {})
+
+        assert self._metadata(persona_memory, "fact1")["superseded"] is False
+        assert persona_memory.storage.count_collection(persona_memory.collection_name) == 3
+
+    def test_compact_deletes_only_expired_superseded_facts(self, persona_memory):
+        """Compaction removes superseded facts past the retention window and forgets them in the index."""
+        now = time.time()
+        persona_memory.storage.save_to_storage(
+            collection_name=persona_memory.collection_name,
+            data=["User likes pop music"], ids=["fact3"], metadata=[{"superseded": False}]
+        )
+        persona_memory.storage.update_metadata(
+            persona_memory.collection_name, ["fact1", "fact3"],
+            [{"superseded": True, "superseded_at": now - 40 * 86400}, {"superseded": True, "superseded_at": now}]
+        )
+        assert persona_memory.fact_index.find_duplicate("User likes rock music") == "exact"
+
+        assert persona_memory.compact() == 1
+
+        remaining = persona_memory.storage.load_collection(persona_memory.collection_name)
+        assert sorted(remaining["ids"]) == ["fact2", "fact3"]
+        assert persona_memory.fact_index.find_duplicate("User likes rock music") is None
+        assert persona_memory.compact(retention_seconds=0) == 1
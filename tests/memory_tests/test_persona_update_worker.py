@@ -0,0 +1,137 @@
+"""
+Tests for asynchronous PersonaMemory updates through the background PersonaUpdateWorker.
+"""
+
+import threading
+
+import pytest
+from unittest.mock import Mock
+from agentforge.storage.persona_memory import PersonaMemory
+from agentforge.storage.persona_update_worker import PERSONA_UPDATES, PersonaUpdateWorker
+from agentforge.utils.token_accounting import TokenAccountant
+
+
+class TestPersonaUpdateWorker:
+    """Test suite for async_updates mode in PersonaMemory."""
+
+    @pytest.fixture
+    def async_persona_memory(self, isolated_config, fake_chroma):
+        """Create a PersonaMemory with async updates enabled and mocked agents."""
+        fake_chroma.clear_registry()
+        isolated_config.data["settings"]["system"]["persona"].update({"async_updates": True, "update_queue_size": 4})
+        isolated_config.refresh_settings()
+
+        memory = PersonaMemory(cog_name="test_cog", persona="TestPersona")
+        memory.retrieval_agent = Mock()
+        memory.narrative_agent = Mock()
+        memory.update_agent = Mock()
+        memory.retrieval_agent.run.return_value = {"queries": ["hobbies"]}
+        memory.narrative_agent.run.return_value = {"narrative": "Test narrative"}
+        memory.update_agent.run.return_value = {"action": "add", "new_facts": [{"fact": "User likes hiking"}]}
+        yield memory
+        PersonaUpdateWorker.shutdown(timeout=5)
+
+    def _stored_facts(self, memory):
+        results = memory.storage.query_storage(collection_name=memory.collection_name, query="hiking", num_results=10)
+        return results.get("documents", [])
+
+    def test_update_is_applied_in_the_background(self, async_persona_memory):
+        """update_memory returns before the update agent runs; flush waits for it."""
+        gate = threading.Event()
+        agent_threads = []
+
+        def run_update(**kwargs):
+            agent_threads.append(threading.current_thread().name)
+            gate.wait(5)
+            return {"action": "add", "new_facts": [{"fact": "User likes hiking"}]}
+
+        async_persona_memory.update_agent.run.side_effect = run_update
+        async_persona_memory.update_memory(["user_input"], {"user_input": "I went hiking"}, {})
+        assert self._stored_facts(async_persona_memory) == []
+
+        gate.set()
+        assert PersonaUpdateWorker.flush(timeout=5)
+        assert agent_threads == ["agentforge-persona-updates"]
+        assert self._stored_facts(async_persona_memory) == ["User likes hiking"]
+
+    def test_jobs_use_a_snapshot_of_the_context(self, async_persona_memory):
+        """Changes the cog makes after enqueueing do not reach the queued job."""
+        gate = threading.Event()
+        async_persona_memory.update_agent.run.side_effect = lambda **kwargs: (gate.wait(5), {"action": "none"})[1]
+        ctx = {"user_input": "first"}
+        async_persona_memory.update_memory(["user_input"], ctx, {})
+        async_persona_memory.update_memory(["user_input"], {"user_input": "second"}, {})
+        ctx["user_input"] = "changed"
+        gate.set()
+        PersonaUpdateWorker.flush(timeout=5)
+
+        seen = [call.kwargs["_ctx"]["user_input"] for call in async_persona_memory.update_agent.run.call_args_list]
+        assert "changed" not in seen
+        assert seen[-1] == "second"
+
+    def test_bursts_for_one_persona_are_coalesced(self, async_persona_memory):
+        """Jobs that queue up behind a busy worker run as one batch; exact repeats are dropped."""
+        gate = threading.Event()
+        calls = []
+
+        def run_update(**kwargs):
+            calls.append(kwargs["_ctx"]["user_input"])
+            gate.wait(5)
+            return {"action": "none"}
+
+        async_persona_memory.update_agent.run.side_effect = run_update
+        coalesced = PERSONA_UPDATES.value(result="coalesced")
+        duplicates = PERSONA_UPDATES.value(result="duplicate")
+
+        async_persona_memory.update_memory(["user_input"], {"user_input": "a"}, {})
+        for text in ("b", "c", "c"):
+            async_persona_memory.update_memory(["user_input"], {"user_input": text}, {})
+        gate.set()
+        PersonaUpdateWorker.flush(timeout=5)
+
+        assert calls == ["a", "b", "c"]
+        assert PERSONA_UPDATES.value(result="duplicate") - duplicates == 1
+        assert PERSONA_UPDATES.value(result="coalesced") - coalesced >= 1
+        # The batch reused one retrieval instead of calling the retrieval agent per job
+        assert async_persona_memory.retrieval_agent.run.call_count < len(calls)
+
+    def test_query_retrieval_travels_with_the_job(self, async_persona_memory):
+        """The run's query-phase retrieval is reused by the background update after the run ends."""
+        async_persona_memory.update_agent.run.return_value = {"action": "none"}
+        ctx = {"user_input": "hiking"}
+        with TokenAccountant.track_run("persona") as run_id:
+            async_persona_memory.query_memory(["user_input"], ctx, {})
+            async_persona_memory.update_memory(["user_input"], ctx, {})
+            TokenAccountant.pop_run(run_id)
+        async_persona_memory.end_run(run_id)
+        PersonaUpdateWorker.flush(timeout=5)
+
+        assert async_persona_memory.retrieval_agent.run.call_count == 1
+        assert async_persona_memory.update_agent.run.call_count == 1
+
+    def test_batches_do_not_share_retrieval_across_runs(self, async_persona_memory):
+        """A job from one cog run does not reuse the retrieval of a batched job from another run."""
+        gate = threading.Event()
+        async_persona_memory.update_agent.run.side_effect = lambda **kwargs: (gate.wait(5), {"action": "none"})[1]
+        async_persona_memory.update_memory(["user_input"], {"user_input": "a"}, {})
+        for text in ("b", "c"):
+            with TokenAccountant.track_run("persona") as run_id:
+                async_persona_memory.update_memory(["user_input"], {"user_input": text}, {})
+                TokenAccountant.pop_run(run_id)
+        gate.set()
+        PersonaUpdateWorker.flush(timeout=5)
+
+        assert async_persona_memory.update_agent.run.call_count == 3
+        assert async_persona_memory.retrieval_agent.run.call_count == 3
+
+    def test_errors_are_logged_and_the_worker_keeps_going(self, async_persona_memory):
+        """A failing job does not stop later jobs from running."""
+        async_persona_memory.update_agent.run.side_effect = [RuntimeError("model down"),
+                                                              {"action": "add", "new_facts": [{"fact": "User likes hiking"}]}]
+        async_persona_memory.update_memory(["user_input"], {"user_input": "one"}, {})
+        PersonaUpdateWorker.flush(timeout=5)
+        async_persona_memory.update_memory(["user_input"], {"user_input": "two"}, {})
+        PersonaUpdateWorker.flush(timeout=5)
+
+        assert self._stored_facts(async_persona_memory) == ["User likes hiking"]
+        assert PersonaUpdateWorker.pending() == 0
@@ -0,0 +1,226 @@
+"""
+Tests for the counter-backed ScratchPad log, cached reads and background consolidation.
+"""
+
+import threading
+
+import pytest
+from unittest.mock import Mock
+from agentforge.storage import scratchpad as scratchpad_module
+from agentforge.storage.scratchpad import ScratchPad
+
+
+class TestScratchPad:
+    """Test suite for ScratchPad logging and consolidation."""
+
+    @pytest.fixture
+    def make_scratchpad(self, isolated_config, fake_chroma, monkeypatch):
+        """Return a factory for ScratchPads with a low log threshold and a mocked scratchpad agent."""
+        fake_chroma.clear_registry()
+        ScratchPad.reset_state()
+        agent_class = Mock()
+        agent_class.return_value.run.return_value = "<updated_scratchpad>User likes tea</updated_scratchpad>"
+        monkeypatch.setattr(scratchpad_module, "Agent", agent_class)
+
+        def factory(background=True, **settings):
+            isolated_config.data["settings"]["system"]["scratchpad"] = {
+                "log_threshold": 4, "background_consolidation": background, **settings}
+            isolated_config.refresh_settings()
+            return ScratchPad(cog_name="test_cog", collection_id="scratchpad")
+
+        yield factory
+        ScratchPad.flush(timeout=5)
+        ScratchPad.reset_state()
+
+    def _log_ids(self, pad):
+        return sorted(pad.storage.load_collection(pad.log_collection_name)["ids"], key=int)
+
+    def test_log_appends_do_not_read_the_log(self, make_scratchpad):
+        """The log is read once to seed the counters; later appends write both entries in one call."""
+        pad = make_scratchpad()
+        pad.storage.save_to_storage(pad.log_collection_name, data=["old entry"], ids=["7"])
+        load_collection = Mock(wraps=pad.storage.load_collection)
+        save_to_storage = Mock(wraps=pad.storage.save_to_storage)
+        pad.storage.load_collection = load_collection
+        pad.storage.save_to_storage = save_to_storage
+
+        pad.update_memory(None, {"user_input": "hi"}, {"step": 1})
+        assert load_collection.call_count == 1
+        assert save_to_storage.call_args.kwargs["ids"] == ["8", "9"]
+        assert pad._state.pending == 3
+        assert load_collection.call_count == 1
+
+    def test_consolidation_runs_in_the_background(self, make_scratchpad):
+        """Reaching the threshold schedules consolidation; the cached scratchpad is served afterwards."""
+        pad = make_scratchpad()
+        gate = threading.Event()
+        agent = scratchpad_module.Agent.return_value
+        agent.run.side_effect = lambda **kwargs: (gate.wait(5), "<updated_scratchpad>User likes tea</updated_scratchpad>")[1]
+
+        pad.update_memory(None, {"user_input": "I like tea"}, {"step": 1})
+        pad.update_memory(None, {"user_input": "Green tea"}, {"step": 2})
+        assert pad.storage.count_collection(pad.collection_name) == 0
+
+        # Entries written while the agent is busy are kept for the next consolidation
+        pad.update_memory(None, {"user_input": "Also coffee"}, {"step": 3})
+        gate.set()
+        assert ScratchPad.flush(timeout=5)
+
+        assert agent.run.call_count == 1
+        assert self._log_ids(pad) == ["5", "6"]
+        assert pad._state.pending == 2
+
+        pad.storage.load_collection = Mock(side_effect=AssertionError("query should use the cache"))
+        pad.query_memory(None, {}, {})
+        assert pad.store["readable"] == ["User likes tea"]
+
+    def test_scratchpad_agent_is_created_once(self, make_scratchpad):
+        """Later consolidations reuse the same scratchpad agent."""
+        pad = make_scratchpad(background=False)
+        for turn in range(4):
+            pad.update_memory(None, {"user_input": f"turn {turn}"}, {"step": turn})
+
+        assert scratchpad_module.Agent.call_count == 1
+        assert scratchpad_module.Agent.return_value.run.call_count == 2
+        assert self._log_ids(pad) == []
+
+    def test_inline_consolidation_returns_the_update(self, make_scratchpad):
+        """With background consolidation disabled, check_scratchpad consolidates before returning."""
+        pad = make_scratchpad(background=False)
+        pad._save_scratchpad_log(["a", "b", "c", "d"])
+
+        assert pad.check_scratchpad() == "User likes tea"
+        assert pad.storage.load_collection(pad.collection_name)["documents"] == ["User likes tea"]
+        prompt = scratchpad_module.Agent.return_value.run.call_args.kwargs
+        assert prompt["scratchpad_log"] == "a\nb\nc\nd"
+
+    def test_delete_resets_counters_and_cache(self, make_scratchpad):
+        """Deleting the scratchpad clears both collections and the in-process state."""
+        pad = make_scratchpad(background=False)
+        pad._save_scratchpad_log(["a", "b", "c", "d"])
+        pad.check_scratchpad()
+
+        pad.delete()
+        pad.query_memory(None, {}, {})
+
+        assert pad.store["readable"].startswith("No information available yet")
+        pad._save_scratchpad_log("e")
+        assert self._log_ids(pad) == ["1"]
+
+    @staticmethod
+    def _summarizing_agent(fail_on=None):
+        """Agent stand-in that summarizes a chunk to its first word and merges summaries on the final call."""
+        calls = []
+
+        def run(scratchpad_log, scratchpad):
+            calls.append((scratchpad_log, scratchpad))
+            if fail_on and fail_on in scratchpad_log and scratchpad == "":
+                raise RuntimeError("model down")
+            if scratchpad == "":
+                return f"<updated_scratchpad>summary of {scratchpad_log.split()[0]}</updated_scratchpad>"
+            return f"<updated_scratchpad>{scratchpad_log}</updated_scratchpad>"
+
+        return run, calls
+
+    @pytest.fixture
+    def word_tokens(self, monkeypatch):
+        """Count one token per word so chunk boundaries do not depend on the installed tokenizer."""
+        monkeypatch.setattr(scratchpad_module, "estimate_tokens", lambda text: len(str(text).split()))
+
+    def test_large_logs_are_summarized_in_chunks_first(self, make_scratchpad, word_tokens):
+        """A log over the token budget is mapped chunk by chunk, then reduced in one final call."""
+        pad = make_scratchpad(background=False, chunk_tokens=15)
+        pad._save_main_scratchpad("Existing notes")
+        run, calls = self._summarizing_agent()
+        scratchpad_module.Agent.return_value.run.side_effect = run
+        entries = [f"{name} " + "detail " * 10 for name in ("alpha", "beta", "gamma", "delta")]
+        pad._save_scratchpad_log(entries)
+
+        result = pad.consolidate()
+
+        map_calls = [log for log, current in calls if current == ""]
+        assert len(map_calls) == 4
+        assert calls[-1] == ("summary of alpha\nsummary of beta\nsummary of gamma\nsummary of delta", "Existing notes")
+        assert result == calls[-1][0]
+        assert pad._state.partials == {}
+
+    def test_retry_only_redoes_failed_chunks(self, make_scratchpad, word_tokens):
+        """Chunk summaries from a failed consolidation are reused by the next attempt."""
+        pad = make_scratchpad(background=False, chunk_tokens=15, map_workers=1)
+        pad._save_main_scratchpad("Existing notes")
+        run, calls = self._summarizing_agent(fail_on="gamma")
+        scratchpad_module.Agent.return_value.run.side_effect = run
+        pad._save_scratchpad_log([f"{name} " + "detail " * 10 for name in ("alpha", "beta", "gamma")])
+
+        with pytest.raises(RuntimeError):
+            pad.consolidate()
+        assert len(pad._state.partials) == 2
+        assert self._log_ids(pad) == ["1", "2", "3"]
+
+        run, calls = self._summarizing_agent()
+        scratchpad_module.Agent.return_value.run.side_effect = run
+        pad.consolidate()
+
+        assert [log.split()[0] for log, current in calls if current == ""] == ["gamma"]
+        assert self._log_ids(pad) == []
+
+    def test_chunks_whose_summary_grows_are_kept_as_written(self, make_scratchpad, word_tokens):
+        """A chunk whose summary comes out longer is merged as written alongside the summaries that shrank."""
+        pad = make_scratchpad(background=False, chunk_tokens=15)
+        pad._save_main_scratchpad("Existing notes")
+        scratchpad_module.Agent.return_value.run.side_effect = lambda scratchpad_log, scratchpad: (
+            "<updated_scratchpad>summary of alpha</updated_scratchpad>" if scratchpad_log.startswith("alpha")
+            else f"<updated_scratchpad>{scratchpad_log} and more</updated_scratchpad>")
+        pad._save_scratchpad_log([f"{name} " + "detail " * 10 for name in ("alpha", "beta")])
+
+        pad.consolidate()
+
+        final = scratchpad_module.Agent.return_value.run.call_args.kwargs
+        assert final["scratchpad_log"] == "summary of alpha\nbeta " + "detail " * 10
+        assert self._log_ids(pad) == []
+
+    def test_summaries_that_do_not_shrink_fail_the_consolidation(self, make_scratchpad, word_tokens):
+        """If no summary shrinks its chunk, nothing is merged and the next attempt waits for more entries."""
+        pad = make_scratchpad(background=False, chunk_tokens=15)
+        pad._save_main_scratchpad("Existing notes")
+        agent = scratchpad_module.Agent.return_value
+        agent.run.side_effect = lambda scratchpad_log, scratchpad: (
+            f"<updated_scratchpad>{scratchpad_log} and more</updated_scratchpad>")
+        pad._save_scratchpad_log([f"{name} " + "detail " * 10 for name in ("alpha", "beta")])
+
+        with pytest.raises(ValueError, match="did not shrink"):
+            pad.consolidate()
+
+        assert self._log_ids(pad) == ["1", "2"]
+        assert pad.storage.load_collection(pad.collection_name)["documents"] == ["Existing notes"]
+        assert len(pad._state.partials) == 2
+
+        # A retry reuses the cached summaries instead of asking again
+        with pytest.raises(ValueError, match="did not shrink"):
+            pad.consolidate()
+        assert agent.run.call_count == 2
+
+        # The next turn reaches the threshold but does not retry until another threshold's worth arrives
+        pad.update_memory(None, {"user_input": "hi"}, {"step": 1})
+        assert agent.run.call_count == 2
+        assert self._log_ids(pad) == ["1", "2", "3", "4"]
+
+    def test_chunks_without_a_summary_fail_the_consolidation(self, make_scratchpad, word_tokens):
+        """A chunk reply without an updated scratchpad is an error, not a placeholder summary."""
+        pad = make_scratchpad(background=False, chunk_tokens=15)
+        scratchpad_module.Agent.return_value.run.return_value = "I could not summarize this."
+        pad._save_scratchpad_log([f"{name} " + "detail " * 10 for name in ("alpha", "beta")])
+
+        with pytest.raises(ValueError, match="No updated scratchpad"):
+            pad.consolidate()
+        assert self._log_ids(pad) == ["1", "2"]
+
+    def test_oversized_entries_are_split(self):
+        """An entry larger than the budget is split on lines, and long lines on characters."""
+        entry = "short line\n" + "x" * 1000
+        chunks = ScratchPad._chunk_log([entry, "tail"], budget=50)
+
+        assert chunks[0].startswith("short line")
+        assert all(len(chunk) <= 50 * 4 + len("short line") + 1 for chunk in chunks)
+        assert "".join(chunk.replace("short line\n", "") for chunk in chunks[:-1]).count("x") == 1000
+        assert chunks == ScratchPad._chunk_log([entry, "tail"], budget=50)
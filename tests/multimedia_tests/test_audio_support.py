@@ -1,5 +1,6 @@
 import os
 import sys
+from dataclasses import replace
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import MagicMock
@@ -131,10 +132,9 @@ def test_audio_manager_save(tmp_path, monkeypatch, isolated_config):
 
     agent = Agent("AudioAgent")
 
-    # Configure audio settings for this test
-    dummy_cfg.settings.system.audio.save_files = True
-    dummy_cfg.settings.system.audio.save_dir = str(tmp_path)
-    dummy_cfg.settings.system.audio.autoplay = False
+    # Configure audio settings for this test (settings snapshots are frozen, so swap in a new one)
+    audio = replace(dummy_cfg.settings.system.audio, save_files=True, save_dir=str(tmp_path), autoplay=False)
+    dummy_cfg.settings = replace(dummy_cfg.settings, system=replace(dummy_cfg.settings.system, audio=audio))
 
     file_path = agent.audio_manager.save_tts_bytes(b"12345", fmt="wav")
     assert Path(file_path).exists(), "Audio file was not written"
@@ -0,0 +1,139 @@
+"""
+Tests that a ChromaStorage shared by several memory nodes can be used from several threads.
+"""
+
+import importlib.util
+import threading
+import time
+
+import pytest
+
+
+def _real_chroma_storage():
+    """Load ChromaStorage from its module source; the test bootstrap swaps the module's class for a fake."""
+    spec = importlib.util.find_spec("agentforge.storage.chroma_storage")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ChromaStorage
+
+
+class _Collection:
+    writes = []
+
+    def __init__(self, name):
+        self.name = name
+
+    def count(self):
+        return len(self.name)
+
+    def get(self, **kwargs):
+        return {"ids": [self.name], "documents": [self.name], "metadatas": [{}]}
+
+    def query(self, **kwargs):
+        return {"ids": [[self.name]], "documents": [[self.name]], "metadatas": [[{}]]}
+
+    def upsert(self, documents, metadatas, ids):
+        _Collection.writes.append((self.name, documents[0]))
+
+    def update(self, ids, metadatas):
+        _Collection.writes.append((self.name, ids[0]))
+
+    def delete(self, ids):
+        _Collection.writes.append((self.name, ids[0]))
+
+
+class _Client:
+    def get_or_create_collection(self, name, **kwargs):
+        return _Collection(name)
+
+
+def _slow_selection():
+    """``collection`` attribute that yields to other threads right after each selection."""
+    def set_collection(self, collection):
+        self.__dict__["selected"] = collection
+        time.sleep(0.001)
+
+    return property(lambda self: self.__dict__.get("selected"), set_collection)
+
+
+@pytest.fixture
+def storage(isolated_config):
+    ChromaStorage = _real_chroma_storage()
+    ChromaStorage.collection = _slow_selection()
+    storage = ChromaStorage.__new__(ChromaStorage)
+    storage.client = _Client()
+    storage.config = isolated_config
+    _Collection.writes = []
+    return storage
+
+
+def test_concurrent_operations_use_their_own_collection(storage):
+    """Operations on different collections never read or write a collection another thread selected."""
+    mismatches = []
+    start = threading.Barrier(3)
+
+    def work(name):
+        start.wait(5)
+        for i in range(50):
+            loaded = storage.load_collection(name)
+            if loaded["ids"] != [name]:
+                mismatches.append((name, loaded["ids"][0]))
+            storage.save_to_storage(name, data=[name], ids=[str(i)])
+
+    threads = [threading.Thread(target=work, args=(name,)) for name in ("coll_a", "coll_bb", "coll_ccc")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert mismatches == []
+    assert all(collection == document for collection, document in _Collection.writes)
+    assert len(_Collection.writes) == 150
+
+
+def test_queries_and_metadata_updates_use_their_own_collection(storage):
+    """A background persona update (query, supersede marks) never reaches a node queried on another thread."""
+    mismatches = []
+    start = threading.Barrier(3)
+
+    def work(name):
+        start.wait(5)
+        for _ in range(30):
+            found = storage.query_storage(name, query="anything", num_results=1)
+            if found["ids"] != [name]:
+                mismatches.append((name, found["ids"][0]))
+            storage.update_metadata(name, [name], [{"superseded": True}])
+
+    threads = [threading.Thread(target=work, args=(name,)) for name in ("coll_a", "coll_bb", "coll_ccc")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert mismatches == []
+    assert all(collection == record_id for collection, record_id in _Collection.writes)
+    assert len(_Collection.writes) == 90
+
+
+def test_deletes_reach_only_their_own_collection(storage):
+    """A background scratchpad consolidation deleting its log ids never deletes from another node's collection."""
+    mismatches = []
+    start = threading.Barrier(3)
+
+    def work(name):
+        start.wait(5)
+        for _ in range(30):
+            count = storage.count_collection(name)
+            if count != len(name):
+                mismatches.append((name, count))
+            storage.delete_from_storage(name, [name])
+
+    threads = [threading.Thread(target=work, args=(name,)) for name in ("coll_a", "coll_bb", "coll_ccc")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert mismatches == []
+    assert all(collection == record_id for collection, record_id in _Collection.writes)
+    assert len(_Collection.writes) == 90
@@ -6,6 +6,38 @@ from typing import Any, Dict, List, Optional
 
 __all__ = ["FakeChromaStorage"]
 
+_COMPARATORS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+}
+
+
+def _matches(meta: Dict[str, Any], where: Optional[dict]) -> bool:
+    """Evaluate the subset of Chroma's metadata ``where`` syntax used by the framework."""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches(meta, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(meta, c) for c in condition):
+                return False
+        else:
+            ops = condition if isinstance(condition, dict) else {"$eq": condition}
+            # Like Chroma, records without the key only match a $ne filter on it
+            if key not in meta:
+                if set(ops) != {"$ne"}:
+                    return False
+                continue
+            if not all(_COMPARATORS[op](meta[key], value) for op, value in ops.items()):
+                return False
+    return True
+
 
 class _FakeCollection:
     """Extremely small subset of Chroma collection API sufficient for tests."""
@@ -45,9 +77,9 @@ class _FakeCollection:
         with self._lock:
             return len(self._docs)
 
-    def query(self, num_results: int = 1):
+    def query(self, num_results: int = 1, where: Optional[dict] = None):
         with self._lock:
-            ids = list(self._docs.keys())[:num_results]
+            ids = [i for i in self._docs if _matches(self._metas.get(i, {}), where)][:num_results]
             return self.get(ids=ids)
 
 
@@ -126,14 +158,34 @@ class FakeChromaStorage:
 
         self.select_collection(collection_name).upsert(data, processed_metas, ids)
 
-    def query_storage(self, *, collection_name: str, query: Optional[str | List[str]] = None, num_results: int = 1, **_):
+    def query_storage(self, *, collection_name: str, query: Optional[str | List[str]] = None, num_results: int = 1,
+                      filter_condition: Optional[dict] = None, **_):
         col = self.select_collection(collection_name)
-        res = col.query(num_results=num_results)
+        res = col.query(num_results=num_results, where=filter_condition)
         # If collection empty, return {} to mirror production behaviour
         if not res["documents"]:
             return {}
         return res
 
+    def load_collection(self, collection_name: str, include: list = None, where: dict = None, where_doc: dict = None,
+                        ids: list = None):
+        include = include or ["documents", "metadatas"]
+        col = self.select_collection(collection_name)
+        with col._lock:
+            selected = [i for i in (ids if ids is not None else col._docs) if i in col._docs
+                        and _matches(col._metas.get(i, {}), where)]
+        data = col.get(ids=selected)
+        return {k: v for k, v in data.items() if k == "ids" or k in include}
+
+    def update_metadata(self, collection_name: str, ids: list, metadata: list[dict]):
+        if len(ids) != len(metadata):
+            raise ValueError("ids and metadata must have the same length")
+        col = self.select_collection(collection_name)
+        with col._lock:
+            for _id, meta in zip(ids, metadata):
+                if _id in col._docs:
+                    col._metas[_id] = dict(meta)
+
     def delete_from_storage(self, collection_name: str, ids: List[str] | str):
         if not isinstance(ids, list):
             ids = [ids]
@@ -142,6 +194,9 @@ class FakeChromaStorage:
     def reset_storage(self):
         self._collections.clear()
 
+    def return_embedding(self, text_to_embed: str):
+        return [[float(len(text_to_embed))]]
+
     def get_last_x_entries(self, collection_name: str, x: int, include: list = None):
         """
         Retrieve the last X entries from a collection, ordered by insertion (id ascending).
@@ -0,0 +1,103 @@
+import logging
+import threading
+
+import pytest
+
+from agentforge.utils.logger import BaseLogger, LazyMessage, Logger, _QueueForwarder
+
+
+class _CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((threading.current_thread().name, self.format(record)))
+
+
+@pytest.fixture()
+def logging_enabled():
+    logging.disable(logging.NOTSET)
+    yield
+    BaseLogger.flush()
+
+
+def test_records_are_written_on_the_writer_thread(logging_enabled):
+    capture = _CaptureHandler()
+    std_logger = logging.getLogger("agentforge.tests.queue")
+    std_logger.setLevel(logging.DEBUG)
+    forwarder = _QueueForwarder(capture)
+    std_logger.addHandler(forwarder)
+    try:
+        std_logger.debug("payload %s", LazyMessage(lambda: "built"))
+        BaseLogger.flush()
+    finally:
+        std_logger.removeHandler(forwarder)
+
+    assert capture.records == [(capture.records[0][0], "payload built")]
+    assert capture.records[0][0] != threading.current_thread().name
+
+
+def test_lazy_messages_are_skipped_when_level_disabled(logging_enabled):
+    logger = Logger("LazyLoggerTest")
+    logger.loggers["agentforge"].set_level("warning")
+    calls = []
+
+    logger.debug(lambda: calls.append("built") or "never")
+    logger.warning(lambda: calls.append("built") or "kept")
+    BaseLogger.flush()
+
+    assert calls == ["built"]
+
+
+def test_lazy_message_formats_template_args_once():
+    calls = []
+    message = LazyMessage(lambda: calls.append(1) or "%s=%d", ("tokens", 5))
+    assert str(message) == "tokens=5"
+    assert str(message) == "tokens=5"
+    assert calls == [1]
+
+
+def test_logger_file_is_the_second_positional_argument(monkeypatch):
+    logger = Logger("PositionalLoggerTest")
+    calls = []
+    monkeypatch.setattr(logger, "log", lambda msg, level="info", logger_file=None, args=():
+                        calls.append((msg, level, logger_file, args)))
+
+    logger.info("text", "model_io")
+    logger.debug("%s=%d", "model_io", args=("tokens", 5))
+
+    assert calls == [("text", "info", "model_io", ()), ("%s=%d", "debug", "model_io", ("tokens", 5))]
+
+
+def test_truncate_caps_payloads():
+    logger = Logger("TruncateLoggerTest")
+    assert logger.truncate("x" * 10, limit=4) == "xxxx\n... [truncated 6 chars]"
+    assert logger.truncate("short", limit=0) == "short"
+    assert logger.truncate({"a": 1}, limit=100) == "{'a': 1}"
+
+
+def test_new_log_files_are_registered_in_memory_only(isolated_config, monkeypatch):
+    saves = []
+    monkeypatch.setattr(type(isolated_config), "save", lambda self: saves.append(True))
+
+    logger = Logger("RegistrationLoggerTest", default_logger="registration_test")
+    logger.info("hello", logger_file="registration_extra")
+
+    assert logger.logging_config["registration_test"] == "warning"
+    assert logger.logging_config["registration_extra"] == "warning"
+    assert saves == []
+
+    # Registrations are kept apart from the settings dict, so a reload does not drop them
+    isolated_config.load_all_configurations()
+    assert logger.logging_config["registration_extra"] == "warning"
+    assert "registration_extra" not in isolated_config.data["settings"]["system"]["logging"]["files"]
+
+    Logger.persist_logging_config()
+    assert saves == [True]
+    assert isolated_config.data["settings"]["system"]["logging"]["files"]["registration_extra"] == "warning"
+
+
+def test_existing_logger_lookup_returns_same_instance():
+    first = Logger("LookupLoggerTest")
+    assert Logger("LookupLoggerTest") is first